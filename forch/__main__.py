@@ -5,9 +5,6 @@ import functools
 import os
 import sys
 
-import forch.faucet_event_client
-from forch.forchestrator import Forchestrator
-import forch.http_server
 from forch.proto.forch_configuration_pb2 import ForchConfig
 from forch.utils import get_logger, yaml_proto
 
@@ -39,6 +36,11 @@ def show_error(error, path, params):
 
 def run_forchestrator():
     """main function to start forch"""
+    # Imported here so that printing the version does not load all of forch.
+    # pylint: disable=import-outside-toplevel
+    from forch.forchestrator import Forchestrator
+    import forch.http_server
+
     logger = get_logger(_LOGGER_NAME)
     logger.info('Starting Forchestrator')
 
@@ -52,6 +54,7 @@ def run_forchestrator():
 
     try:
         forchestrator.initialize()
+        http_server.set_metrics(forchestrator.get_metrics())
         http_server.map_request('system_state', forchestrator.get_system_state)
         http_server.map_request('dataplane_state', forchestrator.get_dataplane_state)
         http_server.map_request('switch_state', forchestrator.get_switch_state)
@@ -61,6 +64,7 @@ def run_forchestrator():
         http_server.map_request('list_hosts', forchestrator.get_list_hosts)
         http_server.map_request('vrrp_state', forchestrator.get_vrrp_state)
         http_server.map_request('sys_config', forchestrator.get_sys_config)
+        http_server.map_request('changes', forchestrator.get_changes)
         http_server.map_request('', http_server.static_file(''))
     except Exception as e:
         logger.error("Cannot initialize forch: %s", e, exc_info=True)
@@ -0,0 +1,228 @@
+"""Asyncio RADIUS client that correlates responses to requests with futures"""
+
+import asyncio
+import collections
+import os
+import socket
+
+from forch.radius import Radius
+from forch.radius_query import MabRequestTemplate, get_auth_result
+from forch.radius_server_pool import RadiusServerPool
+from forch.utils import MessageParseError, get_logger
+
+RADIUS_PACKET_IDS = 256
+DEFAULT_QUERY_TIMEOUT_SEC = 10
+# Room for a full window of responses arriving while the loop is busy sending
+SOCKET_RCVBUF_SIZE = 1 << 20
+
+RadiusResult = collections.namedtuple(
+    'RadiusResult', 'src_mac, port_id, code, segment, role')
+
+
+class RadiusTimeoutError(Exception):
+    """Error for when a RADIUS request gets no valid response within its timeout"""
+
+
+class _PendingRequest:
+    """Book keeping for a request that is waiting for its response"""
+
+    # pylint: disable=too-few-public-methods,too-many-arguments
+    def __init__(self, src_mac, port_id, packet, future, retries):
+        self.src_mac = src_mac
+        self.port_id = port_id
+        self.packet = packet
+        self.future = future
+        self.retries_left = retries
+        self.timer = None
+        self.server = None
+        self.in_flight = False
+        self.sent_time = None
+
+
+class RadiusClientProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol handing received RADIUS packets over to the query client"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def datagram_received(self, data, addr):
+        self._client.handle_response(data, addr)
+
+    def error_received(self, exc):
+        self._client.handle_error(exc)
+
+
+class AsyncRadiusQuery:
+    """Sends MAB requests on an asyncio loop, each resolved by a future on response or timeout
+
+    All packet book keeping happens on the loop thread, so no locking is needed. Only
+    RADIUS_PACKET_IDS requests can be on the wire at once, later requests wait for a free id.
+    Each (re)transmission goes to the server picked by the server pool, which defaults to the
+    single server of socket_info.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(self, socket_info, radius_secret, auth_callback=None,
+                 timeout_sec=None, max_retries=0, loop=None, server_pool=None):
+        self.auth_callback = auth_callback
+        self.radius_secret = radius_secret
+        self._mab_template = MabRequestTemplate(radius_secret)
+        self._server_pool = server_pool or RadiusServerPool(
+            [(socket_info.server_ip, socket_info.server_port)])
+        self._timeout_sec = timeout_sec or DEFAULT_QUERY_TIMEOUT_SEC
+        self._max_retries = max_retries
+        self._loop = loop or asyncio.new_event_loop()
+        self._started = self._loop.create_future()
+        self._transport = None
+        self._pending = {}
+        self._req_authenticators = {}
+        self._free_ids = collections.deque(range(RADIUS_PACKET_IDS))
+        self._id_waiters = collections.deque()
+        self._logger = get_logger('rquery')
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_RCVBUF_SIZE)
+            self._socket.bind((socket_info.source_ip, socket_info.source_port))
+        except socket.error as err:
+            self._logger.error("Unable to setup socket: %s", str(err))
+            self._socket.close()
+            raise
+
+    @property
+    def loop(self):
+        """Event loop the client runs on"""
+        return self._loop
+
+    def get_outstanding_count(self):
+        """Return the number of requests waiting for a response"""
+        return len(self._pending)
+
+    async def start(self):
+        """Attach the bound socket to the event loop"""
+        if self._started.done():
+            return
+        self._transport, _ = await self._loop.create_datagram_endpoint(
+            lambda: RadiusClientProtocol(self), sock=self._socket)
+        self._started.set_result(True)
+        self._logger.info('RADIUS client started for servers %s', ', '.join(
+            server.name for server in self._server_pool.get_servers()))
+
+    def receive_radius_messages(self):
+        """Run the client loop forever, drop-in for the blocking RadiusQuery receive thread"""
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self.start())
+        self._loop.run_forever()
+
+    def stop(self):
+        """Stop the client loop and close the socket"""
+        def _stop():
+            if self._transport:
+                self._transport.close()
+            self._loop.stop()
+        self._loop.call_soon_threadsafe(_stop)
+
+    def send_mab_request(self, src_mac, port_id):
+        """Thread-safe MAB request, returns a concurrent.futures.Future of the RadiusResult"""
+        return asyncio.run_coroutine_threadsafe(self.query_mab(src_mac, port_id), self._loop)
+
+    async def query_mab(self, src_mac, port_id):
+        """Send a MAB request and wait for its validated response
+        Returns:
+            RadiusResult
+        Raises:
+            RadiusTimeoutError: if no valid response arrived after all retries
+        """
+        await self._started
+        radius_id = await self._acquire_packet_id()
+        try:
+            req_authenticator = os.urandom(16)
+            packet = self._mab_template.encode(radius_id, req_authenticator, src_mac, port_id)
+            request = _PendingRequest(
+                src_mac, port_id, packet, self._loop.create_future(), self._max_retries)
+            self._pending[radius_id] = request
+            self._req_authenticators[radius_id] = req_authenticator
+            self._send(radius_id, request)
+            self._logger.debug("Sent MAB request for mac %s", src_mac)
+            return await request.future
+        finally:
+            self._release_packet_id(radius_id)
+
+    def _send(self, radius_id, request):
+        request.server = self._server_pool.select(exclude=request.server)
+        request.in_flight = True
+        request.sent_time = self._loop.time()
+        self._server_pool.request_sent(request.server)
+        self._transport.sendto(request.packet, request.server.address)
+        request.timer = self._loop.call_later(self._timeout_sec, self._handle_timeout, radius_id)
+
+    def _handle_timeout(self, radius_id):
+        request = self._pending.get(radius_id)
+        if not request or request.future.done():
+            return
+        request.in_flight = False
+        self._server_pool.request_timed_out(request.server, self._timeout_sec)
+        if request.retries_left > 0:
+            request.retries_left -= 1
+            self._logger.debug('Retrying RADIUS request for src_mac %s', request.src_mac)
+            self._send(radius_id, request)
+            return
+        self._logger.warning('RADIUS request timed out for %s', request.src_mac)
+        request.future.set_exception(
+            RadiusTimeoutError(f'RADIUS request timed out for {request.src_mac}'))
+
+    def handle_response(self, data, addr):
+        """Validate a received packet and resolve the future of its request"""
+        try:
+            radius = Radius.parse(data, self.radius_secret, self._req_authenticators)
+        except MessageParseError as error:
+            self._logger.warning('Dropping RADIUS packet from %s: %s', addr, error)
+            return
+        request = self._pending.get(radius.packet_id)
+        if not request or request.future.done():
+            self._logger.debug('Ignoring duplicate RADIUS response for id %s', radius.packet_id)
+            return
+        request.timer.cancel()
+        request.in_flight = False
+        if self._server_pool.get_server(addr) is request.server:
+            self._server_pool.response_received(
+                request.server, self._loop.time() - request.sent_time)
+        else:
+            self._server_pool.request_abandoned(request.server)
+        code, segment, role = get_auth_result(radius)
+        self._logger.debug('Received RADIUS msg: Code:%s src:%s', code, request.src_mac)
+        request.future.set_result(
+            RadiusResult(request.src_mac, request.port_id, code, segment, role))
+        if self.auth_callback:
+            self.auth_callback(request.src_mac, code, segment, role)
+
+    def handle_error(self, error):
+        """Log socket errors reported by the transport"""
+        self._logger.error('RADIUS socket error: %s', error)
+
+    async def _acquire_packet_id(self):
+        if self._free_ids:
+            return self._free_ids.popleft()
+        waiter = self._loop.create_future()
+        self._id_waiters.append(waiter)
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_packet_id(waiter.result())
+            raise
+
+    def _release_packet_id(self, radius_id):
+        request = self._pending.pop(radius_id, None)
+        if request and request.timer:
+            request.timer.cancel()
+        if request and request.in_flight:
+            request.in_flight = False
+            self._server_pool.request_abandoned(request.server)
+        self._req_authenticators.pop(radius_id, None)
+        while self._id_waiters:
+            waiter = self._id_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(radius_id)
+                return
+        self._free_ids.append(radius_id)
@@ -4,11 +4,16 @@ import sys
 import os
 import collections
 import argparse
+from concurrent.futures import Future
+import functools
 import threading
+import time
 import yaml
 
+from forch.async_radius_query import AsyncRadiusQuery, RadiusTimeoutError
 from forch.heartbeat_scheduler import HeartbeatScheduler
 import forch.radius_query as radius_query
+from forch.radius_server_pool import RadiusServerPool
 from forch.simple_auth_state_machine import AuthStateMachine
 from forch.utils import get_logger, proto_dict, dict_proto, ConfigError
 from forch.proto.devices_state_pb2 import DevicePlacement
@@ -18,6 +23,8 @@ from forch.proto.forch_configuration_pb2 import OrchestrationConfig
 
 HEARTBEAT_INTERVAL_SEC = 3
 
+CachedDecision = collections.namedtuple('CachedDecision', 'expiry, segment, role')
+
 class Authenticator:
     """Authenticate devices using MAB/dot1x"""
     def __init__(self, auth_config, auth_callback=None,
@@ -25,6 +32,9 @@ class Authenticator:
         self.radius_query = None
         self.sessions = {}
         self._sessions_lock = threading.Lock()
+        self._decision_cache = {}
+        self._session_ports = {}
+        self._decision_cache_ttl_sec = auth_config.decision_cache_ttl_sec
         self.auth_callback = auth_callback
         self._metrics = metrics
         self._logger = get_logger('auth')
@@ -46,6 +56,14 @@ class Authenticator:
         socket_info = Socket('0.0.0.0', source_port, radius_ip, radius_port)
         if radius_query_object:
             self.radius_query = radius_query_object
+        elif auth_config.async_radius_query or radius_info.additional_servers:
+            server_pool = RadiusServerPool(
+                [(radius_ip, radius_port)] + self._parse_servers(radius_info.additional_servers),
+                metrics=self._metrics)
+            self.radius_query = AsyncRadiusQuery(
+                socket_info, secret, self.process_radius_result,
+                timeout_sec=auth_config.query_timeout_sec, max_retries=len(server_pool) - 1,
+                server_pool=server_pool)
         else:
             self.radius_query = radius_query.RadiusQuery(
                 socket_info, secret, self.process_radius_result)
@@ -59,6 +77,16 @@ class Authenticator:
         self._logger.info(
             'Created Authenticator module with radius IP %s and port %s.', radius_ip, radius_port)
 
+    def _parse_servers(self, servers):
+        addresses = []
+        for server in servers:
+            server_ip, _, server_port = server.rpartition(':')
+            if not server_ip or not server_port.isdigit():
+                self._logger.warning('Invalid RADIUS server address in config: %s', server)
+                raise ConfigError
+            addresses.append((server_ip, int(server_port)))
+        return addresses
+
     def process_auth_result(self):
         """Prints Auth example object to out"""
         base_dir = os.getenv('FORCH_CONFIG_DIR')
@@ -74,15 +102,30 @@ class Authenticator:
             sys.stdout.write(str(proto_dict(auth_example)) + '\n')
 
     def stop(self):
-        """Stop state machine timer"""
+        """Stop state machine timer and RADIUS client"""
         if self.timer:
             self.timer.stop()
+        if self.radius_query:
+            self.radius_query.stop()
 
     def do_mab_request(self, src_mac, port_id):
         """Initiate MAB request"""
         self._logger.info('sending MAB request for %s', src_mac)
         self.radius_query.send_mab_request(src_mac, port_id)
 
+    def _send_mab_request(self, src_mac, port_id):
+        future = self.radius_query.send_mab_request(src_mac, port_id)
+        if isinstance(future, Future):
+            future.add_done_callback(functools.partial(self._handle_mab_request_done, src_mac))
+
+    def _handle_mab_request_done(self, src_mac, future):
+        """Drive the session on a RADIUS timeout raised by the query loop"""
+        if future.cancelled() or not isinstance(future.exception(), RadiusTimeoutError):
+            return
+        session = self.sessions.get(src_mac)
+        if session:
+            session.received_radius_timeout()
+
     def process_device_placement(self, src_mac, device_placement):
         """Process device placement info and initiate mab query"""
         portid_hash = ((device_placement.switch + str(device_placement.port)).encode('utf-8')).hex()
@@ -91,13 +134,22 @@ class Authenticator:
             if src_mac not in self.sessions:
                 self.sessions[src_mac] = AuthStateMachine(
                     src_mac, port_id, self.auth_config,
-                    self.radius_query.send_mab_request,
-                    self.process_session_result, metrics=self._metrics)
+                    self._send_mab_request, self.process_session_result,
+                    metrics=self._metrics,
+                    heartbeat_request_timeouts=not isinstance(
+                        self.radius_query, AsyncRadiusQuery))
+                self._session_ports[src_mac] = (device_placement.switch, device_placement.port)
                 if device_placement.connected:
-                    self.sessions[src_mac].host_learned()
+                    cached = self._get_cached_decision(src_mac)
+                    if cached:
+                        self._logger.info('Applying cached RADIUS accept for %s', src_mac)
+                        self.sessions[src_mac].host_learned_cached(cached.segment, cached.role)
+                    else:
+                        self.sessions[src_mac].host_learned()
             elif not device_placement.connected:
                 self.sessions[src_mac].host_expired()
                 self.sessions.pop(src_mac)
+                self._session_ports.pop(src_mac, None)
 
     def process_radius_result(self, src_mac, code, segment, role):
         """Process RADIUS result from radius_query"""
@@ -110,18 +162,48 @@ class Authenticator:
         if code == radius_query.INVALID_RESP:
             self._logger.warning("Received invalid response for src_mac: %s", src_mac)
             return
-        if src_mac not in self.sessions:
-            self._logger.warning("Session doesn't exist for src_mac:%s", src_mac)
-            return
         with self._sessions_lock:
+            session = self.sessions.get(src_mac)
+            if not session:
+                self._logger.warning("Session doesn't exist for src_mac:%s", src_mac)
+                return
             if code == radius_query.ACCEPT:
                 if self._metrics:
                     self._metrics.inc_var('radius_query_accepts')
-                self.sessions[src_mac].received_radius_accept(segment, role)
+                self._cache_decision(src_mac, segment, role)
+                session.received_radius_accept(segment, role)
             else:
                 if self._metrics:
                     self._metrics.inc_var('radius_query_rejects')
-                self.sessions[src_mac].received_radius_reject()
+                self._decision_cache.pop(self._get_cache_key(src_mac), None)
+                session.received_radius_reject()
+
+    def _get_cache_key(self, src_mac):
+        return (src_mac,) + self._session_ports.get(src_mac, (None, None))
+
+    def _cache_decision(self, src_mac, segment, role):
+        if self._decision_cache_ttl_sec > 0:
+            self._decision_cache[self._get_cache_key(src_mac)] = CachedDecision(
+                time.time() + self._decision_cache_ttl_sec, segment, role)
+
+    def _get_cached_decision(self, src_mac):
+        if self._decision_cache_ttl_sec <= 0:
+            return None
+        key = self._get_cache_key(src_mac)
+        cached = self._decision_cache.get(key)
+        if cached and cached.expiry < time.time():
+            self._decision_cache.pop(key)
+            cached = None
+        if self._metrics:
+            self._metrics.inc_var(
+                'radius_decision_cache_hits' if cached else 'radius_decision_cache_misses')
+        return cached
+
+    def _expire_cached_decisions(self):
+        now = time.time()
+        expired = [key for key, cached in self._decision_cache.items() if cached.expiry < now]
+        for key in expired:
+            self._decision_cache.pop(key)
 
     def process_session_result(self, src_mac, access, segment=None, role=None):
         """Process session result"""
@@ -133,6 +215,7 @@ class Authenticator:
         with self._sessions_lock:
             for session in self.sessions.values():
                 session.handle_sm_timer()
+            self._expire_cached_decisions()
 
 
 def parse_args(raw_args):
@@ -169,6 +252,9 @@ if __name__ == '__main__':
         def receive_radius_messages(self):
             """mock receive_radius_messages"""
 
+        def stop(self):
+            """mock stop"""
+
         def get_last_mac_queried(self):
             """Get last queried mac address and clear"""
             mac = self._last_mac_query
@@ -0,0 +1,87 @@
+"""Stream of state change records published by the state collectors"""
+
+import collections
+from datetime import datetime
+import itertools
+import json
+import threading
+
+DEFAULT_CAPACITY = 4096
+DEFAULT_KEEPALIVE_SEC = 15
+STREAM_FILTERS = ('subsystem', 'switch', 'mac')
+
+
+class ChangeStream:
+    """Ring buffer of change records, each numbered by a global sequence used as resume token
+
+    A client resuming from a sequence number older than the buffer gets a 'reset' record,
+    telling it to fetch full state again before applying further changes. So does a client
+    resuming from a sequence number ahead of the latest change, issued before a restart.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self._records = collections.deque(maxlen=capacity)
+        self._sequence = 0
+        self._condition = threading.Condition()
+
+    def get_sequence(self):
+        """Return the sequence number of the latest change"""
+        with self._condition:
+            return self._sequence
+
+    def publish(self, subsystem, change_type, **fields):
+        """Add a change record, fields with None values are left out"""
+        with self._condition:
+            self._sequence += 1
+            record = {
+                'seq': self._sequence,
+                'timestamp': datetime.now().isoformat(),
+                'subsystem': subsystem,
+                'type': change_type,
+            }
+            record.update((key, value) for key, value in fields.items() if value is not None)
+            self._records.append(record)
+            self._condition.notify_all()
+
+    def get_changes(self, since, timeout=None):
+        """Return records after since, waiting up to timeout for one if there are none
+        Returns:
+            (records, reset) where reset is True if records after since were dropped
+        """
+        with self._condition:
+            if since > self._sequence:
+                return list(self._records), True
+            self._condition.wait_for(lambda: self._sequence > since, timeout)
+            if not self._records:
+                return [], False
+            oldest = self._records[0]['seq']
+            reset = since < oldest - 1
+            start = max(0, since + 1 - oldest)
+            return list(itertools.islice(self._records, start, None)), reset
+
+    def stream(self, since=None, filters=None, ndjson=False, keepalive_sec=None):
+        """Generate encoded change records as server-sent events or newline delimited JSON"""
+        since = self.get_sequence() if since is None else since
+        filters = filters or {}
+        keepalive_sec = keepalive_sec or DEFAULT_KEEPALIVE_SEC
+        while True:
+            records, reset = self.get_changes(since, keepalive_sec)
+            if reset:
+                since = records[0]['seq'] - 1 if records else 0
+                yield self._encode({'seq': since, 'type': 'reset'}, ndjson)
+            if not records:
+                yield b'\n' if ndjson else b': keepalive\n\n'
+                continue
+            since = records[-1]['seq']
+            matched = [self._encode(record, ndjson) for record in records
+                       if all(record.get(key) == value for key, value in filters.items())]
+            if matched:
+                yield b''.join(matched)
+
+    @staticmethod
+    def _encode(record, ndjson):
+        data = json.dumps(record, separators=(',', ':')).encode()
+        if ndjson:
+            return data + b'\n'
+        return b'id: %d\nevent: %s\ndata: %s\n\n' % (
+            record['seq'], record['type'].encode(), data)
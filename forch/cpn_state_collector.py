@@ -3,7 +3,6 @@
 from datetime import datetime
 import os
 import os.path
-import re
 import threading
 
 from forch.ping_manager import PingManager
@@ -33,11 +32,6 @@ DEFAULT_MIN_CONSECUTIVE_PING_HEALTHY = 3
 DEFAULT_MIN_CONSECUTIVE_PING_DOWN = 5
 DEFAULT_PING_INTERVAL = 2
 
-PING_SUMMARY_REGEX = {'transmitted': r'\d+(?= packets transmitted)',
-                      'received': r'\d+(?= received)',
-                      'loss_percentage': r'\d+(?=% packet loss)',
-                      'time_ms': r'(?<=time )\d+(?=ms)'}
-
 
 class CPNStateCollector:
     """Processing and storing CPN components states"""
@@ -49,9 +43,11 @@ class CPNStateCollector:
             config.min_consecutive_ping_healthy or DEFAULT_MIN_CONSECUTIVE_PING_HEALTHY)
         self._min_consecutive_down = (
             config.min_consecutive_ping_down or DEFAULT_MIN_CONSECUTIVE_PING_DOWN)
-        self.ping_interval = config.ping_interval or DEFAULT_PING_INTERVAL
+        self.ping_interval = (
+            config.ping_interval_sec or config.ping_interval or DEFAULT_PING_INTERVAL)
         self._lock = threading.Lock()
         self._ping_manager = None
+        self._change_stream = None
         self._logger = get_logger('cstate')
 
     def initialize(self):
@@ -82,6 +78,14 @@ class CPNStateCollector:
         if self._ping_manager:
             self._ping_manager.start_loop(self._handle_ping_result)
 
+    def set_change_stream(self, change_stream):
+        """Set ChangeStream to publish state changes to"""
+        self._change_stream = change_stream
+
+    def _publish_change(self, change_type, **fields):
+        if self._change_stream:
+            self._change_stream.publish('cpn', change_type, **fields)
+
     def get_cpn_summary(self):
         """Get summary of cpn info"""
         return dict_proto({
@@ -101,8 +105,7 @@ class CPNStateCollector:
                 cpn_node_map = cpn_nodes.setdefault(cpn_node, {})
                 cpn_node_map['attributes'] = proto_dict(node_state.get(NODE_ATTRIBUTES))
                 cpn_node_map['state'] = node_state.get(NODE_STATE)
-                ping_result = node_state.get(NODE_PING_RES, {}).get('stdout')
-                cpn_node_map['ping_results'] = CPNStateCollector._get_ping_summary(ping_result)
+                cpn_node_map['ping_results'] = node_state.get(NODE_PING_RES)
                 cpn_node_map['state_change_count'] = node_state.get(NODE_STATE_CHANGE_COUNT)
                 cpn_node_map['state_last_update'] = node_state.get(NODE_STATE_UPDATE_TS)
                 cpn_node_map['state_last_change'] = node_state.get(NODE_STATE_CHANGE_TS)
@@ -137,6 +140,8 @@ class CPNStateCollector:
                     node_state_map[NODE_STATE] = new_state
                     node_state_map[NODE_STATE_CHANGE_COUNT] = state_count
                     node_state_map[NODE_STATE_CHANGE_TS] = current_time
+                    self._publish_change(
+                        'cpn_node', node=host_name, state=State.State.Name(new_state))
 
                 node_state_map[NODE_STATE_UPDATE_TS] = current_time
                 node_state_map[NODE_PING_RES] = res_map
@@ -145,10 +150,8 @@ class CPNStateCollector:
 
     @staticmethod
     def _get_ping_state(ping_result):
-        """Get node state from ping stdout"""
-        result = re.search(r'\d+(?=% packet loss)', ping_result['stdout'])
-        loss = int(result.group()) if result else 100
-        if loss == 0:
+        """Get node state from ping results"""
+        if ping_result.get('loss_percentage', 100) == 0:
             return State.healthy
 
         return State.down
@@ -173,22 +176,6 @@ class CPNStateCollector:
 
         return State.damaged
 
-    @staticmethod
-    def _get_ping_summary(ping_stdout):
-        """Get ping summary"""
-        res_summary = {}
-        if not ping_stdout:
-            return None
-        for line in ping_stdout.split('\n'):
-            for summary_key, regex in PING_SUMMARY_REGEX.items():
-                match = re.search(regex, line)
-                if match:
-                    res_summary[summary_key] = match.group()
-            if line[:3] == 'rtt':
-                rtt_vals = re.findall(r'[0-9]*\.?[0-9]+', line)
-                res_summary['rtt_ms'] = dict(zip(['min', 'avg', 'max', 'mdev'], rtt_vals))
-        return res_summary
-
     def _update_cpn_state(self, current_time, state=None, detail=None):
         new_cpn_state, broken = (state, None) if state else self._get_cpn_state()
 
@@ -207,6 +194,8 @@ class CPNStateCollector:
             self._logger.info(
                 'cpn_state #%d %s: %s', cpn_state_count, State.State.Name(new_cpn_state),
                 use_detail)
+            self._publish_change(
+                'cpn', state=State.State.Name(new_cpn_state), detail=use_detail)
         self._cpn_state[CPN_STATE_DETAIL] = use_detail
         self._cpn_state[CPN_STATE_UPDATE_TS] = current_time
 
@@ -9,6 +9,7 @@ import socket
 import threading
 import time
 
+from forch.startup_sequencer import wait_until_ready
 from forch.utils import dict_proto, get_logger, FaucetEventOrderError
 
 from forch.proto.faucet_event_pb2 import FaucetEvent, PortChange
@@ -17,7 +18,7 @@ from forch.proto.faucet_event_pb2 import FaucetEvent, PortChange
 class FaucetEventClient():
     """A general client interface to the FAUCET event API"""
 
-    FAUCET_RETRIES = 10
+    FAUCET_SOCKET_TIMEOUT_SEC = 10
     _PORT_DEBOUNCE_SEC = 5
 
     def __init__(self, config):
@@ -25,6 +26,8 @@ class FaucetEventClient():
         self.sock = None
         self.buffer = None
         self._buffer_lock = threading.RLock()
+        self._pending_debounced = 0
+        self._dispatch_lock = threading.RLock()
         self._handlers = {}
         self.previous_state = None
         self._port_debounce_sec = config.port_debounce_sec or self._PORT_DEBOUNCE_SEC
@@ -41,14 +44,13 @@ class FaucetEventClient():
         assert sock_path, 'Environment FAUCET_EVENT_SOCK not defined'
 
         self.previous_state = {}
-        self.buffer = ''
+        with self._buffer_lock:
+            self.buffer = ''
+            self._pending_debounced = 0
 
-        retries = self.FAUCET_RETRIES
-        while not os.path.exists(sock_path):
-            self._logger.debug('Waiting for socket path %s', sock_path)
-            assert retries > 0, "Could not find socket path %s" % sock_path
-            retries -= 1
-            time.sleep(1)
+        self._logger.debug('Waiting for socket path %s', sock_path)
+        wait_until_ready(lambda: os.path.exists(sock_path), self.FAUCET_SOCKET_TIMEOUT_SEC,
+                         'Socket path %s' % sock_path)
 
         try:
             self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
@@ -66,6 +68,7 @@ class FaucetEventClient():
         self.event_socket_connected = False
         with self._buffer_lock:
             self.buffer = None
+            self._pending_debounced = 0
 
     def register_handler(self, proto, handler):
         """Register an event handler for the given proto class"""
@@ -114,7 +117,8 @@ class FaucetEventClient():
             return False
         self._last_event_id += 1
         if event_id != self._last_event_id:
-            raise FaucetEventOrderError('Sequence %d != %d' % (self._last_event_id, event_id))
+            raise FaucetEventOrderError('Sequence %d != %d' % (self._last_event_id, event_id),
+                                        gap=event_id - self._last_event_id)
         return True
 
     def _handle_port_change_debounce(self, event, target_event):
@@ -199,6 +203,8 @@ class FaucetEventClient():
         event_str = json.dumps(self._merge_event(base, event, timestamp=time.time(),
                                                  debounced=debounced))
         with self._buffer_lock:
+            if debounced:
+                self._pending_debounced += 1
             index = self.buffer.rfind('\n')
             if index == len(self.buffer) - 1:
                 self.buffer = '%s%s\n' % (self.buffer, event_str)
@@ -210,9 +216,21 @@ class FaucetEventClient():
 
     def set_event_horizon(self, event_horizon):
         """Set the event horizon to throw away unnecessary events"""
-        self._last_event_id = event_horizon
+        with self._dispatch_lock:
+            self._last_event_id = event_horizon
         self._logger.info('Setting event horizon to event #%d', event_horizon)
 
+    def run_at_event_horizon(self, func):
+        """Run func with the last event id while no event is being dispatched"""
+        with self._dispatch_lock:
+            with self._buffer_lock:
+                # Debounced port changes are applied after their event id has been consumed.
+                if self._port_timers or self._pending_debounced:
+                    return None
+            if not self._last_event_id:
+                return None
+            return func(self._last_event_id)
+
     def _dispatch_faucet_event(self, target, target_event):
         for handler in self._handlers.get(target, []):
             self._logger.debug('dispatching %s event', target)
@@ -239,19 +257,30 @@ class FaucetEventClient():
             event_target = targets[0] if targets else None
             faucet_event = dict_proto(event, FaucetEvent, ignore_unknown_fields=True)
             target_event = getattr(faucet_event, str(event_target), None)
-            try:
-                dispatch = self._valid_event_order(event) and target_event
-            except Exception as e:
-                self._logger.error('Validation failed for event %s: %s', event, e)
-                raise
-            dispatch = dispatch and self._handle_port_change_debounce(event, target_event)
-            dispatch = dispatch and self._handle_ports_status(event)
-            if dispatch:
-                self._augment_event_proto(faucet_event, target_event)
-                if not self._dispatch_faucet_event(event_target, target_event):
-                    return event
+            with self._dispatch_lock:
+                try:
+                    if self._dispatch_event(event, faucet_event, event_target, target_event):
+                        return event
+                finally:
+                    if event.get('debounced'):
+                        with self._buffer_lock:
+                            self._pending_debounced -= 1
         return None
 
+    def _dispatch_event(self, event, faucet_event, event_target, target_event):
+        """Dispatch an event, returning True if it has no handler"""
+        try:
+            dispatch = self._valid_event_order(event) and target_event
+        except Exception as e:
+            self._logger.error('Validation failed for event %s: %s', event, e)
+            raise
+        dispatch = dispatch and self._handle_port_change_debounce(event, target_event)
+        dispatch = dispatch and self._handle_ports_status(event)
+        if dispatch:
+            self._augment_event_proto(faucet_event, target_event)
+            return not self._dispatch_faucet_event(event_target, target_event)
+        return False
+
     def _augment_event_proto(self, event, target_event):
         target_event.timestamp = event.time
         if hasattr(target_event, 'dp_name'):
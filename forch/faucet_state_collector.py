@@ -4,13 +4,15 @@
 import copy
 from datetime import datetime
 import json
+import os
 import time
 import threading
 
 # TODO: Clean up to use State enum
 from forch.constants import \
     STATE_UP, STATE_INITIALIZING, STATE_DOWN, STATE_ACTIVE, STATE_BROKEN
-from forch.utils import dict_proto, get_logger
+from forch.state_query import StateQuery
+from forch.utils import dict_proto, get_logger, proto_dict
 
 from forch.proto.dataplane_state_pb2 import DataplaneState
 from forch.proto.devices_state_pb2 import DevicePlacement
@@ -48,6 +50,28 @@ def _dump_states(func):
     return wrapped
 
 
+def _encode_checkpoint(obj):
+    """Encode sets and maps with non-string keys, which JSON can not represent"""
+    if isinstance(obj, dict):
+        if all(isinstance(key, str) for key in obj):
+            return {key: _encode_checkpoint(value) for key, value in obj.items()}
+        return {CHECKPOINT_ITEMS: [[key, _encode_checkpoint(value)] for key, value in obj.items()]}
+    if isinstance(obj, (set, frozenset)):
+        return {CHECKPOINT_SET: [_encode_checkpoint(item) for item in obj]}
+    if isinstance(obj, (list, tuple)):
+        return [_encode_checkpoint(item) for item in obj]
+    return obj
+
+
+def _decode_checkpoint(obj):
+    """Decode objects encoded by _encode_checkpoint, as a json object hook"""
+    if len(obj) == 1 and CHECKPOINT_SET in obj:
+        return set(obj[CHECKPOINT_SET])
+    if len(obj) == 1 and CHECKPOINT_ITEMS in obj:
+        return dict(obj[CHECKPOINT_ITEMS])
+    return obj
+
+
 _RESTORE_METHODS = {'port': {}, 'dp': {}}
 
 LINK_SUBKEY_FORMAT = '%s:%s'
@@ -106,12 +130,21 @@ PACKET_RATE_STATE = "packet_rate_state"
 
 VLAN_PACKET_COUNT_METRIC = 'flow_packet_count_vlan'
 
+CHECKPOINT_VERSION = 2
+CHECKPOINT_EVENT_ID = 'event_id'
+CHECKPOINT_CONFIG_HASH = 'config_hash'
+CHECKPOINT_SET = '__set__'
+CHECKPOINT_ITEMS = '__items__'
+
 
 # pylint: disable=too-many-public-methods
 class FaucetStateCollector:
     """Processing faucet events and store states in the map"""
     def __init__(self, config, is_faucetizer_enabled):
         self.switch_states = {}
+        self._broken_switches = set()
+        self._switch_change_count = 0
+        self._switch_last_change = '#n/a'  # Cleverly chosen to be sorted less than timestamp.
         self.topo_state = {}
         self.learned_macs = {}
         self.faucet_config = {}
@@ -132,6 +165,7 @@ class FaucetStateCollector:
         self._stack_state_data = None
         self._forch_metrics = None
         self._device_state_reporter = None
+        self._change_stream = None
         self._config = config
         self._change_coalesce_sec = config.event_client.stack_topo_change_coalesce_sec
         self._packet_per_sec_thresholds = config.dataplane_monitoring.vlan_pkt_per_sec_thresholds
@@ -257,6 +291,149 @@ class FaucetStateCollector:
         self._restore_dp_config_change(metrics)
         return int(metrics['faucet_event_id'].samples[0].value)
 
+    def resync_states_from_metrics(self, metrics):
+        """Apply only differences between prometheus metrics and internal states"""
+        self._logger.info('resyncing internal state from metrics')
+        current_time = time.time()
+        changes = 0
+        with self.lock:
+            for label_name, method_map in _RESTORE_METHODS.items():
+                for metric_name, restore_method in method_map.items():
+                    if metric_name not in metrics:
+                        self._logger.warning("Metrics does not contain: %s", metric_name)
+                        continue
+                    for sample in metrics[metric_name].samples:
+                        switch = sample.labels['dp_name']
+                        label = int(sample.labels.get(label_name, 0))
+                        value = int(sample.value)
+                        if self._get_restored_state(metric_name, switch, label) != value:
+                            restore_method(self, current_time, switch, label, value)
+                            changes += 1
+            self._restore_lag_state_from_metrics(metrics)
+            self._restore_dataplane_state_from_metrics(metrics)
+            changes += self._resync_l2_learn_state_from_samples(
+                current_time, metrics['learned_l2_port'].samples)
+        self._logger.info('resynced %d state differences', changes)
+        return int(metrics['faucet_event_id'].samples[0].value), changes
+
+    def _get_restored_state(self, metric_name, switch, label):
+        if metric_name == 'port_status':
+            state_up = self.switch_states.get(switch, {}).get(PORTS, {}).get(label, {}).get(
+                PORT_STATE_UP)
+            return None if state_up is None else int(state_up)
+        if metric_name == 'dp_status':
+            dp_state = self.switch_states.get(switch, {}).get(SW_STATE)
+            return {SWITCH_CONNECTED: 1, SWITCH_DOWN: 0}.get(dp_state)
+        if metric_name == 'port_stack_state':
+            return self.topo_state.get(LINKS_STATE, {}).get(switch, {}).get(label, {}).get(
+                'state')
+        return None
+
+    def _resync_l2_learn_state_from_samples(self, timestamp, samples):
+        learned_ports = {}
+        for sample in samples:
+            port = int(sample.value)
+            if port:
+                key = (sample.labels['dp_name'], sample.labels['eth_src'])
+                learned_ports[key] = (port, int(sample.labels.get('vid', INVALID_VLAN)))
+
+        changes = 0
+        for mac, mac_map in list(self.learned_macs.items()):
+            for switch, switch_map in list(mac_map.get(MAC_LEARNING_SWITCH, {}).items()):
+                port = switch_map.get(MAC_LEARNING_PORT)
+                learned_port = learned_ports.get((switch, mac))
+                if not learned_port or learned_port[0] != port:
+                    self.process_port_expire(timestamp, switch, port, mac)
+                    changes += 1
+                else:
+                    learned_ports.pop((switch, mac))
+
+        for (switch, mac), (port, vid) in learned_ports.items():
+            self.process_port_learn(timestamp, switch, port, mac, vid)
+            changes += 1
+        return changes
+
+    def save_checkpoint(self, file_path, event_id, config_hash):
+        """Save a checkpoint of the internal states at the given event id"""
+        with self._lock:
+            if not self._is_state_restored:
+                return False
+            # Counts are dropped so no rate is calculated against a count from before a restart.
+            packet_counts = {
+                vlan_id: {key: value for key, value in vlan_map.items() if key != PACKET_COUNTS}
+                for vlan_id, vlan_map in self.packet_counts.items()
+            }
+        with self.lock:
+            if self._stack_state_data:
+                return False
+            # Proto repeated and map fields are kept in a message serialized as a dict.
+            topo_state = dict(self.topo_state)
+            topo_change = StackTopoChange()
+            if LINKS_GRAPH in topo_state:
+                topo_change.graph.links.extend(topo_state.pop(LINKS_GRAPH))
+            if TOPOLOGY_DPS in topo_state:
+                topo_change.dps.MergeFrom(topo_state.pop(TOPOLOGY_DPS))
+            checkpoint = {
+                'version': CHECKPOINT_VERSION,
+                CHECKPOINT_EVENT_ID: event_id,
+                CHECKPOINT_CONFIG_HASH: config_hash,
+                'switch_states': self.switch_states,
+                'broken_switches': self._broken_switches,
+                'switch_change_count': self._switch_change_count,
+                'switch_last_change': self._switch_last_change,
+                'topo_state': topo_state,
+                'topo_change': proto_dict(topo_change),
+                'learned_macs': self.learned_macs,
+                'packet_counts': packet_counts,
+                'radius_results': self.radius_results,
+            }
+            data = json.dumps(_encode_checkpoint(checkpoint))
+        temp_path = file_path + '.tmp'
+        with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600),
+                       'w') as file:
+            file.write(data)
+        os.replace(temp_path, file_path)
+        self._logger.debug('Saved checkpoint at event #%d', event_id)
+        return True
+
+    def load_checkpoint(self, file_path):
+        """Load a checkpoint saved by save_checkpoint without restoring it"""
+        try:
+            with open(file_path) as file:
+                checkpoint = json.load(file, object_hook=_decode_checkpoint)
+            if checkpoint.get('version') != CHECKPOINT_VERSION:
+                self._logger.warning('Ignoring checkpoint version %s', checkpoint.get('version'))
+                return None
+            checkpoint['topo_change'] = dict_proto(checkpoint['topo_change'], StackTopoChange)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self._logger.warning('Could not load checkpoint %s: %s', file_path, e)
+            return None
+        return checkpoint
+
+    def restore_states_from_checkpoint(self, checkpoint):
+        """Restore internal states from a checkpoint"""
+        self._logger.info('restoring internal state from checkpoint at event #%d',
+                          checkpoint[CHECKPOINT_EVENT_ID])
+        with self._lock:
+            self.packet_counts = checkpoint['packet_counts']
+        with self.lock:
+            self.switch_states = checkpoint['switch_states']
+            self._broken_switches = checkpoint['broken_switches']
+            self._switch_change_count = checkpoint['switch_change_count']
+            self._switch_last_change = checkpoint['switch_last_change']
+            topo_state = checkpoint['topo_state']
+            topo_change = checkpoint['topo_change']
+            if LINKS_HASH in topo_state:
+                topo_state[LINKS_GRAPH] = topo_change.graph.links
+            if TOPOLOGY_DPS_HASH in topo_state:
+                topo_state[TOPOLOGY_DPS] = topo_change.dps
+            self.topo_state = topo_state
+            self.learned_macs = checkpoint['learned_macs']
+            self.radius_results = checkpoint['radius_results']
+        return checkpoint[CHECKPOINT_EVENT_ID]
+
     def _restore_l2_learn_state_from_samples(self, samples):
         self._cleanup_learned_macs()
 
@@ -327,7 +504,7 @@ class FaucetStateCollector:
 
             for sample in cold_reload_samples + warm_reload_samples:
                 dp_id = sample.labels['dp_name']
-                dp_state = self.switch_states.setdefault(dp_id, {})
+                dp_state = self._get_dp_state(dp_id)
                 change_count = dp_state.get(CONFIG_CHANGE_COUNT, 0) + sample.value
                 dp_state[DP_ID] = dp_id
                 dp_state[CONFIG_CHANGE_COUNT] = change_count
@@ -459,12 +636,13 @@ class FaucetStateCollector:
     @_pre_check()
     def get_switch_summary(self):
         """Get summary of switch state"""
-        switch_state = self._get_switch_state(None, None)
+        with self.lock:
+            switch_state = self._get_switch_summary()
         state_summary = StateSummary()
-        state_summary.state = switch_state.switch_state
-        state_summary.detail = switch_state.switch_state_detail
-        state_summary.change_count = switch_state.switch_state_change_count
-        state_summary.last_change = switch_state.switch_state_last_change
+        state_summary.state = switch_state['switch_state']
+        state_summary.detail = switch_state['switch_state_detail'] or ''
+        state_summary.change_count = switch_state['switch_state_change_count']
+        state_summary.last_change = switch_state['switch_state_last_change']
         return state_summary
 
     def _augment_mac_urls(self, url_base, switch_data):
@@ -473,64 +651,61 @@ class FaucetStateCollector:
                 mac_data['url'] = f"{url_base}/?list_hosts?eth_src={mac}"
 
     @_pre_check()
-    def get_switch_state(self, switch, port, url_base=None):
-        """get a set of all switches"""
-        return self._get_switch_state(switch, port, url_base)
+    def get_switch_state(self, query, url_base=None):
+        """get the switches matching a StateQuery"""
+        return self._get_switch_state(query, url_base)
 
-    def _get_switch_state(self, switch, port, url_base=None):
-        """Get switch state impl"""
+    def _get_switch_state(self, query, url_base=None):
+        """Get switch state impl, materializing only the switches on the query page"""
         switches_data = {}
-        broken = []
-        change_count = 0
-        last_change = '#n/a'  # Cleverly chosen to be sorted less than timestamp.
 
-        try:
-            metrics = self._get_gauge_metrics()
-        except Exception as e:
-            self._logger.error("Error fetching metrics from gauge: %s", str(e))
-            return dict_proto({}, SwitchState)
+        with self.lock:
+            result = self._get_switch_summary()
+            if query.switch:
+                if query.switch not in self.switch_states:
+                    raise Exception(f'Unknown switch {query.switch}')
+                switch_names, next_cursor = [query.switch], None
+            else:
+                switch_names, next_cursor = query.page(self.switch_states)
 
-        for switch_name in self.switch_states:
-            arg_port = port if switch_name == switch else None
-            switch_data = self._get_switch(switch_name, arg_port, metrics)
+        metrics = None
+        if switch_names and (query.includes('acls') or query.includes('vlan')):
+            try:
+                metrics = self._get_gauge_metrics()
+            except Exception as e:
+                self._logger.error("Error fetching metrics from gauge: %s", str(e))
+                return dict_proto({}, SwitchState)
+
+        for switch_name in switch_names:
+            switch_data = self._get_switch(switch_name, query, metrics)
             switches_data[switch_name] = switch_data
-            change_count += switch_data.get(SW_STATE_CHANGE_COUNT, 0)
-            last_change = max(last_change, switch_data.get(SW_STATE_LAST_CHANGE, ''))
-            if switch_data[SW_STATE] != STATE_ACTIVE:
-                broken.append(switch_name)
             self._augment_mac_urls(url_base, switch_data)
 
-        result = self._build_switch_state_result(
-                broken, (change_count, last_change, switches_data), switch)
+        result['switches'] = switches_data
+        result['switches_restrict'] = query.switch
+        result['next_cursor'] = next_cursor
 
         return dict_proto(result, SwitchState)
 
-    def _build_switch_state_result(self, broken, state_tuple, switch):
-        change_count, last_change, switches_data = state_tuple
+    def _get_switch_summary(self):
+        """Get overall switch state from the incrementally maintained per-switch status"""
         if not self.switch_states:
             switch_state = State.broken
             state_detail = 'No switches connected'
-        elif broken:
+        elif self._broken_switches:
             switch_state = State.broken
-            state_detail = 'Switches in broken state: ' + ', '.join(broken)
+            state_detail = 'Switches in broken state: ' + ', '.join(sorted(self._broken_switches))
         else:
             switch_state = State.healthy
             state_detail = None
 
-        result = {
+        return {
             'switch_state': switch_state,
             'switch_state_detail': state_detail,
-            'switch_state_change_count': change_count,
-            'switch_state_last_change': last_change,
-            'switches': switches_data
+            'switch_state_change_count': self._switch_change_count,
+            'switch_state_last_change': self._switch_last_change,
         }
 
-        if switch:
-            result['switches'] = {switch: switches_data[switch]}
-            result['switches_restrict'] = switch
-
-        return result
-
     def cleanup(self):
         """Clean up internal data"""
         with self.lock:
@@ -589,17 +764,17 @@ class FaucetStateCollector:
             switch_map_obj[SW_STATE_LAST_CHANGE] = last_change
             return switch_map_obj
 
-    def _get_switch(self, switch_name, port, metrics):
+    def _get_switch(self, switch_name, query, metrics):
         """lock protect get_switch_raw"""
         with self.lock:
-            return self._get_switch_raw(switch_name, port, metrics)
+            return self._get_switch_raw(switch_name, query, metrics)
 
     def _get_switch_config(self, switch_name):
         if switch_name not in self.faucet_config.get(DPS_CFG, {}):
             raise Exception(f'Missing switch configuration for {switch_name}')
         return self.faucet_config[DPS_CFG][switch_name]
 
-    def _get_switch_raw(self, switch_name, port, metrics):
+    def _get_switch_raw(self, switch_name, query, metrics):
         """get switches state"""
         switch_map = {}
 
@@ -620,17 +795,8 @@ class FaucetStateCollector:
         switch_map[SW_STATE_CHANGE_COUNT] = switch_states.get(SW_STATE_CHANGE_COUNT, 0)
 
         # filling port information
-        switch_port_map = switch_map.setdefault('ports', {})
-        if port:
-            port_id = int(port)
-            switch_port_map[port_id] = self._get_port_state(switch_name, port_id)
-            switch_map['ports_restrict'] = port_id
-            self._fill_port_behavior(switch_name, port_id, switch_port_map[port_id], metrics)
-        else:
-            for port_id in switch_states.get(PORTS, {}):
-                switch_port_map[port_id] = self._get_port_state(switch_name, port_id)
-                self._fill_port_behavior(
-                    switch_name, port_id, switch_port_map[port_id], metrics)
+        if query.includes('ports'):
+            self._fill_ports(switch_name, switch_map, query, metrics)
 
         # filling packet rate
         for vlan_id, vlan_states in switch_states.get(VLAN_STATES, {}).items():
@@ -639,12 +805,50 @@ class FaucetStateCollector:
                 vlan_map = switch_map.setdefault('vlans', {}).setdefault(vlan_id, {})
                 vlan_map['packet_rate_state'] = packet_rate_state
 
-        self._fill_learned_macs(switch_name, switch_map)
-        self._fill_path_to_root(switch_name, switch_map)
-        self._fill_switch_vlan_behavior(switch_name, switch_map, metrics)
+        if query.includes('macs'):
+            self._fill_learned_macs(switch_name, switch_map)
+        if query.includes('root_path'):
+            self._fill_path_to_root(switch_name, switch_map)
+        if query.includes('acls'):
+            self._fill_switch_vlan_behavior(switch_name, switch_map, metrics)
 
         return switch_map
 
+    def _fill_ports(self, switch_name, switch_map, query, metrics):
+        """fills the states of the switch ports matching the query"""
+        switch_port_map = switch_map.setdefault('ports', {})
+        port_ids = self.switch_states[switch_name].get(PORTS, {})
+        single_port = query.get_single_port()
+        if single_port:
+            switch_map['ports_restrict'] = single_port
+            port_ids = [single_port] if single_port in port_ids else []
+        for port_id in port_ids:
+            if not self._match_port_query(query, switch_name, port_id):
+                continue
+            switch_port_map[port_id] = self._get_port_state(switch_name, port_id)
+            self._fill_port_behavior(
+                switch_name, port_id, switch_port_map[port_id], metrics, query.exclude)
+
+    def _match_port_query(self, query, switch_name, port_id, mac_state=None):
+        """Check if a port, and the host learned on it if any, pass the query filters"""
+        if not query.match_port(port_id):
+            return False
+        if query.radius and mac_state is not None:
+            if mac_state.get(MAC_RADIUS_RESULT, {}).get(MAC_RADIUS_ACCESS) != query.radius:
+                return False
+        if query.vlan is None and query.dva_state is None:
+            return True
+        dp_config = self.faucet_config.get(DPS_CFG, {}).get(switch_name)
+        port_config = dp_config.ports.get(port_id) if dp_config else None
+        native_vlan = port_config.native_vlan if port_config else None
+        if not native_vlan:
+            return False
+        dva_state = None
+        if query.dva_state is not None:
+            dva_state = self._get_dva_state(switch_name, port_id) or DVAState.initial
+        return ((query.vlan is None or int(native_vlan.vid) == query.vlan) and
+                dva_state == query.dva_state)
+
     def _get_port_state(self, switch: str, port: int):
         """Get port state"""
         # port attributes
@@ -729,7 +933,7 @@ class FaucetStateCollector:
                 samples = metrics['flow_packet_count_vlan_acl'].samples
                 self._fill_acls_behavior(switch_name, acl_maps_list, vlan_config.acls_in, samples)
 
-    def _fill_port_behavior(self, switch_name, port_id, port_map, metrics=None):
+    def _fill_port_behavior(self, switch_name, port_id, port_map, metrics=None, exclude=()):
         dp_config = self.faucet_config.get(DPS_CFG, {}).get(switch_name)
         if not dp_config:
             self._logger.warning('Switch not defined in dps config: %s', switch_name)
@@ -741,11 +945,12 @@ class FaucetStateCollector:
 
         if port_config.native_vlan:
             port_map['dva_state'] = self._get_dva_state(switch_name, port_id) or DVAState.initial
-            vlan_samples = metrics['flow_packet_count_vlan'].samples if metrics else None
-            self._fill_port_vlan_behavior(
-                port_map, switch_name, port_id, port_config.native_vlan, vlan_samples)
+            if 'vlan' not in exclude:
+                vlan_samples = metrics['flow_packet_count_vlan'].samples if metrics else None
+                self._fill_port_vlan_behavior(
+                    port_map, switch_name, port_id, port_config.native_vlan, vlan_samples)
 
-        if port_config.acls_in:
+        if port_config.acls_in and 'acls' not in exclude:
             acl_maps_list = port_map.setdefault('acls', [])
 
             if metrics is None:
@@ -1043,14 +1248,14 @@ class FaucetStateCollector:
                 self._logger.error('Port %s is not in switch config %s', port, name)
                 return
 
-            port_table = self.switch_states\
-                .setdefault(name, {})\
+            port_table = self._get_dp_state(name)\
                 .setdefault(PORTS, {})\
                 .setdefault(port, {})
 
             port_table[PORT_STATE_UP] = state
             port_table[PORT_STATE_TS] = datetime.fromtimestamp(timestamp).isoformat()
             port_table[PORT_STATE_COUNT] = port_table.setdefault(PORT_STATE_COUNT, 0) + 1
+            self._publish_change('port', switch=name, port=port, state_up=state)
 
             port_attr = self._get_port_attributes(name, port)
             if port_attr and port_attr['type'] == 'access':
@@ -1095,6 +1300,7 @@ class FaucetStateCollector:
             if link_state != link.get(LINK_STATE):
                 change_count = change_count + 1
                 link[LINK_STATE] = link_state
+                self._publish_change('egress', switch=name, port=port, link_state=link_state)
 
             state, egress_detail = self._get_egress_state_detail(links)
 
@@ -1144,13 +1350,14 @@ class FaucetStateCollector:
             learning_switch[MAC_LEARNING_TS] = datetime.fromtimestamp(timestamp).isoformat()
 
             # update per switch mac table
-            self.switch_states\
-                .setdefault(name, {})\
+            self._get_dp_state(name)\
                 .setdefault(LEARNED_MACS, set())\
                 .add(mac)
 
             self._logger.info(
                 'Learned %s at %s:%s on vlan %s as %s', mac, name, port, vid, ip_addr)
+            self._publish_change(
+                'host_learned', switch=name, port=port, mac=mac, vid=vid, ip_address=ip_addr)
             port_attr = self._get_port_attributes(name, port)
 
             radius_result = self.radius_results.get(mac)
@@ -1180,6 +1387,7 @@ class FaucetStateCollector:
         with self.lock:
             self._logger.info(
                 'Learned entry %s on vlan %s at %s:%s expired.', mac, expired_vlan, name, port)
+            self._publish_change('host_expired', switch=name, port=port, mac=mac)
 
             port_attr = self._get_port_attributes(name, port)
             if port_attr and port_attr['type'] == 'access':
@@ -1207,12 +1415,13 @@ class FaucetStateCollector:
             if not dp_id:
                 return
 
-            dp_state = self.switch_states.setdefault(dp_name, {})
+            dp_state = self._get_dp_state(dp_name)
             change_count = dp_state.get(CONFIG_CHANGE_COUNT, 0) + 1
             self._logger.info('dp_config #%d %s change type %s', change_count, dp_id, restart_type)
 
             dp_state[DP_ID] = dp_id
             dp_state[CONFIG_CHANGE_COUNT] = change_count
+            self._publish_change('switch_config', switch=dp_name, restart_type=restart_type)
 
     @_dump_states
     @_register_restore_state_method(label_name='dp', metric_name='dp_status')
@@ -1221,7 +1430,7 @@ class FaucetStateCollector:
         with self.lock:
             if not dp_name:
                 return
-            dp_state = self.switch_states.setdefault(dp_name, {})
+            dp_state = self._get_dp_state(dp_name)
             new_state = SWITCH_CONNECTED if connected else SWITCH_DOWN
             if dp_state.get(SW_STATE) != new_state:
                 change_count = dp_state.get(SW_STATE_CHANGE_COUNT, 0) + 1
@@ -1231,19 +1440,47 @@ class FaucetStateCollector:
                 dp_state[SW_STATE] = new_state
                 dp_state[SW_STATE_LAST_CHANGE] = datetime.fromtimestamp(timestamp).isoformat()
                 dp_state[SW_STATE_CHANGE_COUNT] = change_count
+                if connected:
+                    self._broken_switches.discard(dp_name)
+                else:
+                    self._broken_switches.add(dp_name)
+                self._switch_change_count += 1
+                self._switch_last_change = max(
+                    self._switch_last_change, dp_state[SW_STATE_LAST_CHANGE])
+                self._publish_change('switch', switch=dp_name, switch_state=new_state)
+
+    def _get_dp_state(self, dp_name):
+        """Get the states of a switch, adding it as broken until connected if it is new"""
+        dp_state = self.switch_states.get(dp_name)
+        if dp_state is None:
+            dp_state = self.switch_states[dp_name] = {}
+            self._broken_switches.add(dp_name)
+        return dp_state
 
     @_dump_states
     def process_dataplane_config_change(self, timestamp, dps_config):
         """Handle config data sent through event channel """
         with self.lock:
             cfg_state = self.faucet_config
+            old_dps = cfg_state.get(DPS_CFG, {})
+            new_dps = {str(dp): dp for dp in dps_config}
+            changed_dps = {name for name, dp in new_dps.items() if old_dps.get(name) != dp}
+            changed_dps.update(name for name in old_dps if name not in new_dps)
+            if not changed_dps:
+                self._logger.debug('dataplane_config unchanged')
+                return changed_dps
+
             change_count = cfg_state.get(DPS_CFG_CHANGE_COUNT, 0) + 1
-            self._logger.info('dataplane_config #%d change: %r', change_count, dps_config)
-            cfg_state[DPS_CFG] = {str(dp): dp for dp in dps_config}
+            self._logger.info('dataplane_config #%d change: %s', change_count,
+                              sorted(changed_dps))
+            cfg_state[DPS_CFG] = new_dps
             cfg_state[DPS_CFG_CHANGE_TS] = datetime.fromtimestamp(timestamp).isoformat()
             cfg_state[DPS_CFG_CHANGE_COUNT] = change_count
+            self._publish_change('config', config_change_count=change_count,
+                                 switches=sorted(changed_dps))
 
-            self._update_learned_macs_metrics()
+            self._update_learned_macs_metrics(changed_dps)
+            return changed_dps
 
     @_dump_states
     @_register_restore_state_method(label_name='port', metric_name='port_stack_state')
@@ -1258,6 +1495,7 @@ class FaucetStateCollector:
                 self._logger.info(
                     'stack_state_links #%d %s:%d is now %s', link_change_count, dp_name, port,
                     new_state)
+                self._publish_change('stack_link', switch=dp_name, port=port, state=new_state)
 
     @_dump_states
     def process_stack_topo_change_event(self, topo_change):
@@ -1293,6 +1531,7 @@ class FaucetStateCollector:
                 graph_links.sort()
                 self._logger.info(
                     'stack_state_links #%d links: %s', link_change_count, graph_links)
+                self._publish_change('stack_links', links=graph_links)
 
             msg_str = "root %s: %s" % (stack_root, self._list_root_hops(dps))
             prev_msg = topo_state.get(TOPOLOGY_DPS_HASH)
@@ -1304,6 +1543,7 @@ class FaucetStateCollector:
                 topo_state[TOPOLOGY_DPS_HASH] = msg_str
                 topo_state[TOPOLOGY_CHANGE_COUNT] = topo_change_count
                 topo_state[TOPOLOGY_LAST_CHANGE] = datetime.fromtimestamp(timestamp).isoformat()
+                self._publish_change('stack_topology', active_root=stack_root)
 
     def _list_root_hops(self, dps):
         root_hops = ['%s:%d' % (dp, dps[dp].root_hop_port) for dp in dps]
@@ -1316,10 +1556,10 @@ class FaucetStateCollector:
         self.topo_state[LINKS_LAST_CHANGE] = datetime.fromtimestamp(timestamp).isoformat()
         return link_change_count
 
-    def _update_learned_macs_metrics(self):
+    def _update_learned_macs_metrics(self, switches):
         for mac in self.learned_macs:
             switch, port = self._get_access_switch(mac)
-            if switch and port:
+            if switch in switches and port:
                 self._update_learned_macs_metric(mac, switch, port)
 
     def _update_learned_macs_metric(self, mac, switch_name, port, expire=False):
@@ -1364,6 +1604,7 @@ class FaucetStateCollector:
         host_radius[MAC_RADIUS_SEGMENT] = segment
         host_radius[MAC_RADIUS_ROLE] = role
         self.radius_results[mac] = host_radius
+        self._publish_change('host_auth', mac=mac, access=access, segment=segment, role=role)
 
         learned_host = self.learned_macs.get(mac)
         if not learned_host:
@@ -1385,48 +1626,66 @@ class FaucetStateCollector:
         return self._make_summary(State.healthy, f'{num_hosts} learned host MACs')
 
     @_pre_check()
-    def get_list_hosts(self, url_base, src_mac):
-        """Get access devices"""
+    def get_list_hosts(self, url_base, src_mac, query=None):
+        """Get access devices matching a StateQuery"""
+        query = query or StateQuery()
         host_macs = {}
         if src_mac and src_mac not in self.learned_macs:
             error_msg = 'MAC address cannot be found. Please use list_hosts to get a list of hosts'
             return self._make_summary(State.broken, error_msg)
-        for mac, mac_state in self.learned_macs.items():
-            if src_mac and mac == src_mac:
-                continue
-            switch, port = self._get_access_switch(mac)
-            if not switch or not port:
-                continue
-            mac_deets = host_macs.setdefault(mac, {})
-            mac_deets['switch'] = switch
-            mac_deets['port'] = port
-            mac_deets['host_ips'] = list(mac_state.get(MAC_LEARNING_IP, []))
 
+        access_ports, next_cursor = self._page_hosts(query, src_mac)
+
+        metrics = None
+        if access_ports and (query.includes('acls') or query.includes('vlan')):
             try:
                 metrics = self._get_gauge_metrics()
             except Exception as e:
                 self._logger.error("Error fetching metrics from gauge: %s", str(e))
                 return dict_proto({}, HostList)
 
-            self._fill_port_behavior(switch, port, mac_deets, metrics)
+        for mac, (switch, port) in access_ports.items():
+            mac_deets = host_macs.setdefault(mac, {})
+            mac_deets['switch'] = switch
+            mac_deets['port'] = port
+            mac_deets['host_ips'] = list(self.learned_macs[mac].get(MAC_LEARNING_IP, []))
+
+            self._fill_port_behavior(switch, port, mac_deets, metrics, query.exclude)
 
-            if MAC_RADIUS_RESULT in mac_state:
-                mac_deets[MAC_RADIUS_RESULT] = mac_state[MAC_RADIUS_RESULT]
+            if MAC_RADIUS_RESULT in self.learned_macs[mac]:
+                mac_deets[MAC_RADIUS_RESULT] = self.learned_macs[mac][MAC_RADIUS_RESULT]
 
             if src_mac:
-                url = f"{url_base}/?host_path?eth_src={src_mac}&eth_dst={mac}"
+                mac_deets['url'] = f"{url_base}/?host_path?eth_src={src_mac}&eth_dst={mac}"
             else:
-                url = f"{url_base}/?list_hosts?eth_src={mac}"
-            mac_deets['url'] = url
+                mac_deets['url'] = f"{url_base}/?list_hosts?eth_src={mac}"
 
-        key = 'eth_dsts' if src_mac else 'eth_srcs'
         egress_url = f"{url_base}?host_path?eth_src={src_mac}&to_egress=true" if src_mac else None
 
         return dict_proto({
-            key: host_macs,
+            'eth_dsts' if src_mac else 'eth_srcs': host_macs,
             'egress_url': egress_url,
+            'next_cursor': next_cursor,
         }, HostList)
 
+    def _page_hosts(self, query, src_mac):
+        """Return ({mac: (access switch, port)} of the page of hosts, next cursor)"""
+        access_ports = {}
+
+        def match_host(mac):
+            if src_mac and mac == src_mac:
+                return False
+            switch, port = self._get_access_switch(mac)
+            if not switch or not port or not query.match_switch(switch):
+                return False
+            if not self._match_port_query(query, switch, port, self.learned_macs[mac]):
+                return False
+            access_ports[mac] = (switch, port)
+            return True
+
+        macs, next_cursor = query.page(self.learned_macs, match_host)
+        return {mac: access_ports[mac] for mac in macs}, next_cursor
+
     def _get_port_attributes(self, switch, port):
         """Get the attributes of a port: description, type, peer_switch, peer_port"""
         cfg_switch = self._get_switch_config(switch)
@@ -1494,6 +1753,14 @@ class FaucetStateCollector:
         """set object that handles forch varz metrics exposure"""
         self._forch_metrics = forch_metrics
 
+    def set_change_stream(self, change_stream):
+        """Set ChangeStream to publish state changes to"""
+        self._change_stream = change_stream
+
+    def _publish_change(self, change_type, **fields):
+        if self._change_stream:
+            self._change_stream.publish('faucet', change_type, **fields)
+
     def set_device_state_reporter(self, device_state_reporter):
         """set object that processes and reports device related states"""
         self._device_state_reporter = device_state_reporter
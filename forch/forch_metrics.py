@@ -3,12 +3,14 @@
 import abc
 import functools
 import threading
-from prometheus_client import Counter, Gauge, Info, generate_latest, REGISTRY
+from prometheus_client import Counter, Gauge, Histogram, Info, generate_latest, REGISTRY
 
 from forch.http_server import HttpServer
 from forch.utils import get_logger
 
 DEFAULT_VARZ_PORT = 8302
+_SIZE_BUCKETS = (1e3, 1e4, 1e5, 3e5, 1e6, 3e6, 1e7, 3e7, float('inf'))
+_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 1000, float('inf'))
 
 
 class ForchMetrics():
@@ -68,9 +70,19 @@ class ForchMetrics():
                 % (var, type(varz))
             raise RuntimeError(error_str)
 
-    def _add_var(self, var, var_help, metric_type, labels=()):
+    def observe_var(self, var, value, labels=None):
+        """Observe value of Histogram variables"""
+        varz = self._get_varz(var, labels)
+        if isinstance(varz, Histogram):
+            varz.observe(value)
+        else:
+            error_str = 'Error observing varz %s since it\'s type %s is not known.' \
+                % (var, type(varz))
+            raise RuntimeError(error_str)
+
+    def _add_var(self, var, var_help, metric_type, labels=(), **kwargs):
         """Add varz to be tracked"""
-        self._metrics[var] = metric_type(var, var_help, labels, registry=self._reg)
+        self._metrics[var] = metric_type(var, var_help, labels, registry=self._reg, **kwargs)
 
     def _add_vars(self):
         """Initializing list of vars to be tracked"""
@@ -83,7 +95,44 @@ class ForchMetrics():
                       'No. of RADIUS query accepts received from server', Counter)
         self._add_var('radius_query_rejects',
                       'No. of RADIUS query rejects received from server', Counter)
+        self._add_var('radius_decision_cache_hits',
+                      'No. of host learns authorized from the RADIUS decision cache', Counter)
+        self._add_var('radius_decision_cache_misses',
+                      'No. of host learns not found in the RADIUS decision cache', Counter)
+        self._add_var('radius_server_requests',
+                      'No. of RADIUS requests sent to server', Counter, labels=['server'])
+        self._add_var('radius_server_timeouts',
+                      'No. of RADIUS requests to server that timed out', Counter, labels=['server'])
+        self._add_var('radius_server_outstanding',
+                      'No. of RADIUS requests waiting for server', Gauge, labels=['server'])
+        self._add_var('radius_server_latency_sec',
+                      'Moving average of RADIUS server response time', Gauge, labels=['server'])
+        self._add_var('radius_server_up',
+                      'If RADIUS server is in rotation', Gauge, labels=['server'])
         self._add_var('process_state', 'Current process state', Gauge, labels=['process'])
+        self._add_var('local_check_duration_sec', 'Time to run a local state check', Histogram,
+                      labels=['check'])
+        self._add_var('local_check_overruns',
+                      'No. of local state check runs skipped by a check running late', Counter,
+                      labels=['check'])
+        self._add_var('http_active_connections',
+                      'No. of API connections being served by workers', Gauge)
+        self._add_var('http_queue_wait_sec',
+                      'Time API connections waited for a worker', Histogram)
+        self._add_var('http_request_latency_sec',
+                      'Time to serve API requests', Histogram, labels=['route'])
+        self._add_var('http_pool_rejects',
+                      'No. of API connections rejected with all workers busy', Counter)
+        self._add_var('http_route_rejects',
+                      'No. of API requests rejected over the route concurrency limit', Counter,
+                      labels=['route'])
+
+        self._add_var('varz_scrape_duration_sec',
+                      'Time to scrape and parse Faucet and Gauge varz', Histogram,
+                      labels=['endpoint'])
+        self._add_var('varz_scrape_size_bytes',
+                      'Size of scraped Faucet and Gauge varz responses', Histogram,
+                      labels=['endpoint'], buckets=_SIZE_BUCKETS)
 
         learned_l2_port_help_text = 'learned port of l2 entries'
         learned_l2_port_labels = ['dp_name', 'eth_src', 'vid']
@@ -102,6 +151,14 @@ class ForchMetrics():
         self._add_var(
             'faucet_event_out_of_sequence_count',
             'Number of times Faucet event becomes out of sequence', Counter)
+        self._add_var(
+            'faucet_event_gap_size', 'Number of Faucet events missed in a sequence gap',
+            Histogram, buckets=_COUNT_BUCKETS)
+        self._add_var(
+            'faucet_state_resync_sec', 'Time to resync state after a Faucet event gap', Histogram)
+        self._add_var(
+            'faucet_state_resync_changes', 'Number of state differences applied by a resync',
+            Histogram, buckets=_COUNT_BUCKETS)
 
         self._add_var(
             'unconfigured_port_event', 'No. of Faucet events received for unconfigured port',
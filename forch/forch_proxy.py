@@ -1,14 +1,159 @@
 """Module for proxy server to aggregate and serve data"""
 
+from concurrent.futures import Future, ThreadPoolExecutor
 import functools
+import http.client
 import threading
-import urllib.request
+import time
 
 from forch.http_server import HttpServer
 from forch.utils import get_logger
 
 DEFAULT_PROXY_PORT = 8080
 DEFAULT_SERVER_ADDRESS = '127.0.0.1'
+DEFAULT_TIMEOUT_SEC = 5
+AGGREGATE_PATH = 'aggregate'
+_FAMILY_SUFFIXES = (b'', b'_bucket', b'_count', b'_sum', b'_total', b'_created', b'_info')
+
+
+def _get_name_end(line):
+    name_end = len(line)
+    for separator in (b'{', b' '):
+        index = line.find(separator)
+        if 0 <= index < name_end:
+            name_end = index
+    return name_end
+
+
+def _add_target_label(line, name_end, label):
+    if line[name_end:name_end + 1] == b'{':
+        rest = line[name_end + 1:]
+        return line[:name_end + 1] + label + (b'' if rest.startswith(b'}') else b',') + rest
+    return line[:name_end] + b'{' + label + b'}' + line[name_end:]
+
+
+def merge_expositions(expositions):
+    """Merge (target, body) Prometheus text expositions, labelling each sample by target
+
+    Samples of a metric family are grouped together across targets under a single
+    HELP and TYPE line, as the exposition format requires.
+    """
+    families = {}
+    for target, body in expositions:
+        label = b'target="%s"' % target.encode()
+        family_name, family = None, None
+        for line in body.splitlines():
+            if line.startswith(b'#'):
+                parts = line.split(None, 3)
+                if len(parts) >= 3 and parts[1] in (b'HELP', b'TYPE'):
+                    family_name = parts[2]
+                    family = families.setdefault(family_name, ({}, []))
+                    family[0].setdefault(parts[1], line)
+                continue
+            if not line.strip():
+                continue
+            name_end = _get_name_end(line)
+            name = line[:name_end]
+            if (family is None or not name.startswith(family_name) or
+                    name[len(family_name):] not in _FAMILY_SUFFIXES):
+                family_name = name
+                family = families.setdefault(family_name, ({}, []))
+            family[1].append(_add_target_label(line, name_end, label))
+
+    lines = []
+    for headers, samples in families.values():
+        lines.extend(headers[kind] for kind in (b'HELP', b'TYPE') if kind in headers)
+        lines.extend(samples)
+    lines.append(b'')
+    return b'\n'.join(lines)
+
+
+class ProxyTargetClient:
+    """Client of a proxy target over a persistent connection, caching responses for a TTL
+
+    A TTL of 0 disables the cache. Concurrent requests while a fetch is in flight wait for
+    its result instead of sending their own.
+    """
+
+    def __init__(self, server, port, timeout_sec, cache_ttl_sec):
+        self._server = server
+        self._port = port
+        self._timeout_sec = timeout_sec
+        self._cache_ttl_sec = cache_ttl_sec
+        self._idle_connections = []
+        self._cached_body = None
+        self._cache_expiry = 0
+        self._in_flight = None
+        self._lock = threading.Lock()
+
+    def get_url(self):
+        """Get the URL of the target"""
+        return 'http://%s:%s' % (self._server, self._port)
+
+    def get(self):
+        """Get the target response body, from cache or a single in-flight fetch"""
+        with self._lock:
+            if (self._cache_ttl_sec > 0 and self._cached_body is not None and
+                    time.monotonic() < self._cache_expiry):
+                return self._cached_body
+            in_flight = self._in_flight
+            if not in_flight:
+                in_flight = self._in_flight = Future()
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            return in_flight.result()
+
+        try:
+            body = self._fetch()
+            with self._lock:
+                self._cached_body = body
+                self._cache_expiry = time.monotonic() + self._cache_ttl_sec
+            in_flight.set_result(body)
+            return body
+        except Exception as e:
+            in_flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight = None
+
+    def close(self):
+        """Close idle connections"""
+        with self._lock:
+            connections, self._idle_connections = self._idle_connections, []
+        for connection in connections:
+            connection.close()
+
+    def _get_connection(self):
+        with self._lock:
+            if self._idle_connections:
+                return self._idle_connections.pop(), True
+        return http.client.HTTPConnection(
+            self._server, self._port, timeout=self._timeout_sec), False
+
+    def _fetch(self):
+        while True:
+            connection, reused = self._get_connection()
+            try:
+                connection.request('GET', '/')
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                # An idle connection may have been closed by the target, so retry on a new one.
+                if reused:
+                    continue
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                with self._lock:
+                    self._idle_connections.append(connection)
+            if response.status != http.HTTPStatus.OK:
+                raise http.client.HTTPException(f'HTTP status {response.status}')
+            return body
 
 
 class ForchProxy():
@@ -20,11 +165,14 @@ class ForchProxy():
         self._pages = {}
         self._proxy_server = None
         self._content_type = content_type
+        self._executor = None
         self._logger = get_logger('proxy')
 
     def start(self):
         """Start proxy server"""
         self._register_pages()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, len(self._pages)), thread_name_prefix='proxy')
         self._proxy_server = HttpServer(self._proxy_port, content_type=self._content_type)
         try:
             self._proxy_server.map_request('', self._get_path_data)
@@ -38,12 +186,14 @@ class ForchProxy():
         """Kill server"""
         self._logger.info('Stopping proxy server')
         self._proxy_server.stop_server()
-
-    def _get_url(self, server, port):
-        return 'http://' + str(server) + ':' + str(port)
+        self._executor.shutdown(wait=False)
+        for client in self._pages.values():
+            client.close()
 
     def _register_page(self, path, server, port):
-        self._pages[path] = self._get_url(server, port)
+        self._pages[path] = ProxyTargetClient(
+            server, port, self._proxy_config.timeout_sec or DEFAULT_TIMEOUT_SEC,
+            self._proxy_config.cache_ttl_sec)
 
     def _register_pages(self):
         for name, target in self._proxy_config.targets.items():
@@ -54,18 +204,34 @@ class ForchProxy():
         help_str = 'Following paths are supported:\n\n\t'
         for target in self._proxy_config.targets:
             help_str += '/' + target + '\n\t'
+        if AGGREGATE_PATH not in self._proxy_config.targets:
+            help_str += '/' + AGGREGATE_PATH + '\n\t'
         return help_str
 
     def _get_path_data(self, path, params):
         path = '/'.join(path.split('/')[1:])
-        url = self._pages.get(path)
-        if not url:
+        client = self._pages.get(path)
+        if not client:
+            if path == AGGREGATE_PATH:
+                return self._get_aggregate_data()
             return self._get_proxy_help()
         try:
-            with urllib.request.urlopen(url) as response:
-                return response.read().decode('utf-8')
+            return client.get()
         except Exception as e:
-            return 'Error retrieving data from url %s: %s' % (url, str(e))
+            return 'Error retrieving data from url %s: %s' % (client.get_url(), str(e))
+
+    def _get_aggregate_data(self):
+        futures = {name: self._executor.submit(client.get) for name, client in self._pages.items()}
+        expositions = []
+        errors = []
+        for name, future in futures.items():
+            try:
+                expositions.append((name, future.result()))
+            except Exception as e:
+                self._logger.error('Error retrieving data from target %s: %s', name, e)
+                errors.append(b'# Error retrieving data from target %s: %s\n' % (
+                    name.encode(), str(e).encode()))
+        return b''.join(errors) + merge_expositions(expositions)
 
     def _show_error(self, error, path, params):
         """Display errors"""
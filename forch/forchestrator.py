@@ -3,6 +3,7 @@
 # pylint: disable=too-many-lines,too-many-public-methods
 from datetime import datetime
 import functools
+import http
 import os
 import threading
 import time
@@ -15,18 +16,19 @@ from forch.base_classes import OrchestrationManager
 import forch.faucet_event_client
 import forch.faucetizer as faucetizer
 
-from forch.authenticator import Authenticator
+from forch.change_stream import STREAM_FILTERS, ChangeStream
 from forch.cpn_state_collector import CPNStateCollector
-from forch.device_report_client import DeviceReportClient
-from forch.endpoint_handler import EndpointHandler
-from forch.file_change_watcher import FileChangeWatcher
-from forch.faucet_state_collector import FaucetStateCollector
+from forch.faucet_state_collector import (
+    CHECKPOINT_CONFIG_HASH, CHECKPOINT_EVENT_ID, FaucetStateCollector)
 from forch.forch_metrics import ForchMetrics, VarzUpdater
 from forch.forch_proxy import ForchProxy
 from forch.heartbeat_scheduler import HeartbeatScheduler
+from forch.http_server import HttpException, StreamingResponse
 from forch.local_state_collector import LocalStateCollector
 from forch.port_state_manager import PortStateManager
-from forch.varz_state_collector import VarzStateCollector
+from forch.startup_sequencer import StartupSequencer, wait_until_ready
+from forch.state_query import StateQuery
+from forch.varz_state_collector import VarzStateCollector, get_backoff_sec
 from forch.utils import (
     get_logger, proto_dict, yaml_content_proto, FaucetEventOrderError, MetricsFetchingError)
 
@@ -50,6 +52,8 @@ _DEFAULT_FAUCET_PROM_PORT = 9302
 _GAUGE_PROM_HOST = '127.0.0.1'
 _DEFAULT_GAUGE_PROM_PORT = 9303
 _DEFAULT_CONFIG_HASH_VERIFICATION_TIMEOUT_SEC = 30
+_DEFAULT_CHECKPOINT_INTERVAL_SEC = 10
+_VARZ_CONFIG_TIMEOUT_SEC = 100
 
 _TARGET_FAUCET_METRICS = (
     'port_status',
@@ -67,6 +71,11 @@ _TARGET_FAUCET_METRICS = (
     'ryu_config'
 )
 
+_FAUCET_HORIZON_METRICS = (
+    'faucet_config_hash_info',
+    'faucet_event_id'
+)
+
 _TARGET_GAUGE_METRICS = (
     'flow_packet_count_vlan_acl',
     'flow_packet_count_port_acl',
@@ -112,6 +121,7 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
         self._config_file_watcher = None
         self._faucet_state_scheduler = None
         self._gauge_metrics_scheduler = None
+        self._checkpoint_scheduler = None
         self._device_report_handler = None
         self._port_state_manager = None
 
@@ -128,25 +138,31 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
         self._faucet_config_summary = SystemState.FaucetConfigSummary()
         self._metrics = None
         self._varz_proxy = None
+        self._change_stream = ChangeStream()
 
         self._last_faucet_config_writing_time = None
         self._last_received_faucet_config_hash = None
+        self._faucet_config_cache = None
         self._config_hash_verification_timeout_sec = (
             self._config.event_client.config_hash_verification_timeout_sec or
             _DEFAULT_CONFIG_HASH_VERIFICATION_TIMEOUT_SEC)
 
+        self._startup_sequencer = StartupSequencer()
+        self._faucet_connect_retries = 0
+
         self._states_lock = threading.Lock()
         self._timer_lock = threading.Lock()
         self._logger = get_logger('forch')
 
     def initialize(self):
         """Initialize forchestrator instance"""
+        startup = self._startup_sequencer
         self._should_enable_faucetizer = self._calculate_orchestration_config()
 
         self._metrics = ForchMetrics(self._config.varz_interface)
-        self._metrics.start()
+        startup.run('metrics', self._metrics.start)
 
-        self._varz_collector = VarzStateCollector()
+        self._varz_collector = VarzStateCollector(metrics=self._metrics)
         self._faucet_collector = FaucetStateCollector(
             self._config, is_faucetizer_enabled=self._should_enable_faucetizer)
         self._faucet_collector.set_placement_callback(self._process_device_placement)
@@ -157,6 +173,7 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
             (lambda switch, port: self._port_state_manager.get_dva_state(switch, port)
              if self._port_state_manager else None))
         self._faucet_collector.set_forch_metrics(self._metrics)
+        self._faucet_collector.set_change_stream(self._change_stream)
         self._faucet_state_scheduler = HeartbeatScheduler(interval_sec=1)
         self._faucet_state_scheduler.add_callback(
             self._faucet_collector.heartbeat_update_stack_state)
@@ -166,9 +183,14 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
         if gauge_metrics_interval_sec:
             self._initialize_gauge_metrics_scheduler(gauge_metrics_interval_sec)
 
+        if self._config.event_client.checkpoint_file:
+            self._initialize_checkpoint_scheduler()
+
         self._local_collector = LocalStateCollector(
             self._config.process, self.cleanup, self.handle_active_state, metrics=self._metrics)
         self._cpn_collector = CPNStateCollector(self._config.cpn_monitoring)
+        self._local_collector.set_change_stream(self._change_stream)
+        self._cpn_collector.set_change_stream(self._change_stream)
 
         faucet_prom_port = os.getenv('FAUCET_PROM_PORT', str(_DEFAULT_FAUCET_PROM_PORT))
         self._faucet_prom_endpoint = f"http://{_FAUCET_PROM_HOST}:{faucet_prom_port}"
@@ -176,38 +198,40 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
         gauge_prom_port = os.getenv('GAUGE_PROM_PORT', str(_DEFAULT_GAUGE_PROM_PORT))
         self._gauge_prom_endpoint = f"http://{_GAUGE_PROM_HOST}:{gauge_prom_port}"
 
-        self._initialize_orchestration()
-
         self._logger.info('Attaching event channel...')
         self._faucet_events = forch.faucet_event_client.FaucetEventClient(
             self._config.event_client)
-        self._local_collector.initialize()
-        self._cpn_collector.initialize()
         self._logger.info('Using peer controller %s', self._get_peer_controller_url())
 
+        # Subsystems independent of orchestration come up while it is initialized.
+        startup.submit('faucet_varz', self._wait_for_varz_config)
+        startup.submit('local_collector', self._local_collector.initialize)
+        startup.submit('cpn_collector', self._cpn_collector.initialize)
         if str(self._config.proxy_server):
             self._varz_proxy = ForchProxy(self._config.proxy_server, content_type='text/plain')
-            self._varz_proxy.start()
-
-        self._validate_config_files()
-
-        varz_retry = 10
-        while varz_retry > 0:
-            time.sleep(10)
-            try:
-                self._get_varz_config()
-                break
-            except Exception as e:
-                self._logger.error('Waiting for varz config: %s', e)
-                varz_retry -= 1
+            startup.submit('varz_proxy', self._varz_proxy.start)
 
-        if varz_retry == 0:
-            raise MetricsFetchingError('Could not get Faucet varz metrics')
+        try:
+            startup.run('config_files', self._validate_config_files)
+            startup.run('orchestration', self._initialize_orchestration)
+            if self._device_report_handler:
+                startup.submit('device_report', self._device_report_handler.start)
+        finally:
+            startup.wait()
 
         self._register_handlers()
         self._start()
         self._initialized = True
 
+    def _wait_for_varz_config(self):
+        def get_varz_config():
+            return self._get_varz_config(self._varz_collector.get_metrics(
+                self._faucet_prom_endpoint, _FAUCET_HORIZON_METRICS))
+        try:
+            wait_until_ready(get_varz_config, _VARZ_CONFIG_TIMEOUT_SEC, 'Faucet varz config')
+        except TimeoutError as e:
+            raise MetricsFetchingError(f'Could not get Faucet varz metrics: {e}') from e
+
     def _initialize_orchestration(self):
         sequester_config = self._calculate_sequester_config()
 
@@ -251,6 +275,11 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
             self._faucetizer.flush_behavioral_config(force=True)
 
     def _create_device_report_handler(self):
+        # Device reporting needs grpc and the DAQ protos, so it is only loaded when sequestering.
+        # pylint: disable=import-outside-toplevel
+        from forch.device_report_client import DeviceReportClient
+        from forch.endpoint_handler import EndpointHandler
+
         sequester_config = self._config.orchestration.sequester_config
         address = sequester_config.service_address or _DEFAULT_SERVER_ADDRESS
         port = sequester_config.service_port or _DEFAULT_SERVER_PORT
@@ -270,6 +299,7 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
         if not orch_config.HasField('auth_config'):
             return
         self._logger.info('Initializing authenticator')
+        from forch.authenticator import Authenticator  # pylint: disable=import-outside-toplevel
         self._authenticator = Authenticator(orch_config.auth_config,
                                             self._handle_auth_result,
                                             metrics=self._metrics)
@@ -449,6 +479,8 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
                 f'{self._behavioral_config_file}')
 
     def _initialize_faucetizer(self, sequester_segment=None):
+        # pylint: disable=import-outside-toplevel
+        from forch.file_change_watcher import FileChangeWatcher
         orch_config = self._config.orchestration
 
         self._config_file_watcher = FileChangeWatcher(
@@ -492,6 +524,12 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
         self._gauge_metrics_scheduler = HeartbeatScheduler(interval_sec=interval_sec)
         self._gauge_metrics_scheduler.add_callback(heartbeat_update_packet_count)
 
+    def _initialize_checkpoint_scheduler(self):
+        interval_sec = (self._config.event_client.checkpoint_interval_sec or
+                        _DEFAULT_CHECKPOINT_INTERVAL_SEC)
+        self._checkpoint_scheduler = HeartbeatScheduler(interval_sec=interval_sec)
+        self._checkpoint_scheduler.add_callback(self._save_checkpoint)
+
     def reregister_include_file_watchers(self, old_include_files, new_include_files):
         """reregister the include file watchers"""
         self._config_file_watcher.unregister_file_callbacks(old_include_files)
@@ -546,9 +584,10 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
 
         self._faucet_events.register_handlers(handlers)
 
-    def _get_varz_config(self):
-        metrics = self._varz_collector.retry_get_metrics(
-            self._faucet_prom_endpoint, _TARGET_FAUCET_METRICS)
+    def _get_varz_config(self, metrics=None):
+        if metrics is None:
+            metrics = self._varz_collector.retry_get_metrics(
+                self._faucet_prom_endpoint, _TARGET_FAUCET_METRICS)
         varz_hash_info = metrics['faucet_config_hash_info']
         assert len(varz_hash_info.samples) == 1, 'exactly one config hash info not found'
         varz_config_hashes = varz_hash_info.samples[0].labels['hashes']
@@ -565,15 +604,69 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
         # loss of events inbetween.
         assert self._faucet_events.event_socket_connected, 'restore states without connection'
 
-        # Restore config first before restoring all state from varz.
+        # A checkpoint only needs the event id and config hash from varz to be validated.
+        checkpoint = self._load_checkpoint()
+        target_metrics = _FAUCET_HORIZON_METRICS if checkpoint else _TARGET_FAUCET_METRICS
+
+        # Scrape varz in the background while the Faucet config is parsed, but restore config
+        # first before restoring all state from varz.
+        varz_future = self._varz_collector.submit_get_metrics(
+            self._faucet_prom_endpoint, target_metrics)
+        faucet_config = self._get_faucet_config()
+        metrics, varz_config_hashes = self._get_varz_config(varz_future.result())
+
+        if checkpoint and self._is_checkpoint_current(checkpoint, metrics, varz_config_hashes):
+            event_horizon = self._faucet_collector.restore_states_from_checkpoint(checkpoint)
+            self._restore_faucet_config(time.time(), varz_config_hashes, faucet_config)
+        else:
+            if checkpoint:
+                metrics, varz_config_hashes = self._get_varz_config()
+            self._restore_faucet_config(time.time(), varz_config_hashes, faucet_config)
+            event_horizon = self._faucet_collector.restore_states_from_metrics(metrics)
+
+        self._faucet_events.set_event_horizon(event_horizon)
+
+    def _resync_states(self):
+        # The event socket is still connected on a sequence gap, so only differences with varz
+        # are applied, and the Faucet config is only parsed again if it has changed.
+        start = time.monotonic()
         metrics, varz_config_hashes = self._get_varz_config()
-        self._restore_faucet_config(time.time(), varz_config_hashes)
+        if varz_config_hashes != self._last_received_faucet_config_hash:
+            self._restore_faucet_config(time.time(), varz_config_hashes)
 
-        event_horizon = self._faucet_collector.restore_states_from_metrics(metrics)
+        event_horizon, changes = self._faucet_collector.resync_states_from_metrics(metrics)
         self._faucet_events.set_event_horizon(event_horizon)
+        if self._metrics:
+            self._metrics.observe_var('faucet_state_resync_sec', time.monotonic() - start)
+            self._metrics.observe_var('faucet_state_resync_changes', changes)
+
+    def _load_checkpoint(self):
+        checkpoint_file = self._config.event_client.checkpoint_file
+        return self._faucet_collector.load_checkpoint(checkpoint_file) if checkpoint_file else None
+
+    def _is_checkpoint_current(self, checkpoint, metrics, varz_config_hashes):
+        event_id = int(metrics['faucet_event_id'].samples[0].value)
+        checkpoint_event_id = checkpoint[CHECKPOINT_EVENT_ID]
+        if checkpoint_event_id != event_id:
+            self._logger.info('Checkpoint at event #%d is not at event horizon #%d',
+                              checkpoint_event_id, event_id)
+            return False
+        if checkpoint[CHECKPOINT_CONFIG_HASH] != varz_config_hashes:
+            self._logger.info('Checkpoint config hash does not match')
+            return False
+        return True
 
-    def _restore_faucet_config(self, timestamp, config_hash):
-        config_info, faucet_dps, behavioral_config = self._get_faucet_config()
+    def _save_checkpoint(self):
+        if not self._faucet_events or not self._faucet_events.event_socket_connected:
+            return
+        checkpoint_file = self._config.event_client.checkpoint_file
+        self._faucet_events.run_at_event_horizon(
+            lambda event_id: self._faucet_collector.save_checkpoint(
+                checkpoint_file, event_id, self._last_received_faucet_config_hash))
+
+    def _restore_faucet_config(self, timestamp, config_hash, faucet_config=None):
+        config_info, faucet_dps, behavioral_config = (
+            faucet_config or self._get_cached_faucet_config(config_hash))
         self._behavioral_config = behavioral_config
         self._update_config_warning_varz()
 
@@ -611,15 +704,18 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
             self._last_faucet_config_writing_time = time.time()
 
     def _faucet_events_connect(self):
+        if self._faucet_connect_retries:
+            time.sleep(get_backoff_sec(self._faucet_connect_retries - 1))
         self._logger.info('Attempting faucet event sock connection...')
-        time.sleep(1)
         try:
             self._faucet_events.connect()
             self._restore_states()
             self._faucet_collector.set_state_restored(True)
+            self._faucet_connect_retries = 0
         except Exception as e:
             self._logger.error("Cannot restore states or connect to faucet: %s", str(e))
             self._faucet_collector.set_state_restored(False, e)
+            self._faucet_connect_retries += 1
 
     def main_loop(self):
         """Main event processing loop"""
@@ -639,7 +735,8 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
                     self._logger.error("Faucet event order error: %s", e)
                     if self._metrics:
                         self._metrics.inc_var('faucet_event_out_of_sequence_count')
-                    self._restore_states()
+                        self._metrics.observe_var('faucet_event_gap_size', e.gap)
+                    self._resync_states()
         except KeyboardInterrupt:
             self._logger.info('Keyboard interrupt. Exiting.')
             self._faucet_events.disconnect()
@@ -658,10 +755,10 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
             self._faucet_state_scheduler.start()
         if self._gauge_metrics_scheduler:
             self._gauge_metrics_scheduler.start()
+        if self._checkpoint_scheduler:
+            self._checkpoint_scheduler.start()
         if self._metrics:
             self._metrics.update_var('forch_version', {'version': __version__})
-        if self._device_report_handler:
-            self._device_report_handler.start()
 
     def stop(self):
         """Stop forchestrator components"""
@@ -669,6 +766,11 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
             self._faucetize_scheduler.stop()
         if self._faucet_state_scheduler:
             self._faucet_state_scheduler.stop()
+        if self._checkpoint_scheduler:
+            self._checkpoint_scheduler.stop()
+            self._save_checkpoint()
+        if self._local_collector:
+            self._local_collector.stop()
         if self._authenticator:
             self._authenticator.stop()
         if self._config_file_watcher:
@@ -677,6 +779,8 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
             self._metrics.stop()
         if self._varz_proxy:
             self._varz_proxy.stop()
+        if self._varz_collector:
+            self._varz_collector.stop()
         if self._device_report_handler:
             self._device_report_handler.stop()
 
@@ -695,6 +799,10 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
         self._logger.info('Local controller is at %s on %s', info[0], info[1])
         return int(info[1])
 
+    def get_metrics(self):
+        """Get the ForchMetrics of this instance"""
+        return self._metrics
+
     def _make_controller_url(self, info):
         return f'http://{info[0]}:{info[1]}'
 
@@ -888,11 +996,20 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
             for warning, message in self._validate_config(top_conf):
                 self._logger.warning('Config warning %s: %s', warning, message)
                 self._faucet_config_summary.warnings[warning] = message
-            return config_hash_info, new_dps, top_conf
+            faucet_config = (config_hash_info, new_dps, top_conf)
+            self._faucet_config_cache = (config_hash_info['hashes'], faucet_config)
+            return faucet_config
         except Exception as e:
             self._logger.error('Cannot read faucet config: %s', e)
             raise
 
+    def _get_cached_faucet_config(self, config_hash):
+        # Faucet sends a config change event per DP, all with the hashes of the same config.
+        faucet_config_cache = self._faucet_config_cache
+        if faucet_config_cache and faucet_config_cache[0] == config_hash:
+            return faucet_config_cache[1]
+        return self._get_faucet_config()
+
     def _validate_config(self, config):
         warnings = []
         faucet_dp_macs = set()
@@ -974,7 +1091,10 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
             return
 
         sys_auth_mode = AuthMode.Mode.Name(self._get_sys_auth_mode())
-        self._metrics.update_var('system_initialization', {'auth_mode': sys_auth_mode})
+        initialization = {'auth_mode': sys_auth_mode}
+        for phase, duration in self._startup_sequencer.get_timings().items():
+            initialization[f'startup_{phase}_sec'] = '%.3f' % duration
+        self._metrics.update_var('system_initialization', initialization)
 
     def cleanup(self):
         """Clean up relevant internal data in all collectors"""
@@ -985,12 +1105,18 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
         with self._active_state_lock:
             self._active_state = active_state
 
+    @staticmethod
+    def _get_state_query(params):
+        try:
+            return StateQuery(params)
+        except ValueError as e:
+            raise HttpException(f'Invalid query: {e}', http.HTTPStatus.BAD_REQUEST) from e
+
     def get_switch_state(self, path, params):
         """Get the state of the switches"""
-        switch = params.get('switch')
-        port = params.get('port')
+        query = self._get_state_query(params)
         host = self._extract_url_base(path)
-        reply = self._faucet_collector.get_switch_state(switch, port, host)
+        reply = self._faucet_collector.get_switch_state(query, host)
         return self._augment_state_reply(reply, path)
 
     def get_dataplane_state(self, path, params):
@@ -1009,8 +1135,9 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
     def get_list_hosts(self, path, params):
         """List learned access devices"""
         eth_src = params.get('eth_src')
+        query = self._get_state_query(params)
         host = self._extract_url_base(path)
-        reply = self._faucet_collector.get_list_hosts(host, eth_src)
+        reply = self._faucet_collector.get_list_hosts(host, eth_src, query)
         return self._augment_state_reply(reply, path)
 
     def get_cpn_state(self, path, params):
@@ -1028,6 +1155,18 @@ class Forchestrator(VarzUpdater, OrchestrationManager):
         reply = self._local_collector.get_vrrp_state()
         return self._augment_state_reply(reply, path)
 
+    def get_changes(self, path, params):
+        """Stream state changes after the since resume token, optionally filtered"""
+        since = params.get('since')
+        if since is not None and not since.isdigit():
+            raise HttpException(f'Invalid resume token: {since}', http.HTTPStatus.BAD_REQUEST)
+        filters = {key: params[key] for key in STREAM_FILTERS if key in params}
+        ndjson = params.get('format') == 'ndjson'
+        content_type = 'application/x-ndjson' if ndjson else 'text/event-stream'
+        chunks = self._change_stream.stream(
+            int(since) if since is not None else None, filters, ndjson)
+        return StreamingResponse(content_type, chunks)
+
     def get_sys_config(self, path, params):
         """Get overall config from faucet config file"""
         try:
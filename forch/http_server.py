@@ -1,17 +1,69 @@
 """HTTP socket server interface"""
 
+import collections
 import functools
+import gzip
+import hashlib
 import http.server
 import json
+import mimetypes
 import os
+import queue
+import select
+import socket
 import socketserver
 import threading
+import time
 import urllib
+import zlib
 
 from google.protobuf.message import Message
 
 from forch.utils import get_logger, proto_json
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_MAX_QUEUED_CONNECTIONS = 64
+DEFAULT_KEEPALIVE_TIMEOUT_SEC = 5
+
+# Bodies smaller than this are not worth the compression overhead
+MIN_COMPRESS_SIZE = 1024
+# Compressed bodies larger than this are streamed chunked on HTTP/1.1 connections
+MIN_CHUNKED_SIZE = 256 * 1024
+CHUNK_SIZE = 64 * 1024
+GZIP_COMPRESS_LEVEL = 6
+ZSTD_COMPRESS_LEVEL = 3
+
+FORMAT_JSON = 'json'
+FORMAT_COMPACT = 'compact'
+FORMAT_MINIFIED = 'minified'
+FORMAT_PROTO = 'proto'
+PROTOBUF_CONTENT_TYPE = 'application/x-protobuf'
+_FORMAT_PARAMS = {
+    'json': FORMAT_JSON,
+    'compact': FORMAT_COMPACT,
+    'proto': FORMAT_PROTO,
+    'protobuf': FORMAT_PROTO,
+}
+_ACCEPT_FORMATS = {
+    'application/json': FORMAT_JSON,
+    'application/x-protobuf': FORMAT_PROTO,
+    'application/protobuf': FORMAT_PROTO,
+    'application/vnd.google.protobuf': FORMAT_PROTO,
+}
+
+_SERVICE_UNAVAILABLE_RESPONSE = (
+    b'HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+
+
+StreamingResponse = collections.namedtuple('StreamingResponse', 'content_type, chunks')
+ContentResponse = collections.namedtuple('ContentResponse', 'content_type, body')
+StaticFile = collections.namedtuple(
+    'StaticFile', 'content_type, content, gzip_content, etag, mtime, size')
+
 
 class HttpException(Exception):
     """Http exception base class"""
@@ -20,18 +72,287 @@ class HttpException(Exception):
         self.http_status = http_status
 
 
+def _parse_quality(params):
+    for param in params.split(';'):
+        param = param.strip()
+        if param.startswith('q='):
+            try:
+                return float(param[2:])
+            except ValueError:
+                return 0
+    return 1.0
+
+
+def _encoding_qualities(accept_encoding):
+    qualities = {}
+    for coding in accept_encoding.split(','):
+        name, _, params = coding.strip().partition(';')
+        qualities[name.strip().lower()] = _parse_quality(params)
+    return qualities
+
+
+def _accepts_encoding(qualities, encoding):
+    return qualities.get(encoding, qualities.get('*', 0)) > 0
+
+
+def select_content_encoding(accept_encoding):
+    """Pick the response content coding from an Accept-Encoding header, None for identity"""
+    if not accept_encoding:
+        return None
+    qualities = _encoding_qualities(accept_encoding)
+    for encoding in ('zstd', 'gzip') if zstandard else ('gzip',):
+        if _accepts_encoding(qualities, encoding):
+            return encoding
+    return None
+
+
+def select_response_format(accept, format_param=None):
+    """Pick the response format from a format query param, else from an Accept header"""
+    if format_param in _FORMAT_PARAMS:
+        return _FORMAT_PARAMS[format_param]
+    response_format, best_quality = FORMAT_JSON, 0
+    for media_range in (accept or '').split(','):
+        media_type, _, params = media_range.strip().partition(';')
+        quality = _parse_quality(params)
+        accept_format = _ACCEPT_FORMATS.get(media_type.strip().lower())
+        if accept_format and quality > best_quality:
+            response_format, best_quality = accept_format, quality
+    return response_format
+
+
+def _etag_matches(if_none_match, etag):
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags or 'W/' + etag in tags
+
+
+class _RouteTrie:
+    """Character trie of path prefixes, finding the longest registered prefix of a path"""
+
+    _TARGET = object()
+
+    def __init__(self):
+        self._root = {}
+
+    def insert(self, prefix, target):
+        """Register target for a path prefix"""
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[self._TARGET] = (prefix, target)
+
+    def longest_match(self, path):
+        """Return (prefix, target) of the longest prefix of path, or None"""
+        node = self._root
+        match = node.get(self._TARGET)
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                break
+            match = node.get(self._TARGET, match)
+        return match
+
+
+class StaticFileCache:
+    """In-memory cache of static files with ETags and gzip variants, reloaded on mtime change"""
+
+    def __init__(self):
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def get(self, full_path):
+        """Return the StaticFile for a path, raising OSError if it can not be read"""
+        stat = os.stat(full_path)
+        static_file = self._files.get(full_path)
+        if static_file and (static_file.mtime, static_file.size) == (stat.st_mtime_ns,
+                                                                     stat.st_size):
+            return static_file
+        static_file = self._load(full_path, stat)
+        with self._lock:
+            self._files[full_path] = static_file
+        return static_file
+
+    @staticmethod
+    def _load(full_path, stat):
+        with open(full_path, 'rb') as in_file:
+            content = in_file.read()
+        gzip_content = None
+        if len(content) >= MIN_COMPRESS_SIZE:
+            gzip_content = gzip.compress(content, compresslevel=9, mtime=0)
+            if len(gzip_content) >= len(content):
+                gzip_content = None
+        content_type, _ = mimetypes.guess_type(full_path)
+        etag = '"%s"' % hashlib.sha1(content).hexdigest()[:20]
+        return StaticFile(content_type, content, gzip_content, etag, stat.st_mtime_ns,
+                          stat.st_size)
+
+
+def _get_compressor(encoding):
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_COMPRESS_LEVEL).compressobj()
+    return zlib.compressobj(GZIP_COMPRESS_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
 class ThreadedHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
     """Handle requests in a separate thread."""
 
 
+class BoundedHTTPServer(http.server.HTTPServer):
+    """Handle connections on a fixed pool of worker threads, answering 503 when saturated
+
+    Workers waiting on idle keep-alive connections give them up to connections in the queue.
+    """
+
+    def __init__(self, address, handler, context, worker_threads, max_queued):
+        super().__init__(address, handler)
+        self._context = context
+        self._queue = queue.Queue(max_queued)
+        self._active_lock = threading.Lock()
+        self._active_connections = 0
+        self._idle_lock = threading.Lock()
+        self._idle_connections = set()
+        self._free_workers = 0
+        self._workers = [threading.Thread(target=self._work, daemon=True)
+                         for _ in range(worker_threads)]
+        for worker in self._workers:
+            worker.start()
+
+    def process_request(self, request, client_address):
+        try:
+            self._queue.put_nowait((request, client_address, time.monotonic()))
+        except queue.Full:
+            self._context.inc_var('http_pool_rejects')
+            try:
+                request.sendall(_SERVICE_UNAVAILABLE_RESPONSE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+        self._release_idle_connections()
+
+    def wait_for_request(self, connection, rfile, timeout):
+        """Wait for the next request on a keep-alive connection
+
+        Returns False when the connection should be closed instead, because it stayed idle for
+        the timeout or its worker is needed for a queued connection.
+        """
+        connection.setblocking(False)
+        try:
+            if rfile.peek(1):
+                return True
+        finally:
+            connection.settimeout(timeout)
+        with self._idle_lock:
+            if self._lacks_workers():
+                return False
+            self._idle_connections.add(connection)
+        try:
+            readable, _, _ = select.select([connection], [], [], timeout)
+        finally:
+            with self._idle_lock:
+                released = connection not in self._idle_connections
+                self._idle_connections.discard(connection)
+        return bool(readable) and not released
+
+    def _lacks_workers(self):
+        return self._queue.qsize() > self._free_workers
+
+    def _release_idle_connections(self, release_all=False):
+        with self._idle_lock:
+            while self._idle_connections and (release_all or self._lacks_workers()):
+                connection = self._idle_connections.pop()
+                try:
+                    # Wakes up the worker waiting for a request on the connection.
+                    connection.shutdown(socket.SHUT_RD)
+                except OSError:
+                    pass
+                if not release_all:
+                    return
+
+    def _work(self):
+        while True:
+            with self._idle_lock:
+                self._free_workers += 1
+            item = self._queue.get()
+            with self._idle_lock:
+                self._free_workers -= 1
+            if not item:
+                return
+            # Connections queued while this worker still counted as free may need another one.
+            self._release_idle_connections()
+            request, client_address, queued_time = item
+            self._context.observe_var('http_queue_wait_sec', time.monotonic() - queued_time)
+            self._update_active_connections(1)
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                self._update_active_connections(-1)
+
+    def _update_active_connections(self, delta):
+        with self._active_lock:
+            self._active_connections += delta
+            self._context.update_var('http_active_connections', self._active_connections)
+
+    def server_close(self):
+        super().server_close()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item:
+                self.shutdown_request(item[0])
+        self._release_idle_connections(release_all=True)
+        for _ in self._workers:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                # Workers still busy with a request exit on their own as daemon threads.
+                break
+
+
+class _SlotReleasingChunks:
+    """Chunks of a streaming response releasing a route slot once closed"""
+
+    def __init__(self, chunks, slot):
+        self._chunks = chunks
+        self._slot = slot
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+    def close(self):
+        """Close the chunks and release the route slot, once"""
+        slot, self._slot = self._slot, None
+        try:
+            close = getattr(self._chunks, 'close', None)
+            if close:
+                close()
+        finally:
+            if slot:
+                slot.release()
+
+
 class RequestHandler(http.server.BaseHTTPRequestHandler):
     """Handler for simple http requests"""
 
     def __init__(self, context, *args, **kwargs):
         self._context = context
         self._logger = get_logger('httpserv')
+        if context.keepalive_timeout_sec:
+            self.protocol_version = 'HTTP/1.1'
+            self.timeout = context.keepalive_timeout_sec
         super().__init__(*args, **kwargs)
 
+    def handle(self):
+        """Handle requests until the connection is closed or given up while idle"""
+        self.handle_one_request()
+        while not self.close_connection:
+            if not self.server.wait_for_request(self.connection, self.rfile, self.timeout):
+                break
+            self.handle_one_request()
+
     # pylint: disable=invalid-name
     def do_GET(self):
         """Handle a basic http request get method"""
@@ -42,21 +363,123 @@ class RequestHandler(http.server.BaseHTTPRequestHandler):
             opt_pairs = urllib.parse.parse_qsl(parsed.query)
             for pair in opt_pairs:
                 opts[pair[0]] = pair[1]
-            message = str(self._context.get_data(self.headers.get('Host'), parsed.path[1:], opts))
-            self.send_response(http.HTTPStatus.OK)
-            if self._context.content_type:
-                self.send_header('Content-type', self._context.content_type)
-            self.end_headers()
-            self.wfile.write(message.encode())
+            response_format = select_response_format(
+                self.headers.get('Accept'), opts.get('format'))
+            if opts.get('format') in _FORMAT_PARAMS:
+                opts.pop('format')
+            if opts.pop('compact', 'false').lower() not in ('false', '0'):
+                response_format = FORMAT_MINIFIED
+            if self.headers.get('Last-Event-ID'):
+                opts.setdefault('since', self.headers.get('Last-Event-ID'))
+            message = self._context.get_data(
+                self.headers.get('Host'), parsed.path[1:], opts, response_format)
+            if isinstance(message, StreamingResponse):
+                self._send_stream(message)
+                return
+            if isinstance(message, StaticFile):
+                self._send_static_file(message)
+                return
+            if isinstance(message, ContentResponse):
+                self._send_body(message.body, message.content_type)
+                return
+            body = message if isinstance(message, bytes) else str(message).encode()
+            self._send_body(body)
         except HttpException as http_exception:
-            self.send_response(http_exception.http_status)
-            self.end_headers()
+            self._send_empty_response(http_exception.http_status)
             self._logger.warning(http_exception)
         except Exception as exception:
-            self.send_response(http.HTTPStatus.INTERNAL_SERVER_ERROR)
-            self.end_headers()
+            self._send_empty_response(http.HTTPStatus.INTERNAL_SERVER_ERROR)
             self._logger.exception('Unhandled exception: %s', exception)
 
+    def _send_body(self, body, content_type=None):
+        encoding = None
+        if len(body) >= MIN_COMPRESS_SIZE:
+            encoding = select_content_encoding(self.headers.get('Accept-Encoding'))
+        compressor = _get_compressor(encoding) if encoding else None
+        chunked = compressor and self._can_chunk() and len(body) >= MIN_CHUNKED_SIZE
+        if compressor and not chunked:
+            body = compressor.compress(body) + compressor.flush()
+
+        content_type = content_type or self._context.content_type
+        self.send_response(http.HTTPStatus.OK)
+        if content_type:
+            self.send_header('Content-type', content_type)
+        self.send_header('Vary', 'Accept, Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        if not chunked:
+            self.wfile.write(body)
+            return
+        view = memoryview(body)
+        for offset in range(0, len(body), CHUNK_SIZE):
+            self._write_chunk(compressor.compress(view[offset:offset + CHUNK_SIZE]))
+        self._write_chunk(compressor.flush())
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _send_static_file(self, static_file):
+        if _etag_matches(self.headers.get('If-None-Match', ''), static_file.etag):
+            self.send_response(http.HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', static_file.etag)
+            self.end_headers()
+            return
+        body = static_file.content
+        use_gzip = static_file.gzip_content and _accepts_encoding(
+            _encoding_qualities(self.headers.get('Accept-Encoding') or ''), 'gzip')
+        self.send_response(http.HTTPStatus.OK)
+        if static_file.content_type:
+            self.send_header('Content-type', static_file.content_type)
+        self.send_header('ETag', static_file.etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            body = static_file.gzip_content
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, response):
+        chunked = self._can_chunk()
+        self.send_response(http.HTTPStatus.OK)
+        self.send_header('Content-type', response.content_type)
+        self.send_header('Cache-Control', 'no-cache')
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for data in response.chunks:
+                if chunked:
+                    self._write_chunk(data)
+                else:
+                    self.wfile.write(data)
+            if chunked:
+                self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError) as error:
+            self._logger.info('Stream to %s closed: %s', self.client_address, error)
+        finally:
+            close = getattr(response.chunks, 'close', None)
+            if close:
+                close()
+
+    def _can_chunk(self):
+        """Chunked transfer coding needs HTTP/1.1 on both the server and the client side"""
+        return self.protocol_version == 'HTTP/1.1' and self.request_version == 'HTTP/1.1'
+
+    def _write_chunk(self, data):
+        if data:
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+
+    def _send_empty_response(self, http_status):
+        self.send_response(http_status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
     def _check_url(self):
         """Check if url is illegal"""
         if not self.headers.get('Host'):
@@ -77,12 +500,21 @@ class HttpServer():
     def __init__(self, port, config=None, content_type=None):
         self._config = config
         self._paths = {}
+        self._routes = _RouteTrie()
+        self._static_files = StaticFileCache()
         self._server = None
         self._root_path = config.http_root if config and config.http_root else 'public'
         self._port = port
         self._host = '0.0.0.0'
         self._thread = None
         self.content_type = content_type
+        self._worker_threads = config.worker_threads if config else 0
+        self._route_limits = {}
+        self._metrics = None
+        self.keepalive_timeout_sec = None
+        if self._worker_threads:
+            self.keepalive_timeout_sec = (
+                config.keepalive_timeout_sec or DEFAULT_KEEPALIVE_TIMEOUT_SEC)
         self._logger = get_logger('httpserv')
 
     def start_server(self):
@@ -90,7 +522,14 @@ class HttpServer():
         self._logger.info('Starting http server on %s', self._get_url_base())
         address = (self._host, self._port)
         handler = functools.partial(RequestHandler, self)
-        self._server = ThreadedHTTPServer(address, handler)
+        if self._worker_threads:
+            max_queued = self._config.max_queued_connections or DEFAULT_MAX_QUEUED_CONNECTIONS
+            self._logger.info('Serving with %s worker threads and %s queued connections',
+                              self._worker_threads, max_queued)
+            self._server = BoundedHTTPServer(
+                address, handler, self, self._worker_threads, max_queued)
+        else:
+            self._server = ThreadedHTTPServer(address, handler)
 
         self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
         self._thread.deamon = False
@@ -109,22 +548,76 @@ class HttpServer():
         self._server.server_close()
         self._server.shutdown()
 
+    def set_metrics(self, metrics):
+        """Set ForchMetrics to export server varz to"""
+        self._metrics = metrics
+
+    def inc_var(self, var, labels=None):
+        """Increment server varz if metrics are set"""
+        if self._metrics:
+            self._metrics.inc_var(var, labels=labels)
+
+    def update_var(self, var, value, labels=None):
+        """Update server varz if metrics are set"""
+        if self._metrics:
+            self._metrics.update_var(var, value, labels=labels)
+
+    def observe_var(self, var, value, labels=None):
+        """Observe server histogram varz if metrics are set"""
+        if self._metrics:
+            self._metrics.observe_var(var, value, labels=labels)
+
     def map_request(self, path, target):
         """Register a request mapping"""
         self._paths[path] = target
+        self._routes.insert(path, target)
+        limit = self._config.path_concurrency.get(path) if self._config else None
+        if limit:
+            self._route_limits[path] = threading.BoundedSemaphore(limit)
+
+    def get_data(self, host, path, params, response_format=FORMAT_JSON):
+        """Get data for the longest mapped prefix of a request path, in the response format"""
+        match = self._routes.longest_match(path)
+        if not match:
+            return str(self._paths)
+        a_path, target = match
+        route_limit = self._route_limits.get(a_path)
+        if route_limit and not route_limit.acquire(blocking=False):
+            self.inc_var('http_route_rejects', labels=['/' + a_path])
+            raise HttpException(f'Too many concurrent requests for /{a_path}',
+                                http.HTTPStatus.SERVICE_UNAVAILABLE)
+        start = time.monotonic()
+        try:
+            result = self._get_route_data(target, host, path, params, response_format)
+            if route_limit and isinstance(result, StreamingResponse):
+                # A stream keeps its route slot until it is closed.
+                result = result._replace(chunks=_SlotReleasingChunks(result.chunks, route_limit))
+                route_limit = None
+            return result
+        finally:
+            if route_limit:
+                route_limit.release()
+            self.observe_var('http_request_latency_sec', time.monotonic() - start,
+                             labels=['/' + a_path])
 
-    def get_data(self, host, path, params):
-        """Get data for a particular request path and query params"""
-        for a_path in self._paths:
-            if path.startswith(a_path):
-                full_path = host + '/' + path
-                result = self._paths[a_path](full_path, params)
-                if isinstance(result, (bytes, str)):
-                    return result
-                if isinstance(result, Message):
-                    return proto_json(result)
-                return json.dumps(result)
-        return str(self._paths)
+    @staticmethod
+    def _get_route_data(target, host, path, params, response_format):
+        full_path = host + '/' + path
+        result = target(full_path, params)
+        if isinstance(result, (bytes, str, ContentResponse, StreamingResponse, StaticFile)):
+            return result
+        if isinstance(result, Message):
+            if response_format == FORMAT_PROTO:
+                return ContentResponse(PROTOBUF_CONTENT_TYPE, result.SerializeToString())
+            return proto_json(
+                result, compact=response_format in (FORMAT_COMPACT, FORMAT_MINIFIED),
+                including_default_value_fields=response_format != FORMAT_COMPACT)
+        if response_format == FORMAT_PROTO:
+            raise HttpException(f'No protobuf representation for /{path}',
+                                http.HTTPStatus.NOT_ACCEPTABLE)
+        if response_format in (FORMAT_COMPACT, FORMAT_MINIFIED):
+            return json.dumps(result, separators=(',', ':'))
+        return json.dumps(result)
 
     def read_file(self, full_path):
         """Read a file and return the entire contents"""
@@ -140,8 +633,7 @@ class HttpServer():
         if os.path.isdir(full_path):
             full_path = os.path.join(full_path, self._DEFAULT_FILE)
         try:
-            content = self.read_file(full_path)
-            return content
+            return self._static_files.get(full_path)
         except Exception as http_exception:
             raise HttpException(str(http_exception),
                                 http.HTTPStatus.BAD_REQUEST) from http_exception
@@ -0,0 +1,154 @@
+"""Ping hosts in process with ICMP echo requests on an asyncio loop"""
+
+import asyncio
+import ipaddress
+import math
+import os
+import socket
+import struct
+import time
+
+_ICMP_ECHO_REQUEST = 8
+_ICMP_ECHO_REPLY = 0
+_ICMP_HEADER = struct.Struct('!BBHHH')
+_PAYLOAD = b'forch-cpn-ping'
+_RECV_SIZE = 1024
+
+
+def _checksum(data):
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+
+def open_icmp_socket():
+    """Open an unprivileged ICMP datagram socket, or a raw one when privileged
+
+    Returns a (socket, is_raw) tuple, or None when neither kind of socket is permitted.
+    """
+    for sock_type in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+        try:
+            sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+        except OSError:
+            continue
+        sock.setblocking(False)
+        return sock, sock_type == socket.SOCK_RAW
+    return None
+
+
+def get_ping_summary(transmitted, rtts_ms, time_ms):
+    """Summarize a ping of a host the way ping reports it"""
+    received = len(rtts_ms)
+    summary = {
+        'transmitted': transmitted,
+        'received': received,
+        'loss_percentage': (transmitted - received) * 100 // transmitted if transmitted else 100,
+        'time_ms': int(time_ms)
+    }
+    if rtts_ms:
+        avg = sum(rtts_ms) / received
+        variance = max(0.0, sum(rtt * rtt for rtt in rtts_ms) / received - avg * avg)
+        summary['rtt_ms'] = {
+            'min': min(rtts_ms), 'avg': avg, 'max': max(rtts_ms), 'mdev': math.sqrt(variance)
+        }
+    return summary
+
+
+def is_icmp_pingable(host_ip):
+    """Check if a host can be pinged with IcmpPinger, which supports IPv4 only"""
+    try:
+        return ipaddress.ip_address(host_ip).version == 4
+    except ValueError:
+        return False
+
+
+class IcmpPinger:
+    """Sends ICMP echo requests to hosts over one socket, matching replies to requests"""
+
+    def __init__(self, sock, is_raw):
+        self._sock = sock
+        self._is_raw = is_raw
+        # Datagram sockets have their identifier set to the local port by the kernel.
+        self._identifier = os.getpid() & 0xffff
+        self._sequence = 0
+        self._waiters = {}
+        self._loop = None
+
+    def close(self):
+        """Close the socket"""
+        if self._loop:
+            self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+
+    async def ping(self, host_ip, count, timeout_sec):
+        """Ping a host count times within timeout_sec, returning a summary of the results"""
+        host_ip = str(ipaddress.ip_address(host_ip))
+        self._start_reading()
+        start = time.monotonic()
+        deadline = start + timeout_sec
+        spacing_sec = timeout_sec / count
+        waiters = []
+        for probe in range(count):
+            await asyncio.sleep(max(0.0, start + probe * spacing_sec - time.monotonic()))
+            waiters.append(self._send_request(host_ip))
+
+        rtts_ms = []
+        for sequence, sent, waiter in waiters:
+            try:
+                received = await asyncio.wait_for(
+                    waiter, max(0.0, deadline - time.monotonic()))
+                rtts_ms.append((received - sent) * 1000)
+            except (asyncio.TimeoutError, OSError):
+                pass
+            finally:
+                self._waiters.pop((host_ip, sequence), None)
+        return get_ping_summary(count, rtts_ms, (time.monotonic() - start) * 1000)
+
+    def _start_reading(self):
+        loop = asyncio.get_event_loop()
+        if self._loop is not loop:
+            if self._loop:
+                self._loop.remove_reader(self._sock.fileno())
+            loop.add_reader(self._sock.fileno(), self._read_replies)
+            self._loop = loop
+
+    def _send_request(self, host_ip):
+        self._sequence = (self._sequence + 1) & 0xffff
+        sequence = self._sequence
+        header = _ICMP_HEADER.pack(_ICMP_ECHO_REQUEST, 0, 0, self._identifier, sequence)
+        checksum = _checksum(header + _PAYLOAD)
+        packet = _ICMP_HEADER.pack(
+            _ICMP_ECHO_REQUEST, 0, checksum, self._identifier, sequence) + _PAYLOAD
+
+        waiter = self._loop.create_future()
+        self._waiters[(host_ip, sequence)] = waiter
+        sent = time.monotonic()
+        try:
+            self._sock.sendto(packet, (host_ip, 0))
+        except OSError as e:
+            waiter.set_exception(e)
+        return sequence, sent, waiter
+
+    def _read_replies(self):
+        while True:
+            try:
+                data, address = self._sock.recvfrom(_RECV_SIZE)
+            except OSError:
+                return
+            received = time.monotonic()
+            if self._is_raw:
+                # Raw sockets deliver the IP header and every ICMP packet received by the host.
+                data = data[(data[0] & 0x0f) * 4:]
+            if len(data) < _ICMP_HEADER.size:
+                continue
+            icmp_type, _, _, identifier, sequence = _ICMP_HEADER.unpack_from(data)
+            if icmp_type != _ICMP_ECHO_REPLY:
+                continue
+            if self._is_raw and identifier != self._identifier:
+                continue
+            waiter = self._waiters.get((address[0], sequence))
+            if waiter and not waiter.done():
+                waiter.set_result(received)
@@ -1,6 +1,5 @@
 """Collecting the states of the local system"""
 
-import copy
 from datetime import datetime
 import os
 import re
@@ -8,22 +7,77 @@ import signal
 import threading
 import time
 
-import psutil
-
+from forch.proc_net import TcpConnectionReader
+from forch.process_tracker import ProcessTracker
 from forch.proto.process_state_pb2 import ProcessState, VrrpState
 from forch.proto.shared_constants_pb2 import State
 from forch.proto.system_state_pb2 import StateSummary
 from forch.utils import dict_proto, get_logger
 
 _DEFAULT_KEEPALIVED_PID_FILE = '/var/run/keepalived.pid'
-
-_PROC_ATTRS = ['cmdline', 'cpu_times', 'cpu_percent', 'memory_info']
+_DEFAULT_KEEPALIVED_DATA_FILE = '/tmp/keepalived.data'
+_VRRP_STATS_TIMEOUT_SEC = 1
+_VRRP_STATS_POLL_SEC = 0.05
+_VRRP_STATE_RE = re.compile('State = (MASTER|BACKUP|FAULT)')
+_VRRP_FAULT_DETAIL = 'VRRP is in fault state'
 
 VRRP_MASTER = 'MASTER'
 VRRP_BACKUP = 'BACKUP'
 VRRP_FAULT = 'FAULT'
 VRRP_ERROR = 'ERROR'
 
+_VRRP_ACTIVE_STATES = {
+    VRRP_MASTER: State.active,
+    VRRP_BACKUP: State.inactive,
+    VRRP_FAULT: State.broken,
+    VRRP_ERROR: State.broken
+}
+
+
+class CheckScheduler:
+    """Runs checks at fixed rates on their own threads, recording durations and overruns"""
+
+    def __init__(self, metrics):
+        self._metrics = metrics
+        self._checks = []
+        self._stopped = threading.Event()
+        self._logger = get_logger('lstate')
+
+    def add_check(self, name, interval_sec, check):
+        """Add a check to run every interval_sec"""
+        self._checks.append((name, interval_sec, check))
+
+    def start(self):
+        """Start running the checks"""
+        for name, interval_sec, check in self._checks:
+            threading.Thread(target=self._run_check, args=(name, interval_sec, check),
+                             name=f'check-{name}', daemon=True).start()
+
+    def stop(self):
+        """Stop running the checks"""
+        self._stopped.set()
+
+    def _run_check(self, name, interval_sec, check):
+        next_run = time.monotonic()
+        while not self._stopped.is_set():
+            start = time.monotonic()
+            try:
+                check()
+            except Exception as e:
+                self._logger.error('Error in %s check: %s', name, e)
+            now = time.monotonic()
+            self._metrics.observe_var('local_check_duration_sec', now - start, labels=[name])
+
+            # Runs are scheduled from the first run rather than the last, so they do not drift.
+            next_run += interval_sec
+            if now > next_run:
+                missed = int((now - next_run) // interval_sec) + 1
+                self._logger.warning(
+                    'Check %s took %.3fs, skipping %d runs', name, now - start, missed)
+                self._metrics.inc_var('local_check_overruns', missed, labels=[name])
+                next_run += missed * interval_sec
+            self._stopped.wait(next_run - now)
+
 
 class LocalStateCollector:
     """Storing local system states"""
@@ -36,13 +90,23 @@ class LocalStateCollector:
         self._conn_state = None
         self._conn_state_count = 0
         self._metrics = metrics
+        self._change_stream = None
         self._lock = threading.Lock()
 
         self._target_procs = config.processes
+        self._process_tracker = ProcessTracker(
+            {name: process.regex for name, process in self._target_procs.items()})
         self._check_vrrp = config.check_vrrp
         self._keepalived_pid_file = os.getenv('KEEPALIVED_PID_FILE', _DEFAULT_KEEPALIVED_PID_FILE)
+        self._keepalived_data_file = os.getenv(
+            'KEEPALIVED_DATA_FILE', _DEFAULT_KEEPALIVED_DATA_FILE)
         self._connections = config.connections
-        self._process_interval = config.scan_interval_sec or 60
+        self._connection_reader = TcpConnectionReader()
+        scan_interval = config.scan_interval_sec or 60
+        self._process_interval = config.process_interval_sec or scan_interval
+        self._connection_interval = config.connection_interval_sec or scan_interval
+        self._vrrp_interval = config.vrrp_interval_sec or scan_interval
+        self._scheduler = CheckScheduler(metrics)
 
         self._cleanup_handler = cleanup_handler
         self._active_state_handler = active_state_handler
@@ -50,6 +114,9 @@ class LocalStateCollector:
         self._logger = get_logger('lstate')
         self._logger.info(
             'Scanning %s processes every %ds', len(self._target_procs), self._process_interval)
+        self._logger.info('Checking connections every %ds', self._connection_interval)
+        if self._check_vrrp:
+            self._logger.info('Probing VRRP state every %ds', self._vrrp_interval)
 
     def initialize(self):
         """Initialize LocalStateCollector"""
@@ -58,6 +125,14 @@ class LocalStateCollector:
 
         self.start_process_loop()
 
+    def set_change_stream(self, change_stream):
+        """Set ChangeStream to publish state changes to"""
+        self._change_stream = change_stream
+
+    def _publish_change(self, change_type, **fields):
+        if self._change_stream:
+            self._change_stream.publish('local', change_type, **fields)
+
     def get_process_summary(self):
         """Return a summary of process table"""
         process_state = self.get_process_state()
@@ -151,18 +226,13 @@ class LocalStateCollector:
             self._process_state['process_state_detail'] = state_detail
             self._process_state['process_state_change_count'] = state_change_count
             self._process_state['process_state_last_change'] = self._current_time
+            self._publish_change(
+                'process', state=State.State.Name(state), detail=state_detail)
 
     def _get_target_processes(self):
         """Get target processes"""
-        procs = {}
-        for proc in psutil.process_iter(attrs=_PROC_ATTRS):
-            cmd_line_str = ' '.join(proc.info['cmdline'])
-            for target_process_name, target_process_cfg in self._target_procs.items():
-                proc_list = procs.setdefault(target_process_name, [])
-                if re.search(target_process_cfg.regex, cmd_line_str):
-                    proc_list.append(proc)
-
-        return procs
+        return self._process_tracker.scan(
+            {name: process.count or 1 for name, process in self._target_procs.items()})
 
     def _extract_process_state(self, proc_name, proc_count, proc_list):
         """Fill process state for a single process"""
@@ -173,9 +243,9 @@ class LocalStateCollector:
         old_proc_map = self._process_state.get('processes', {}).get(proc_name, {})
         proc_map = {}
 
-        cmd_line = ' '.join(proc_list[0].info['cmdline']) if len(proc_list) == 1 else 'multiple'
+        cmd_line = proc_list[0].cmdline if len(proc_list) == 1 else 'multiple'
         proc_map['cmd_line'] = cmd_line
-        create_time_max = max(proc.create_time() for proc in proc_list)
+        create_time_max = max(proc.create_time for proc in proc_list)
         create_time = datetime.fromtimestamp(create_time_max).isoformat()
         proc_map['create_time'] = create_time
         proc_map['create_time_last_update'] = self._current_time
@@ -204,23 +274,18 @@ class LocalStateCollector:
     def _aggregate_process_stats(self, proc_map, proc_list):
         cpu_time_user = 0.0
         cpu_time_system = 0.0
-        cpu_time_iowait = None
+        cpu_time_iowait = 0.0
         cpu_percent = 0.0
         memory_rss = 0.0
         memory_vms = 0.0
 
         for proc in proc_list:
-            cpu_time_user += proc.info['cpu_times'].user
-            cpu_time_system += proc.info['cpu_times'].system
-            if hasattr(proc.info['cpu_times'], 'iowait'):
-                if not cpu_time_iowait:
-                    cpu_time_iowait = 0.0
-                cpu_time_iowait += proc.cpu_times().iowait
-
-            cpu_percent += proc.info['cpu_percent']
-
-            memory_rss += proc.info['memory_info'].rss / 1e6
-            memory_vms += proc.info['memory_info'].vms / 1e6
+            cpu_time_user += proc.cpu_user
+            cpu_time_system += proc.cpu_system
+            cpu_time_iowait += proc.cpu_iowait
+            cpu_percent += proc.cpu_percent
+            memory_rss += proc.memory_rss / 1e6
+            memory_vms += proc.memory_vms / 1e6
 
         proc_map['cpu_times_s'] = {}
         proc_map['cpu_times_s']['user'] = cpu_time_user / len(proc_list)
@@ -253,27 +318,15 @@ class LocalStateCollector:
             connection_info['detail'] = conn_state
             connection_info['change_count'] = self._conn_state_count
             connection_info['last_change'] = self._current_time
+            self._publish_change('connections', detail=conn_state)
         connection_info['last_update'] = self._current_time
 
     def _fetch_connections(self):
-        connections = {}
-        with os.popen('netstat -npa 2>/dev/null') as lines:
-            for line in lines:
-                if 'ESTABLISHED' in line:
-                    try:
-                        parts = line.split()
-                        local_address = parts[3]
-                        local_parts = local_address.split(':')
-                        local_port = int(local_parts[-1])
-                        foreign_address = parts[4]
-                        connections[foreign_address] = {
-                            'local_port': local_port,
-                            'process_info': parts[6]
-                        }
-                    except Exception as e:
-                        self._logger.error('Processing netstat entry: %s', e)
-
-        return connections
+        try:
+            return self._connection_reader.fetch_connections(self._connections)
+        except Exception as e:
+            self._logger.error('Reading TCP connections: %s', e)
+            return {}
 
     def _extract_conn(self, connections, port):
         foreign_addresses = {}
@@ -295,82 +348,95 @@ class LocalStateCollector:
             'foreign_addresses': foreign_addresses
         }
 
+    def _get_vrrp_stats_signature(self):
+        try:
+            stats = os.stat(self._keepalived_data_file)
+        except FileNotFoundError:
+            return None
+        return stats.st_ino, stats.st_mtime_ns, stats.st_size
+
+    def _read_vrrp_stats(self):
+        with open(self._keepalived_data_file) as stats_file:
+            for line in stats_file:
+                match = _VRRP_STATE_RE.search(line)
+                if match:
+                    return match.group(1)
+        return None
+
+    def _probe_vrrp_state(self):
+        """Signal keepalived to dump its stats and wait for the stats file to be rewritten"""
+        with open(self._keepalived_pid_file) as pid_file:
+            pid = int(pid_file.readline())
+        old_signature = self._get_vrrp_stats_signature()
+        os.kill(pid, signal.SIGUSR1)
+        deadline = time.monotonic() + _VRRP_STATS_TIMEOUT_SEC
+        while time.monotonic() < deadline:
+            time.sleep(_VRRP_STATS_POLL_SEC)
+            if self._get_vrrp_stats_signature() == old_signature:
+                continue
+            # The file may be read while keepalived is still writing it, so poll until complete.
+            vrrp_state = self._read_vrrp_stats()
+            if vrrp_state:
+                return vrrp_state
+        return self._read_vrrp_stats()
+
     def _check_vrrp_info(self):
         """Get vrrp info"""
-        vrrp_state = None
         error_detail = None
         try:
-            if not self._check_vrrp:
-                return
-
-            with open(self._keepalived_pid_file) as pid_file:
-                pid = int(pid_file.readline())
-            os.kill(pid, signal.SIGUSR1)
-            time.sleep(1)
-            with open('/tmp/keepalived.data') as stats_file:
-                for line in stats_file:
-                    match = re.search('State = (MASTER|BACKUP|FAULT)', line)
-                    if not match:
-                        continue
-                    vrrp_state = match.group(1)
-                    break
-
+            vrrp_state = self._probe_vrrp_state()
             if not vrrp_state:
                 vrrp_state = VRRP_ERROR
                 error_detail = 'Could not find matching states'
-
         except Exception as e:
             vrrp_state = VRRP_ERROR
             error_detail = f'Cannot get VRRP info: {e}'
 
-        finally:
-            self._vrrp_state.update(self._handle_vrrp_state(vrrp_state, error_detail))
+        self._handle_vrrp_state(vrrp_state, error_detail)
 
     def _handle_vrrp_state(self, vrrp_state, error_detail=None):
-        """Extract vrrp state from keepalived stats data"""
-        vrrp_map = {'vrrp_state': vrrp_state}
-        old_vrrp_map = copy.deepcopy(self._vrrp_state)
-        old_vrrp_state = old_vrrp_map.get('vrrp_state')
-        old_vrrp_state_detail = old_vrrp_map.get('vrrp_state_detail')
-
-        if vrrp_state != old_vrrp_state or error_detail != old_vrrp_state_detail:
-            vrrp_map['vrrp_state_last_change'] = self._current_time
+        """Publish a probed VRRP state, notifying handlers when it changes"""
+        vrrp_state_detail = _VRRP_FAULT_DETAIL if vrrp_state == VRRP_FAULT else error_detail
+        with self._lock:
+            old_vrrp_map = self._vrrp_state
+            if (vrrp_state == old_vrrp_map.get('vrrp_state') and
+                    vrrp_state_detail == old_vrrp_map.get('vrrp_state_detail')):
+                return
             state_change_count = old_vrrp_map.get('vrrp_state_change_count', 0) + 1
-            vrrp_map['vrrp_state_change_count'] = state_change_count
-
-            self._logger.info(
-                'VRRP state #%d: %s, %s', vrrp_map['vrrp_state_change_count'], vrrp_state,
-                error_detail)
-
-            if vrrp_state == VRRP_MASTER:
-                vrrp_map['vrrp_state_detail'] = None
-                self._active_state_handler(State.active)
-            elif vrrp_state == VRRP_BACKUP:
-                vrrp_map['vrrp_state_detail'] = None
-                self._active_state_handler(State.inactive)
-            elif vrrp_state == VRRP_FAULT:
-                vrrp_map['vrrp_state_detail'] = 'VRRP is in fault state'
-                self._active_state_handler(State.broken)
-            elif vrrp_state == VRRP_ERROR:
-                vrrp_map['vrrp_state_detail'] = error_detail
-                self._active_state_handler(State.broken)
-            else:
-                self._logger.error('Unknown VRRP state: %s', vrrp_state)
-
-            if vrrp_state != VRRP_MASTER:
-                self._cleanup_handler()
-
-        return vrrp_map
-
-    def _periodic_check_local_state(self):
-        """Periodically gather local state"""
+            # Replace the map rather than update it, so readers never see a partial change.
+            self._vrrp_state = {
+                'vrrp_state': vrrp_state,
+                'vrrp_state_detail': vrrp_state_detail,
+                'vrrp_state_change_count': state_change_count,
+                'vrrp_state_last_change': datetime.now().isoformat()
+            }
+
+        self._logger.info('VRRP state #%d: %s, %s', state_change_count, vrrp_state, error_detail)
+        self._publish_change('vrrp', state=vrrp_state, detail=error_detail)
+
+        self._active_state_handler(_VRRP_ACTIVE_STATES[vrrp_state])
+        if vrrp_state != VRRP_MASTER:
+            self._cleanup_handler()
+
+    def _run_process_check(self):
         with self._lock:
             self._current_time = datetime.now().isoformat()
             self._check_process_info()
-            self._check_vrrp_info()
+
+    def _run_connection_check(self):
+        with self._lock:
+            self._current_time = datetime.now().isoformat()
             self._check_connections()
-        threading.Timer(self._process_interval, self._periodic_check_local_state).start()
 
     def start_process_loop(self):
-        """Start a loop to periodically gather local state"""
-        threading.Thread(target=self._periodic_check_local_state, daemon=True).start()
+        """Start periodically gathering local state"""
+        self._scheduler.add_check('process', self._process_interval, self._run_process_check)
+        self._scheduler.add_check(
+            'connection', self._connection_interval, self._run_connection_check)
+        if self._check_vrrp:
+            self._scheduler.add_check('vrrp', self._vrrp_interval, self._check_vrrp_info)
+        self._scheduler.start()
+
+    def stop(self):
+        """Stop gathering local state"""
+        self._scheduler.stop()
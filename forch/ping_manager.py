@@ -2,54 +2,88 @@
 
 import asyncio
 from asyncio.subprocess import PIPE
-from collections import namedtuple
+import re
 import threading
+import time
 
-PingResult = namedtuple('PingResult', ['host_name', 'proc_code', 'stdout', 'stderr'])
+from forch.icmp_pinger import IcmpPinger, is_icmp_pingable, open_icmp_socket
+from forch.utils import get_logger
+
+PING_SUMMARY_REGEX = {'transmitted': r'\d+(?= packets transmitted)',
+                      'received': r'\d+(?= received)',
+                      'loss_percentage': r'\d+(?=% packet loss)',
+                      'time_ms': r'(?<=time )\d+(?=ms)'}
+
+
+def parse_ping_output(stdout, count):
+    """Parse the summary of ping output into ping results"""
+    res_summary = {'transmitted': count, 'received': 0, 'loss_percentage': 100}
+    for line in stdout.split('\n'):
+        for summary_key, regex in PING_SUMMARY_REGEX.items():
+            match = re.search(regex, line)
+            if match:
+                res_summary[summary_key] = int(match.group())
+        if line[:3] == 'rtt':
+            rtt_vals = re.findall(r'[0-9]*\.?[0-9]+', line)
+            res_summary['rtt_ms'] = dict(
+                zip(['min', 'avg', 'max', 'mdev'], (float(val) for val in rtt_vals)))
+    return res_summary
 
 
 class PingManager:
     """Manages a thread that periodically pings the hosts"""
-    def __init__(self, hosts: dict, interval: int = 60, count: int = 1):
+    def __init__(self, hosts: dict, interval: float = 60, count: int = 1):
         self._hosts = hosts
         self._count = count
         self._timeout = self._count
+        # Replies to in-process pings are awaited no longer than the interval between rounds.
+        self._icmp_timeout = min(self._count, interval)
         self._interval = interval
         self._loop = asyncio.new_event_loop()
-        asyncio.get_child_watcher().attach_loop(self._loop)
+        self._logger = get_logger('ping')
+
+        icmp_socket = open_icmp_socket()
+        self._pinger = IcmpPinger(*icmp_socket) if icmp_socket else None
+        if not self._pinger:
+            self._logger.warning('Cannot open an ICMP socket, pinging with ping subprocesses')
+        self._icmp_hosts = {
+            host_name for host_name, host_ip in hosts.items()
+            if self._pinger and is_icmp_pingable(host_ip)}
+        if len(self._icmp_hosts) < len(hosts):
+            asyncio.get_child_watcher().attach_loop(self._loop)
 
     async def _ping_host(self, host_name, host_ip):
-        """Ping a single host"""
-        cmd = f"ping -c {self._count} -w {self._timeout} {host_ip}"
+        """Ping a single host, returning its ping results"""
+        if host_name in self._icmp_hosts:
+            return await self._pinger.ping(host_ip, self._count, self._icmp_timeout)
 
+        cmd = f"ping -c {self._count} -w {self._timeout} {host_ip}"
         proc = await asyncio.create_subprocess_shell(cmd, stdout=PIPE, stderr=PIPE)
-        proc_code = await proc.wait()
-        stdout, stderr = await proc.communicate()
-
-        return PingResult(host_name, proc_code, stdout.decode(), stderr.decode())
+        stdout, _ = await proc.communicate()
+        return parse_ping_output(stdout.decode(), self._count)
 
     async def _ping_hosts(self):
         """Ping hosts and return ping result of the hosts"""
-        ret_map = {}
         ping_results = await asyncio.gather(
             *(self._ping_host(host_name, host_ip) for host_name, host_ip in self._hosts.items()))
+        return dict(zip(self._hosts, ping_results))
 
-        for ping_result in ping_results:
-            host_map = ret_map.setdefault(ping_result.host_name, {})
-            host_map['proc_code'] = ping_result.proc_code
-            host_map['stdout'] = ping_result.stdout
-            host_map['stderr'] = ping_result.stderr
-
-        return ret_map
-
-    def _periodic_ping_hosts(self, handler):
-        """Periodically ping hosts"""
-        task = self._loop.create_task(self._ping_hosts())
-        task.add_done_callback(handler)
-        self._loop.run_until_complete(task)
-        threading.Timer(self._interval, self._periodic_ping_hosts, (handler,)).start()
+    async def _periodic_ping_hosts(self, handler):
+        """Periodically ping hosts at a fixed rate"""
+        next_round = time.monotonic()
+        while True:
+            task = self._loop.create_task(self._ping_hosts())
+            task.add_done_callback(handler)
+            try:
+                await task
+            except Exception as e:
+                self._logger.error('Error pinging hosts: %s', e)
+            next_round = max(next_round + self._interval, time.monotonic())
+            await asyncio.sleep(next_round - time.monotonic())
 
     def start_loop(self, handler):
         """Start ping loop"""
-        thread = threading.Thread(target=self._periodic_ping_hosts, args=(handler,), daemon=True)
+        thread = threading.Thread(
+            target=self._loop.run_until_complete, args=(self._periodic_ping_hosts(handler),),
+            daemon=True)
         thread.start()
@@ -0,0 +1,110 @@
+"""Read established TCP connections from /proc/net without forking netstat"""
+
+import os
+import socket
+
+_PROC_ROOT = '/proc'
+_TCP_TABLES = (('net/tcp', socket.AF_INET), ('net/tcp6', socket.AF_INET6))
+_TCP_ESTABLISHED = '01'
+_SOCKET_LINK_PREFIX = 'socket:['
+_UNKNOWN_PROCESS = '-'
+
+
+def _decode_address(address, family):
+    """Decode a hex address:port of /proc/net/tcp into netstat's host:port form"""
+    host, port = address.split(':')
+    packed = bytes.fromhex(host)
+    # The kernel prints each 32-bit word of the address in host byte order.
+    packed = b''.join(packed[index:index + 4][::-1] for index in range(0, len(packed), 4))
+    return f'{socket.inet_ntop(family, packed)}:{int(port, 16)}'
+
+
+def parse_tcp_table(lines, family, local_ports):
+    """Parse established sockets on local_ports, yielding (local port, foreign address, inode)"""
+    watched = {f':{port:04X}': port for port in local_ports}
+    for line in lines:
+        # Filter on local port and state before decoding the rest of the entry.
+        fields = line.split(None, 4)
+        if len(fields) < 5 or fields[3] != _TCP_ESTABLISHED:
+            continue
+        local_port = watched.get(fields[1][-5:])
+        if local_port is None:
+            continue
+        inode = int(line.split()[9])
+        yield local_port, _decode_address(fields[2], family), inode
+
+
+class TcpConnectionReader:
+    """Reads established TCP connections on watched local ports and their owning processes"""
+
+    def __init__(self, proc_root=_PROC_ROOT):
+        self._proc_root = proc_root
+        self._inode_pids = {}
+
+    def fetch_connections(self, local_ports):
+        """Get established connections on local_ports, keyed by foreign address"""
+        entries = []
+        for table, family in _TCP_TABLES:
+            try:
+                with open(os.path.join(self._proc_root, table)) as lines:
+                    next(lines, None)
+                    entries.extend(parse_tcp_table(lines, family, local_ports))
+            except FileNotFoundError:
+                continue
+
+        inode_pids = self._map_inode_pids({inode for _, _, inode in entries if inode})
+        connections = {}
+        for local_port, foreign_address, inode in entries:
+            pid = inode_pids.get(inode)
+            connections[foreign_address] = {
+                'local_port': local_port,
+                'process_info': f'{pid}/{self._get_process_name(pid)}' if pid else _UNKNOWN_PROCESS
+            }
+        return connections
+
+    def _map_inode_pids(self, inodes):
+        """Find the processes owning socket inodes, scanning the owners of last time first"""
+        inode_pids = {}
+        if not inodes:
+            self._inode_pids = inode_pids
+            return inode_pids
+
+        remaining = set(inodes)
+        cached_pids = {self._inode_pids[inode] for inode in inodes if inode in self._inode_pids}
+        try:
+            other_pids = [int(name) for name in os.listdir(self._proc_root) if name.isdigit()]
+        except OSError:
+            other_pids = []
+
+        for pid in list(cached_pids) + [pid for pid in other_pids if pid not in cached_pids]:
+            for inode in self._get_socket_inodes(pid) & remaining:
+                inode_pids[inode] = pid
+                remaining.discard(inode)
+            if not remaining:
+                break
+
+        self._inode_pids = inode_pids
+        return inode_pids
+
+    def _get_socket_inodes(self, pid):
+        fd_dir = os.path.join(self._proc_root, str(pid), 'fd')
+        inodes = set()
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            return inodes
+        for fd in fds:
+            try:
+                link = os.readlink(os.path.join(fd_dir, fd))
+            except OSError:
+                continue
+            if link.startswith(_SOCKET_LINK_PREFIX):
+                inodes.add(int(link[len(_SOCKET_LINK_PREFIX):-1]))
+        return inodes
+
+    def _get_process_name(self, pid):
+        try:
+            with open(os.path.join(self._proc_root, str(pid), 'comm')) as comm_file:
+                return comm_file.read().strip()
+        except OSError:
+            return _UNKNOWN_PROCESS
@@ -0,0 +1,133 @@
+"""Track target processes across scans by reading /proc directly"""
+
+import collections
+import os
+import re
+import time
+
+_PROC_ROOT = '/proc'
+
+ProcessInfo = collections.namedtuple(
+    'ProcessInfo', 'pid, cmdline, create_time, cpu_user, cpu_system, cpu_iowait, cpu_percent, '
+    'memory_rss, memory_vms')
+
+# Indices of /proc/<pid>/stat fields counted from the process state, which follows the comm.
+_STAT_UTIME = 11
+_STAT_STIME = 12
+_STAT_STARTTIME = 19
+_STAT_VSIZE = 20
+_STAT_RSS = 21
+_STAT_BLKIO_TICKS = 39
+
+_CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+
+class ProcessTracker:
+    """Remembers processes matching target regexes, re-reading only those between scans"""
+
+    def __init__(self, target_regexes, proc_root=_PROC_ROOT):
+        self._target_regexes = {
+            target: re.compile(regex) for target, regex in target_regexes.items()}
+        self._proc_root = proc_root
+        self._boot_time = None
+        # Start time of every known pid, to tell a reused pid from the same process.
+        self._known_pids = {}
+        self._matches = {}
+        self._cpu_samples = {}
+
+    def scan(self, target_counts=None):
+        """Get the ProcessInfo of processes matching each target
+
+        Only processes that matched before and pids new since the last scan are read. All
+        processes are read again when a target has fewer matches than its count in
+        target_counts, in case a known process has since exec'ed into a target.
+        """
+        pids = {int(name) for name in os.listdir(self._proc_root) if name.isdigit()}
+        procs = self._scan_pids(pids, pids - self._known_pids.keys())
+        target_counts = target_counts or {}
+        if any(len(procs.get(target, [])) < count for target, count in target_counts.items()):
+            procs = self._scan_pids(pids, pids)
+        return procs
+
+    def _scan_pids(self, pids, new_pids):
+        for pid in self._known_pids.keys() - pids:
+            self._forget(pid)
+
+        procs = {}
+        timestamp = time.monotonic()
+        for pid in sorted(new_pids | self._matches.keys()):
+            stat = self._read_stat(pid)
+            if not stat:
+                self._forget(pid)
+                continue
+            start_time = int(stat[_STAT_STARTTIME])
+            if self._known_pids.get(pid, start_time) != start_time:
+                self._forget(pid)
+            self._known_pids[pid] = start_time
+
+            cmdline = self._read_cmdline(pid)
+            targets = [target for target, regex in self._target_regexes.items()
+                       if cmdline is not None and regex.search(cmdline)]
+            if not targets:
+                self._matches.pop(pid, None)
+                self._cpu_samples.pop(pid, None)
+                continue
+            self._matches[pid] = targets
+            info = self._get_process_info(pid, cmdline, stat, timestamp)
+            for target in targets:
+                procs.setdefault(target, []).append(info)
+        return procs
+
+    def _forget(self, pid):
+        self._known_pids.pop(pid, None)
+        self._matches.pop(pid, None)
+        self._cpu_samples.pop(pid, None)
+
+    def _get_process_info(self, pid, cmdline, stat, timestamp):
+        cpu_user = int(stat[_STAT_UTIME]) / _CLOCK_TICKS
+        cpu_system = int(stat[_STAT_STIME]) / _CLOCK_TICKS
+        cpu_total = cpu_user + cpu_system
+        last_sample = self._cpu_samples.get(pid)
+        self._cpu_samples[pid] = (cpu_total, timestamp)
+        # The first sample of a process has no reference to measure its usage against.
+        cpu_percent = 0.0
+        if last_sample and timestamp > last_sample[1]:
+            cpu_percent = (cpu_total - last_sample[0]) / (timestamp - last_sample[1]) * 100
+
+        return ProcessInfo(
+            pid=pid,
+            cmdline=cmdline,
+            create_time=self._get_boot_time() + int(stat[_STAT_STARTTIME]) / _CLOCK_TICKS,
+            cpu_user=cpu_user,
+            cpu_system=cpu_system,
+            cpu_iowait=int(stat[_STAT_BLKIO_TICKS]) / _CLOCK_TICKS,
+            cpu_percent=cpu_percent,
+            memory_rss=int(stat[_STAT_RSS]) * _PAGE_SIZE,
+            memory_vms=int(stat[_STAT_VSIZE]))
+
+    def _read_stat(self, pid):
+        try:
+            with open(os.path.join(self._proc_root, str(pid), 'stat')) as stat_file:
+                stat = stat_file.read()
+        except OSError:
+            return None
+        # The comm field may contain spaces and parentheses, so split after its last one.
+        return stat[stat.rindex(')') + 2:].split()
+
+    def _read_cmdline(self, pid):
+        try:
+            with open(os.path.join(self._proc_root, str(pid), 'cmdline'), 'rb') as cmdline_file:
+                cmdline = cmdline_file.read()
+        except OSError:
+            return None
+        return ' '.join(arg.decode(errors='replace') for arg in cmdline.rstrip(b'\0').split(b'\0'))
+
+    def _get_boot_time(self):
+        if self._boot_time is None:
+            with open(os.path.join(self._proc_root, 'stat')) as stat_file:
+                for line in stat_file:
+                    if line.startswith('btime'):
+                        self._boot_time = int(line.split()[1])
+                        break
+        return self._boot_time
@@ -20,7 +20,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='',
   syntax='proto3',
   serialized_options=None,
-  serialized_pb=_b('\n%forch/proto/forch_configuration.proto\x1a\"forch/proto/shared_constants.proto\"\xef\x02\n\x0b\x46orchConfig\x12\x19\n\x04site\x18\x01 \x01(\x0b\x32\x0b.SiteConfig\x12+\n\rorchestration\x18\x02 \x01(\x0b\x32\x14.OrchestrationConfig\x12\x1f\n\x07process\x18\x03 \x01(\x0b\x32\x0e.ProcessConfig\x12\x19\n\x04http\x18\x04 \x01(\x0b\x32\x0b.HttpConfig\x12(\n\x0c\x65vent_client\x18\x05 \x01(\x0b\x32\x12.EventClientConfig\x12,\n\x0evarz_interface\x18\x06 \x01(\x0b\x32\x14.VarzInterfaceConfig\x12(\n\x0cproxy_server\x18\x07 \x01(\x0b\x32\x12.ProxyServerConfig\x12\x32\n\x14\x64\x61taplane_monitoring\x18\x08 \x01(\x0b\x32\x14.DataplaneMonitoring\x12&\n\x0e\x63pn_monitoring\x18\t \x01(\x0b\x32\x0e.CpnMonitoring\"\xc3\x01\n\nSiteConfig\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x31\n\x0b\x63ontrollers\x18\x02 \x03(\x0b\x32\x1c.SiteConfig.ControllersEntry\x1aJ\n\x10\x43ontrollersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12%\n\x05value\x18\x02 \x01(\x0b\x32\x16.SiteConfig.Controller:\x02\x38\x01\x1a(\n\nController\x12\x0c\n\x04\x66qdn\x18\x01 \x01(\t\x12\x0c\n\x04port\x18\x02 \x01(\x05\"\xb1\t\n\x13OrchestrationConfig\x12\x1e\n\x16structural_config_file\x18\x01 \x01(\t\x12\x1c\n\x14unauthenticated_vlan\x18\x08 \x01(\x05\x12\x10\n\x08tail_acl\x18\t \x01(\t\x12\x1e\n\x16\x62\x65havioral_config_file\x18\x02 \x01(\t\x12\x1f\n\x17static_device_placement\x18\x03 \x01(\t\x12\x1e\n\x16static_device_behavior\x18\x04 \x01(\t\x12\x1b\n\x13segments_vlans_file\x18\x05 \x01(\t\x12\x19\n\x11gauge_config_file\x18\n \x01(\t\x12\x1e\n\x16\x66\x61ucetize_interval_sec\x18\x06 \x01(\x05\x12\x34\n\x0b\x61uth_config\x18\x07 \x01(\x0b\x32\x1f.OrchestrationConfig.AuthConfig\x12>\n\x10sequester_config\x18\x0b \x01(\x0b\x32$.OrchestrationConfig.SequesterConfig\x1a\xc6\x01\n\nAuthConfig\x12\x34\n\x0bradius_info\x18\x01 \x01(\x0b\x32\x1f.OrchestrationConfig.RadiusInfo\x12\x15\n\rheartbeat_sec\x18\x02 \x01(\x05\x12\x1a\n\x12max_radius_retries\x18\x03 \x01(\x05\x12\x19\n\x11query_timeout_sec\x18\x04 \x01(\x05\x12\x1a\n\x12reject_timeout_sec\x18\x05 \x01(\x05\x12\x18\n\x10\x61uth_timeout_sec\x18\x06 \x01(\x05\x1ag\n\nRadiusInfo\x12\x11\n\tserver_ip\x18\x01 \x01(\t\x12\x13\n\x0bserver_port\x18\x02 \x01(\x05\x12\x1c\n\x14radius_secret_helper\x18\x03 \x01(\t\x12\x13\n\x0bsource_port\x18\x04 \x01(\x05\x1a\xe8\x03\n\x0fSequesterConfig\x12\x19\n\x11sequester_segment\x18\x01 \x01(\t\x12\x12\n\nvlan_start\x18\x02 \x01(\x05\x12\x10\n\x08vlan_end\x18\x03 \x01(\x05\x12\x18\n\x10port_description\x18\x04 \x01(\t\x12\x14\n\x0cservice_port\x18\x05 \x01(\x05\x12\x17\n\x0fservice_address\x18\x06 \x01(\t\x12\x11\n\ttunnel_ip\x18\n \x01(\t\x12\x1d\n\x15sequester_timeout_sec\x18\x07 \x01(\x05\x12\x39\n\x11\x61uto_sequestering\x18\x08 \x01(\x0e\x32\x1e.PortBehavior.AutoSequestering\x12g\n\x19test_result_device_states\x18\t \x03(\x0b\x32\x44.OrchestrationConfig.SequesterConfig.TestResultDeviceStateTransition\x1au\n\x1fTestResultDeviceStateTransition\x12+\n\x0btest_result\x18\x01 \x01(\x0e\x32\x16.TestResult.ResultCode\x12%\n\x0c\x64\x65vice_state\x18\x02 \x01(\x0e\x32\x0f.DVAState.State\"\xaa\x03\n\rProcessConfig\x12\x19\n\x11scan_interval_sec\x18\x01 \x01(\x05\x12\x12\n\ncheck_vrrp\x18\x02 \x01(\x08\x12\x30\n\tprocesses\x18\x03 \x03(\x0b\x32\x1d.ProcessConfig.ProcessesEntry\x12\x34\n\x0b\x63onnections\x18\x04 \x03(\x0b\x32\x1f.ProcessConfig.ConnectionsEntry\x1aH\n\x0eProcessesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12%\n\x05value\x18\x02 \x01(\x0b\x32\x16.ProcessConfig.Process:\x02\x38\x01\x1aM\n\x10\x43onnectionsEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12(\n\x05value\x18\x02 \x01(\x0b\x32\x19.ProcessConfig.Connection:\x02\x38\x01\x1a\x46\n\x07Process\x12\r\n\x05regex\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x05\x12\x1d\n\x15\x63pu_percent_threshold\x18\x03 \x01(\x02\x1a!\n\nConnection\x12\x13\n\x0b\x64\x65scription\x18\x01 \x01(\t\"\x1f\n\nHttpConfig\x12\x11\n\thttp_root\x18\x01 \x01(\t\"\x84\x01\n\x11\x45ventClientConfig\x12\x19\n\x11port_debounce_sec\x18\x01 \x01(\x05\x12&\n\x1estack_topo_change_coalesce_sec\x18\x02 \x01(\x05\x12,\n$config_hash_verification_timeout_sec\x18\x03 \x01(\x05\"(\n\x13VarzInterfaceConfig\x12\x11\n\tvarz_port\x18\x01 \x01(\x05\"\x97\x01\n\x11ProxyServerConfig\x12\x12\n\nproxy_port\x18\x01 \x01(\x05\x12\x30\n\x07targets\x18\x02 \x03(\x0b\x32\x1f.ProxyServerConfig.TargetsEntry\x1a<\n\x0cTargetsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1b\n\x05value\x18\x02 \x01(\x0b\x32\x0c.ProxyTarget:\x02\x38\x01\"\x1b\n\x0bProxyTarget\x12\x0c\n\x04port\x18\x01 \x01(\x05\"\xd1\x01\n\x13\x44\x61taplaneMonitoring\x12\"\n\x1agauge_metrics_interval_sec\x18\x01 \x01(\x05\x12V\n\x1bvlan_pkt_per_sec_thresholds\x18\x02 \x03(\x0b\x32\x31.DataplaneMonitoring.VlanPktPerSecThresholdsEntry\x1a>\n\x1cVlanPktPerSecThresholdsEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"o\n\rCpnMonitoring\x12\x15\n\rping_interval\x18\x01 \x01(\x05\x12$\n\x1cmin_consecutive_ping_healthy\x18\x02 \x01(\x05\x12!\n\x19min_consecutive_ping_down\x18\x03 \x01(\x05\x62\x06proto3')
+  serialized_pb=_b('\n%forch/proto/forch_configuration.proto\x1a\"forch/proto/shared_constants.proto\"\xef\x02\n\x0b\x46orchConfig\x12\x19\n\x04site\x18\x01 \x01(\x0b\x32\x0b.SiteConfig\x12+\n\rorchestration\x18\x02 \x01(\x0b\x32\x14.OrchestrationConfig\x12\x1f\n\x07process\x18\x03 \x01(\x0b\x32\x0e.ProcessConfig\x12\x19\n\x04http\x18\x04 \x01(\x0b\x32\x0b.HttpConfig\x12(\n\x0c\x65vent_client\x18\x05 \x01(\x0b\x32\x12.EventClientConfig\x12,\n\x0evarz_interface\x18\x06 \x01(\x0b\x32\x14.VarzInterfaceConfig\x12(\n\x0cproxy_server\x18\x07 \x01(\x0b\x32\x12.ProxyServerConfig\x12\x32\n\x14\x64\x61taplane_monitoring\x18\x08 \x01(\x0b\x32\x14.DataplaneMonitoring\x12&\n\x0e\x63pn_monitoring\x18\t \x01(\x0b\x32\x0e.CpnMonitoring\"\xc3\x01\n\nSiteConfig\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x31\n\x0b\x63ontrollers\x18\x02 \x03(\x0b\x32\x1c.SiteConfig.ControllersEntry\x1aJ\n\x10\x43ontrollersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12%\n\x05value\x18\x02 \x01(\x0b\x32\x16.SiteConfig.Controller:\x02\x38\x01\x1a(\n\nController\x12\x0c\n\x04\x66qdn\x18\x01 \x01(\t\x12\x0c\n\x04port\x18\x02 \x01(\x05\"\x8a\n\n\x13OrchestrationConfig\x12\x1e\n\x16structural_config_file\x18\x01 \x01(\t\x12\x1c\n\x14unauthenticated_vlan\x18\x08 \x01(\x05\x12\x10\n\x08tail_acl\x18\t \x01(\t\x12\x1e\n\x16\x62\x65havioral_config_file\x18\x02 \x01(\t\x12\x1f\n\x17static_device_placement\x18\x03 \x01(\t\x12\x1e\n\x16static_device_behavior\x18\x04 \x01(\t\x12\x1b\n\x13segments_vlans_file\x18\x05 \x01(\t\x12\x19\n\x11gauge_config_file\x18\n \x01(\t\x12\x1e\n\x16\x66\x61ucetize_interval_sec\x18\x06 \x01(\x05\x12\x34\n\x0b\x61uth_config\x18\x07 \x01(\x0b\x32\x1f.OrchestrationConfig.AuthConfig\x12>\n\x10sequester_config\x18\x0b \x01(\x0b\x32$.OrchestrationConfig.SequesterConfig\x1a\x82\x02\n\nAuthConfig\x12\x34\n\x0bradius_info\x18\x01 \x01(\x0b\x32\x1f.OrchestrationConfig.RadiusInfo\x12\x15\n\rheartbeat_sec\x18\x02 \x01(\x05\x12\x1a\n\x12max_radius_retries\x18\x03 \x01(\x05\x12\x19\n\x11query_timeout_sec\x18\x04 \x01(\x05\x12\x1a\n\x12reject_timeout_sec\x18\x05 \x01(\x05\x12\x18\n\x10\x61uth_timeout_sec\x18\x06 \x01(\x05\x12\x1a\n\x12\x61sync_radius_query\x18\x07 \x01(\x08\x12\x1e\n\x16\x64\x65\x63ision_cache_ttl_sec\x18\x08 \x01(\x05\x1a\x83\x01\n\nRadiusInfo\x12\x11\n\tserver_ip\x18\x01 \x01(\t\x12\x13\n\x0bserver_port\x18\x02 \x01(\x05\x12\x1c\n\x14radius_secret_helper\x18\x03 \x01(\t\x12\x13\n\x0bsource_port\x18\x04 \x01(\x05\x12\x1a\n\x12\x61\x64\x64itional_servers\x18\x05 \x03(\t\x1a\xe8\x03\n\x0fSequesterConfig\x12\x19\n\x11sequester_segment\x18\x01 \x01(\t\x12\x12\n\nvlan_start\x18\x02 \x01(\x05\x12\x10\n\x08vlan_end\x18\x03 \x01(\x05\x12\x18\n\x10port_description\x18\x04 \x01(\t\x12\x14\n\x0cservice_port\x18\x05 \x01(\x05\x12\x17\n\x0fservice_address\x18\x06 \x01(\t\x12\x11\n\ttunnel_ip\x18\n \x01(\t\x12\x1d\n\x15sequester_timeout_sec\x18\x07 \x01(\x05\x12\x39\n\x11\x61uto_sequestering\x18\x08 \x01(\x0e\x32\x1e.PortBehavior.AutoSequestering\x12g\n\x19test_result_device_states\x18\t \x03(\x0b\x32\x44.OrchestrationConfig.SequesterConfig.TestResultDeviceStateTransition\x1au\n\x1fTestResultDeviceStateTransition\x12+\n\x0btest_result\x18\x01 \x01(\x0e\x32\x16.TestResult.ResultCode\x12%\n\x0c\x64\x65vice_state\x18\x02 \x01(\x0e\x32\x0f.DVAState.State\"\x84\x04\n\rProcessConfig\x12\x19\n\x11scan_interval_sec\x18\x01 \x01(\x05\x12\x12\n\ncheck_vrrp\x18\x02 \x01(\x08\x12\x30\n\tprocesses\x18\x03 \x03(\x0b\x32\x1d.ProcessConfig.ProcessesEntry\x12\x34\n\x0b\x63onnections\x18\x04 \x03(\x0b\x32\x1f.ProcessConfig.ConnectionsEntry\x12\x19\n\x11vrrp_interval_sec\x18\x05 \x01(\x05\x12\x1c\n\x14process_interval_sec\x18\x06 \x01(\x05\x12\x1f\n\x17\x63onnection_interval_sec\x18\x07 \x01(\x05\x1aH\n\x0eProcessesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12%\n\x05value\x18\x02 \x01(\x0b\x32\x16.ProcessConfig.Process:\x02\x38\x01\x1aM\n\x10\x43onnectionsEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12(\n\x05value\x18\x02 \x01(\x0b\x32\x19.ProcessConfig.Connection:\x02\x38\x01\x1a\x46\n\x07Process\x12\r\n\x05regex\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x05\x12\x1d\n\x15\x63pu_percent_threshold\x18\x03 \x01(\x02\x1a!\n\nConnection\x12\x13\n\x0b\x64\x65scription\x18\x01 \x01(\t\"\xea\x01\n\nHttpConfig\x12\x11\n\thttp_root\x18\x01 \x01(\t\x12\x16\n\x0eworker_threads\x18\x02 \x01(\x05\x12\x1e\n\x16max_queued_connections\x18\x03 \x01(\x05\x12:\n\x10path_concurrency\x18\x04 \x03(\x0b\x32 .HttpConfig.PathConcurrencyEntry\x12\x1d\n\x15keepalive_timeout_sec\x18\x05 \x01(\x05\x1a\x36\n\x14PathConcurrencyEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\xbe\x01\n\x11\x45ventClientConfig\x12\x19\n\x11port_debounce_sec\x18\x01 \x01(\x05\x12&\n\x1estack_topo_change_coalesce_sec\x18\x02 \x01(\x05\x12,\n$config_hash_verification_timeout_sec\x18\x03 \x01(\x05\x12\x17\n\x0f\x63heckpoint_file\x18\x04 \x01(\t\x12\x1f\n\x17\x63heckpoint_interval_sec\x18\x05 \x01(\x05\"(\n\x13VarzInterfaceConfig\x12\x11\n\tvarz_port\x18\x01 \x01(\x05\"\xc3\x01\n\x11ProxyServerConfig\x12\x12\n\nproxy_port\x18\x01 \x01(\x05\x12\x30\n\x07targets\x18\x02 \x03(\x0b\x32\x1f.ProxyServerConfig.TargetsEntry\x12\x13\n\x0btimeout_sec\x18\x03 \x01(\x05\x12\x15\n\rcache_ttl_sec\x18\x04 \x01(\x02\x1a<\n\x0cTargetsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1b\n\x05value\x18\x02 \x01(\x0b\x32\x0c.ProxyTarget:\x02\x38\x01\"\x1b\n\x0bProxyTarget\x12\x0c\n\x04port\x18\x01 \x01(\x05\"\xd1\x01\n\x13\x44\x61taplaneMonitoring\x12\"\n\x1agauge_metrics_interval_sec\x18\x01 \x01(\x05\x12V\n\x1bvlan_pkt_per_sec_thresholds\x18\x02 \x03(\x0b\x32\x31.DataplaneMonitoring.VlanPktPerSecThresholdsEntry\x1a>\n\x1cVlanPktPerSecThresholdsEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\x05:\x02\x38\x01\"\x8a\x01\n\rCpnMonitoring\x12\x15\n\rping_interval\x18\x01 \x01(\x05\x12$\n\x1cmin_consecutive_ping_healthy\x18\x02 \x01(\x05\x12!\n\x19min_consecutive_ping_down\x18\x03 \x01(\x05\x12\x19\n\x11ping_interval_sec\x18\x04 \x01(\x02\x62\x06proto3')
   ,
   dependencies=[forch_dot_proto_dot_shared__constants__pb2.DESCRIPTOR,])
 
@@ -275,6 +275,20 @@ _ORCHESTRATIONCONFIG_AUTHCONFIG = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='async_radius_query', full_name='OrchestrationConfig.AuthConfig.async_radius_query', index=6,
+      number=7, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='decision_cache_ttl_sec', full_name='OrchestrationConfig.AuthConfig.decision_cache_ttl_sec', index=7,
+      number=8, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -288,7 +302,7 @@ _ORCHESTRATIONCONFIG_AUTHCONFIG = _descriptor.Descriptor(
   oneofs=[
   ],
   serialized_start=1053,
-  serialized_end=1251,
+  serialized_end=1311,
 )
 
 _ORCHESTRATIONCONFIG_RADIUSINFO = _descriptor.Descriptor(
@@ -326,6 +340,13 @@ _ORCHESTRATIONCONFIG_RADIUSINFO = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='additional_servers', full_name='OrchestrationConfig.RadiusInfo.additional_servers', index=4,
+      number=5, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -338,8 +359,8 @@ _ORCHESTRATIONCONFIG_RADIUSINFO = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1253,
-  serialized_end=1356,
+  serialized_start=1314,
+  serialized_end=1445,
 )
 
 _ORCHESTRATIONCONFIG_SEQUESTERCONFIG_TESTRESULTDEVICESTATETRANSITION = _descriptor.Descriptor(
@@ -375,8 +396,8 @@ _ORCHESTRATIONCONFIG_SEQUESTERCONFIG_TESTRESULTDEVICESTATETRANSITION = _descript
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1730,
-  serialized_end=1847,
+  serialized_start=1819,
+  serialized_end=1936,
 )
 
 _ORCHESTRATIONCONFIG_SEQUESTERCONFIG = _descriptor.Descriptor(
@@ -468,8 +489,8 @@ _ORCHESTRATIONCONFIG_SEQUESTERCONFIG = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1359,
-  serialized_end=1847,
+  serialized_start=1448,
+  serialized_end=1936,
 )
 
 _ORCHESTRATIONCONFIG = _descriptor.Descriptor(
@@ -569,7 +590,7 @@ _ORCHESTRATIONCONFIG = _descriptor.Descriptor(
   oneofs=[
   ],
   serialized_start=646,
-  serialized_end=1847,
+  serialized_end=1936,
 )
 
 
@@ -606,8 +627,8 @@ _PROCESSCONFIG_PROCESSESENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2018,
-  serialized_end=2090,
+  serialized_start=2197,
+  serialized_end=2269,
 )
 
 _PROCESSCONFIG_CONNECTIONSENTRY = _descriptor.Descriptor(
@@ -643,8 +664,8 @@ _PROCESSCONFIG_CONNECTIONSENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2092,
-  serialized_end=2169,
+  serialized_start=2271,
+  serialized_end=2348,
 )
 
 _PROCESSCONFIG_PROCESS = _descriptor.Descriptor(
@@ -687,8 +708,8 @@ _PROCESSCONFIG_PROCESS = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2171,
-  serialized_end=2241,
+  serialized_start=2350,
+  serialized_end=2420,
 )
 
 _PROCESSCONFIG_CONNECTION = _descriptor.Descriptor(
@@ -717,8 +738,8 @@ _PROCESSCONFIG_CONNECTION = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2243,
-  serialized_end=2276,
+  serialized_start=2422,
+  serialized_end=2455,
 )
 
 _PROCESSCONFIG = _descriptor.Descriptor(
@@ -756,6 +777,27 @@ _PROCESSCONFIG = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='vrrp_interval_sec', full_name='ProcessConfig.vrrp_interval_sec', index=4,
+      number=5, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='process_interval_sec', full_name='ProcessConfig.process_interval_sec', index=5,
+      number=6, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='connection_interval_sec', full_name='ProcessConfig.connection_interval_sec', index=6,
+      number=7, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -768,11 +810,48 @@ _PROCESSCONFIG = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1850,
-  serialized_end=2276,
+  serialized_start=1939,
+  serialized_end=2455,
 )
 
 
+_HTTPCONFIG_PATHCONCURRENCYENTRY = _descriptor.Descriptor(
+  name='PathConcurrencyEntry',
+  full_name='HttpConfig.PathConcurrencyEntry',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='key', full_name='HttpConfig.PathConcurrencyEntry.key', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='value', full_name='HttpConfig.PathConcurrencyEntry.value', index=1,
+      number=2, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=_b('8\001'),
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=2638,
+  serialized_end=2692,
+)
+
 _HTTPCONFIG = _descriptor.Descriptor(
   name='HttpConfig',
   full_name='HttpConfig',
@@ -787,10 +866,38 @@ _HTTPCONFIG = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='worker_threads', full_name='HttpConfig.worker_threads', index=1,
+      number=2, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='max_queued_connections', full_name='HttpConfig.max_queued_connections', index=2,
+      number=3, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='path_concurrency', full_name='HttpConfig.path_concurrency', index=3,
+      number=4, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='keepalive_timeout_sec', full_name='HttpConfig.keepalive_timeout_sec', index=4,
+      number=5, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
-  nested_types=[],
+  nested_types=[_HTTPCONFIG_PATHCONCURRENCYENTRY, ],
   enum_types=[
   ],
   serialized_options=None,
@@ -799,8 +906,8 @@ _HTTPCONFIG = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2278,
-  serialized_end=2309,
+  serialized_start=2458,
+  serialized_end=2692,
 )
 
 
@@ -832,6 +939,20 @@ _EVENTCLIENTCONFIG = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='checkpoint_file', full_name='EventClientConfig.checkpoint_file', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='checkpoint_interval_sec', full_name='EventClientConfig.checkpoint_interval_sec', index=4,
+      number=5, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -844,8 +965,8 @@ _EVENTCLIENTCONFIG = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2312,
-  serialized_end=2444,
+  serialized_start=2695,
+  serialized_end=2885,
 )
 
 
@@ -875,8 +996,8 @@ _VARZINTERFACECONFIG = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2446,
-  serialized_end=2486,
+  serialized_start=2887,
+  serialized_end=2927,
 )
 
 
@@ -913,8 +1034,8 @@ _PROXYSERVERCONFIG_TARGETSENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2580,
-  serialized_end=2640,
+  serialized_start=3065,
+  serialized_end=3125,
 )
 
 _PROXYSERVERCONFIG = _descriptor.Descriptor(
@@ -938,6 +1059,20 @@ _PROXYSERVERCONFIG = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='timeout_sec', full_name='ProxyServerConfig.timeout_sec', index=2,
+      number=3, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='cache_ttl_sec', full_name='ProxyServerConfig.cache_ttl_sec', index=3,
+      number=4, type=2, cpp_type=6, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -950,8 +1085,8 @@ _PROXYSERVERCONFIG = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2489,
-  serialized_end=2640,
+  serialized_start=2930,
+  serialized_end=3125,
 )
 
 
@@ -981,8 +1116,8 @@ _PROXYTARGET = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2642,
-  serialized_end=2669,
+  serialized_start=3127,
+  serialized_end=3154,
 )
 
 
@@ -1019,8 +1154,8 @@ _DATAPLANEMONITORING_VLANPKTPERSECTHRESHOLDSENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2819,
-  serialized_end=2881,
+  serialized_start=3304,
+  serialized_end=3366,
 )
 
 _DATAPLANEMONITORING = _descriptor.Descriptor(
@@ -1056,8 +1191,8 @@ _DATAPLANEMONITORING = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2672,
-  serialized_end=2881,
+  serialized_start=3157,
+  serialized_end=3366,
 )
 
 
@@ -1089,6 +1224,13 @@ _CPNMONITORING = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='ping_interval_sec', full_name='CpnMonitoring.ping_interval_sec', index=3,
+      number=4, type=2, cpp_type=6, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -1101,8 +1243,8 @@ _CPNMONITORING = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=2883,
-  serialized_end=2994,
+  serialized_start=3369,
+  serialized_end=3507,
 )
 
 _FORCHCONFIG.fields_by_name['site'].message_type = _SITECONFIG
@@ -1137,6 +1279,8 @@ _PROCESSCONFIG_PROCESS.containing_type = _PROCESSCONFIG
 _PROCESSCONFIG_CONNECTION.containing_type = _PROCESSCONFIG
 _PROCESSCONFIG.fields_by_name['processes'].message_type = _PROCESSCONFIG_PROCESSESENTRY
 _PROCESSCONFIG.fields_by_name['connections'].message_type = _PROCESSCONFIG_CONNECTIONSENTRY
+_HTTPCONFIG_PATHCONCURRENCYENTRY.containing_type = _HTTPCONFIG
+_HTTPCONFIG.fields_by_name['path_concurrency'].message_type = _HTTPCONFIG_PATHCONCURRENCYENTRY
 _PROXYSERVERCONFIG_TARGETSENTRY.fields_by_name['value'].message_type = _PROXYTARGET
 _PROXYSERVERCONFIG_TARGETSENTRY.containing_type = _PROXYSERVERCONFIG
 _PROXYSERVERCONFIG.fields_by_name['targets'].message_type = _PROXYSERVERCONFIG_TARGETSENTRY
@@ -1264,11 +1408,19 @@ _sym_db.RegisterMessage(ProcessConfig.Process)
 _sym_db.RegisterMessage(ProcessConfig.Connection)
 
 HttpConfig = _reflection.GeneratedProtocolMessageType('HttpConfig', (_message.Message,), dict(
+
+  PathConcurrencyEntry = _reflection.GeneratedProtocolMessageType('PathConcurrencyEntry', (_message.Message,), dict(
+    DESCRIPTOR = _HTTPCONFIG_PATHCONCURRENCYENTRY,
+    __module__ = 'forch.proto.forch_configuration_pb2'
+    # @@protoc_insertion_point(class_scope:HttpConfig.PathConcurrencyEntry)
+    ))
+  ,
   DESCRIPTOR = _HTTPCONFIG,
   __module__ = 'forch.proto.forch_configuration_pb2'
   # @@protoc_insertion_point(class_scope:HttpConfig)
   ))
 _sym_db.RegisterMessage(HttpConfig)
+_sym_db.RegisterMessage(HttpConfig.PathConcurrencyEntry)
 
 EventClientConfig = _reflection.GeneratedProtocolMessageType('EventClientConfig', (_message.Message,), dict(
   DESCRIPTOR = _EVENTCLIENTCONFIG,
@@ -1332,6 +1484,7 @@ _sym_db.RegisterMessage(CpnMonitoring)
 _SITECONFIG_CONTROLLERSENTRY._options = None
 _PROCESSCONFIG_PROCESSESENTRY._options = None
 _PROCESSCONFIG_CONNECTIONSENTRY._options = None
+_HTTPCONFIG_PATHCONCURRENCYENTRY._options = None
 _PROXYSERVERCONFIG_TARGETSENTRY._options = None
 _DATAPLANEMONITORING_VLANPKTPERSECTHRESHOLDSENTRY._options = None
 # @@protoc_insertion_point(module_scope)
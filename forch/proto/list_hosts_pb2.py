@@ -21,7 +21,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='',
   syntax='proto3',
   serialized_options=None,
-  serialized_pb=_b('\n\x1c\x66orch/proto/list_hosts.proto\x1a&forch/proto/network_metric_state.proto\x1a\"forch/proto/shared_constants.proto\"\xa3\x04\n\x08HostList\x12(\n\x08\x65th_srcs\x18\x01 \x03(\x0b\x32\x16.HostList.EthSrcsEntry\x12(\n\x08\x65th_dsts\x18\x02 \x03(\x0b\x32\x16.HostList.EthDstsEntry\x12\x12\n\negress_url\x18\x03 \x01(\t\x12\x18\n\x10system_state_url\x18\x04 \x01(\t\x1a\x42\n\x0c\x45thSrcsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12!\n\x05value\x18\x02 \x01(\x0b\x32\x12.HostList.HostData:\x02\x38\x01\x1a\x42\n\x0c\x45thDstsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12!\n\x05value\x18\x02 \x01(\x0b\x32\x12.HostList.HostData:\x02\x38\x01\x1a\xcd\x01\n\x08HostData\x12\x0e\n\x06switch\x18\x01 \x01(\t\x12\x0c\n\x04port\x18\x02 \x01(\x05\x12\x10\n\x08host_ips\x18\x03 \x03(\t\x12\x18\n\x04vlan\x18\x04 \x01(\x0b\x32\n.VlanState\x12\"\n\tdva_state\x18\x05 \x01(\x0e\x32\x0f.DVAState.State\x12\x17\n\x04\x61\x63ls\x18\x06 \x03(\x0b\x32\t.AclState\x12\x0b\n\x03url\x18\x07 \x01(\t\x12-\n\rradius_result\x18\x08 \x01(\x0b\x32\x16.HostList.RadiusResult\x1a=\n\x0cRadiusResult\x12\x0e\n\x06\x61\x63\x63\x65ss\x18\x01 \x01(\t\x12\x0f\n\x07segment\x18\x02 \x01(\t\x12\x0c\n\x04role\x18\x03 \x01(\tb\x06proto3')
+  serialized_pb=_b('\n\x1c\x66orch/proto/list_hosts.proto\x1a&forch/proto/network_metric_state.proto\x1a\"forch/proto/shared_constants.proto\"\xb8\x04\n\x08HostList\x12(\n\x08\x65th_srcs\x18\x01 \x03(\x0b\x32\x16.HostList.EthSrcsEntry\x12(\n\x08\x65th_dsts\x18\x02 \x03(\x0b\x32\x16.HostList.EthDstsEntry\x12\x12\n\negress_url\x18\x03 \x01(\t\x12\x18\n\x10system_state_url\x18\x04 \x01(\t\x12\x13\n\x0bnext_cursor\x18\x05 \x01(\t\x1a\x42\n\x0c\x45thSrcsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12!\n\x05value\x18\x02 \x01(\x0b\x32\x12.HostList.HostData:\x02\x38\x01\x1a\x42\n\x0c\x45thDstsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12!\n\x05value\x18\x02 \x01(\x0b\x32\x12.HostList.HostData:\x02\x38\x01\x1a\xcd\x01\n\x08HostData\x12\x0e\n\x06switch\x18\x01 \x01(\t\x12\x0c\n\x04port\x18\x02 \x01(\x05\x12\x10\n\x08host_ips\x18\x03 \x03(\t\x12\x18\n\x04vlan\x18\x04 \x01(\x0b\x32\n.VlanState\x12\"\n\tdva_state\x18\x05 \x01(\x0e\x32\x0f.DVAState.State\x12\x17\n\x04\x61\x63ls\x18\x06 \x03(\x0b\x32\t.AclState\x12\x0b\n\x03url\x18\x07 \x01(\t\x12-\n\rradius_result\x18\x08 \x01(\x0b\x32\x16.HostList.RadiusResult\x1a=\n\x0cRadiusResult\x12\x0e\n\x06\x61\x63\x63\x65ss\x18\x01 \x01(\t\x12\x0f\n\x07segment\x18\x02 \x01(\t\x12\x0c\n\x04role\x18\x03 \x01(\tb\x06proto3')
   ,
   dependencies=[forch_dot_proto_dot_network__metric__state__pb2.DESCRIPTOR,forch_dot_proto_dot_shared__constants__pb2.DESCRIPTOR,])
 
@@ -61,8 +61,8 @@ _HOSTLIST_ETHSRCSENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=251,
-  serialized_end=317,
+  serialized_start=272,
+  serialized_end=338,
 )
 
 _HOSTLIST_ETHDSTSENTRY = _descriptor.Descriptor(
@@ -98,8 +98,8 @@ _HOSTLIST_ETHDSTSENTRY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=319,
-  serialized_end=385,
+  serialized_start=340,
+  serialized_end=406,
 )
 
 _HOSTLIST_HOSTDATA = _descriptor.Descriptor(
@@ -177,8 +177,8 @@ _HOSTLIST_HOSTDATA = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=388,
-  serialized_end=593,
+  serialized_start=409,
+  serialized_end=614,
 )
 
 _HOSTLIST_RADIUSRESULT = _descriptor.Descriptor(
@@ -221,8 +221,8 @@ _HOSTLIST_RADIUSRESULT = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=595,
-  serialized_end=656,
+  serialized_start=616,
+  serialized_end=677,
 )
 
 _HOSTLIST = _descriptor.Descriptor(
@@ -260,6 +260,13 @@ _HOSTLIST = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='next_cursor', full_name='HostList.next_cursor', index=4,
+      number=5, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -273,7 +280,7 @@ _HOSTLIST = _descriptor.Descriptor(
   oneofs=[
   ],
   serialized_start=109,
-  serialized_end=656,
+  serialized_end=677,
 )
 
 _HOSTLIST_ETHSRCSENTRY.fields_by_name['value'].message_type = _HOSTLIST_HOSTDATA
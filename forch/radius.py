@@ -11,6 +11,7 @@ from forch.radius_datatypes import Concat
 from forch.utils import MessageParseError
 
 RADIUS_HEADER_LENGTH = 1 + 1 + 2 + 16
+MESSAGE_AUTHENTICATOR_LENGTH = 16
 
 PACKET_TYPE_PARSERS = {}
 
@@ -51,16 +52,16 @@ class Radius:
             MessageParseError: if packed_message cannot be parsed
         """
         try:
-            code, packet_id, _, authenticator = struct.unpack(
-                "!BBH16s", packed_message[:RADIUS_HEADER_LENGTH])
+            code, packet_id, _, authenticator = struct.unpack_from("!BBH16s", packed_message)
         except struct.error as exception:
             raise MessageParseError('Unable to unpack first 20 bytes of RADIUS header') \
                 from exception
 
         if code in PACKET_TYPE_PARSERS.keys():
+            view = memoryview(packed_message)
             radius_packet = PACKET_TYPE_PARSERS[code](packet_id, authenticator,
                                                       RadiusAttributesList.parse(
-                                                          packed_message[RADIUS_HEADER_LENGTH:]))
+                                                          view[RADIUS_HEADER_LENGTH:]))
             if code == Radius.ACCESS_REQUEST:
                 request_authenticator = authenticator
             else:
@@ -70,10 +71,11 @@ class Radius:
                 except KeyError as exception:
                     raise MessageParseError('Unknown RAIDUS packet_id: %s' % packet_id, ) \
                         from exception
+            if not secret:
+                raise ValueError("secret cannot be None for hashing")
             try:
-                return radius_packet.validate_packet(secret,
-                                                     request_authenticator=request_authenticator,
-                                                     code=code)
+                validate_packed_message(view, secret, request_authenticator, code)
+                return radius_packet
             except (InvalidMessageAuthenticatorError,
                     InvalidResponseAuthenticatorError) as exception:
                 raise MessageParseError("Unable to validate Radius packet") \
@@ -84,6 +86,53 @@ class Radius:
         """pack"""
 
 
+def validate_packed_message(packed_message, secret, request_authenticator, code):
+    """Validate the Response Authenticator and Message-Authenticator of a received packet.
+    Works on the packet as received, so nothing needs to be copied or re-packed per attribute.
+    Args:
+        packed_message (bytes-like): packet as received from the wire
+        secret (str): secret shared between RADIUS and chewie.
+        request_authenticator (bytes): authenticator of the request this packet answers
+        code (int): The RADIUS Code (e.g. Access-Challenge)
+    Raises:
+        InvalidResponseAuthenticatorError: if Response Authenticator does not match calculated.
+        InvalidMessageAuthenticatorError: if MessageAuthenticator does not match calculated.
+    """
+    packed = bytearray(packed_message)
+    secret = secret.encode()
+    if request_authenticator and code in [Radius.ACCESS_REJECT,
+                                          Radius.ACCESS_ACCEPT,
+                                          Radius.ACCESS_CHALLENGE]:
+        response_authenticator = bytes(packed[4:RADIUS_HEADER_LENGTH])
+        packed[4:RADIUS_HEADER_LENGTH] = request_authenticator
+        calculated_response_authenticator = hashlib.md5(packed + secret).digest()
+        if calculated_response_authenticator != response_authenticator:
+            raise InvalidResponseAuthenticatorError(
+                "Original ResponseAuthenticator: '%s', does not match calculated: '%s' %s" % (
+                    response_authenticator,
+                    calculated_response_authenticator,
+                    binascii.hexlify(packed)))
+
+    position = RADIUS_HEADER_LENGTH
+    while position + Attribute.HEADER_SIZE <= len(packed):
+        if packed[position] == MessageAuthenticator.TYPE:
+            break
+        position += max(packed[position + 1], Attribute.HEADER_SIZE)
+    else:
+        return
+
+    packed[4:RADIUS_HEADER_LENGTH] = request_authenticator
+    start = position + Attribute.HEADER_SIZE
+    end = start + MESSAGE_AUTHENTICATOR_LENGTH
+    original_ma = bytes(packed[start:end])
+    packed[start:end] = bytes(MESSAGE_AUTHENTICATOR_LENGTH)
+    new_ma = hmac.new(secret, packed, 'md5').digest()
+    if original_ma != new_ma:
+        raise InvalidMessageAuthenticatorError(
+            "Original Message-Authenticator: '%s', does not match calculated: '%s'" %
+            (binascii.hexlify(original_ma), binascii.hexlify(new_ma)))
+
+
 def register_packet_type_parser(cls):
     """register packet type parser"""
     PACKET_TYPE_PARSERS[cls.CODE] = cls.parse
@@ -268,17 +317,16 @@ class RadiusAttributesList:
             if it cannot parse the attribute's data
         """
         # Join Attributes that's datatype is Concat into one attribute.
+        if not attributes_to_concat:
+            return attributes
         concatenated_attributes = []
         for value, list_ in attributes_to_concat.items():
-            concatenated_data = b""
-            index = 0
-            for data, index in list_:
-                concatenated_data += data.bytes_data
+            concatenated_data = b"".join(data.bytes_data for data, _ in list_)
+            index = list_[-1][1]
             concatenated_attributes.append(tuple((ATTRIBUTE_TYPES[value].parse(concatenated_data),
                                                   index)))
         # Remove old Attributes that were concatenated.
-        for concat_attr, _ in concatenated_attributes:
-            attributes = [x for x in attributes if x.TYPE != concat_attr.TYPE]
+        attributes = [x for x in attributes if x.TYPE not in attributes_to_concat]
 
         # need to put them back in the same position.
         for concat_attr, index in concatenated_attributes:
@@ -299,21 +347,23 @@ class RadiusAttributesList:
             MessageParseError: RadiusAttribute.parse will raise error
             if it cannot parse the attribute's data
         """
-        total_length = len(attributes_data)
+        view = memoryview(attributes_data)
+        total_length = len(view)
         pos = 0
         index = -1
         last_attribute = -1
         while pos < total_length:
             try:
-                type_, attr_length = struct.unpack("!BB",
-                                                   attributes_data[pos:pos + Attribute.HEADER_SIZE])
+                type_, attr_length = struct.unpack_from("!BB", view, pos)
             except struct.error as exception:
                 raise MessageParseError('Unable to unpack first 2 bytes of attribute header') \
                     from exception
-            data = attributes_data[pos + Attribute.HEADER_SIZE: pos + attr_length]
+            if attr_length < Attribute.HEADER_SIZE or pos + attr_length > total_length:
+                raise MessageParseError('Invalid length %d for RADIUS attribute %s' %
+                                        (attr_length, type_))
+            packed_value = view[pos + Attribute.HEADER_SIZE: pos + attr_length]
             pos += attr_length
 
-            packed_value = data[:attr_length - Attribute.HEADER_SIZE]
             try:
                 attribute = ATTRIBUTE_TYPES[type_].parse(packed_value)
             except KeyError as exception:
@@ -369,10 +419,7 @@ class RadiusAttributesList:
 
     def pack(self):
         """pack and return attributes"""
-        packed_attributes = bytes()
-        for attr in self.attributes:
-            packed_attributes += attr.pack()
-        return packed_attributes
+        return b"".join(attr.pack() for attr in self.attributes)
 
     def to_dict(self):
         """Convert object to dict"""
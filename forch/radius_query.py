@@ -1,9 +1,10 @@
 """Talks and listens to RADIUS. Takes a packet object as input"""
 
+import hmac
 import os
 
 from forch.radius import RadiusAttributesList, RadiusAccessRequest, Radius
-from forch.radius_attributes import CallingStationId, MessageAuthenticator, \
+from forch.radius_attributes import Attribute, CallingStationId, MessageAuthenticator, \
         NASPort, CalledStationId, ServiceType, NASPortType
 from forch.radius_socket import RadiusSocket
 from forch.utils import MessageParseError, get_logger
@@ -18,6 +19,93 @@ SERVICE_CALL_CHECK = 10
 NAS_TYPE_ETHERNET = 15
 
 
+def _get_mab_attributes(src_mac, port_id):
+    attr_list = []
+    attr_list.append(ServiceType.create(SERVICE_CALL_CHECK))
+    attr_list.append(CalledStationId.create(str(src_mac).replace(':', "")))
+    attr_list.append(CallingStationId.create(str(src_mac).replace(':', '-')))
+    attr_list.append(NASPortType.create(NAS_TYPE_ETHERNET))
+    if port_id:
+        attr_list.append(NASPort.create(port_id))
+    attr_list.append(MessageAuthenticator.create(
+        bytes.fromhex("00000000000000000000000000000000")))
+    return RadiusAttributesList(attr_list)
+
+
+def encode_mab_request(radius_id, req_authenticator, src_mac, port_id, radius_secret):
+    """Build a packed MAB Access-Request for the given MAC address"""
+    attributes = _get_mab_attributes(src_mac, port_id)
+    access_request = RadiusAccessRequest(radius_id, req_authenticator, attributes)
+    return access_request.build(radius_secret)
+
+
+class MabRequestTemplate:
+    """Pre-packed MAB Access-Request where only the per-request fields are patched in
+
+    The attributes of a MAB request only differ in the MAC address and port, which have fixed
+    lengths for colon separated MACs, so the packet is packed once and copied per request.
+    Other MAC formats fall back to encode_mab_request.
+    """
+
+    _TEMPLATE_MAC = '00:00:00:00:00:00'
+
+    def __init__(self, radius_secret):
+        self._radius_secret = radius_secret
+        self._hmac = hmac.new(radius_secret.encode(), digestmod='md5') if radius_secret else None
+        self._templates = {
+            False: self._make_template(None),
+            True: self._make_template(1),
+        }
+
+    def _make_template(self, port_id):
+        attributes = _get_mab_attributes(self._TEMPLATE_MAC, port_id)
+        packed = RadiusAccessRequest(0, bytes(16), attributes).pack()
+
+        def offset(attribute):
+            return (attributes.indexof(attribute.DESCRIPTION) + RADIUS_HEADER_LENGTH +
+                    Attribute.HEADER_SIZE)
+
+        offsets = (offset(CalledStationId), offset(CallingStationId),
+                   offset(NASPort) if port_id else None, offset(MessageAuthenticator))
+        return bytes(packed), offsets
+
+    def encode(self, radius_id, req_authenticator, src_mac, port_id=None):
+        """Build a packed MAB Access-Request for the given MAC address"""
+        mac = str(src_mac).encode()
+        if len(mac) != len(self._TEMPLATE_MAC) or mac[2::3] != b':::::' or not self._hmac:
+            return encode_mab_request(
+                radius_id, req_authenticator, src_mac, port_id, self._radius_secret)
+
+        template, offsets = self._templates[bool(port_id)]
+        called, calling, nas_port, message_authenticator = offsets
+        packed = bytearray(template)
+        packed[1] = radius_id
+        packed[4:RADIUS_HEADER_LENGTH] = req_authenticator
+        packed[called:called + 12] = mac.replace(b':', b'')
+        packed[calling:calling + 17] = mac.replace(b':', b'-')
+        if nas_port:
+            packed[nas_port:nas_port + 4] = port_id.to_bytes(4, 'big')
+        digest = self._hmac.copy()
+        digest.update(packed)
+        packed[message_authenticator:message_authenticator + 16] = digest.digest()
+        return packed
+
+
+def get_auth_result(radius):
+    """Extract (code, segment, role) from a decoded RADIUS response"""
+    # TODO: protobuf for received radius message
+    code = INVALID_RESP
+    if radius.CODE == Radius.ACCESS_ACCEPT:
+        code = ACCEPT
+    elif radius.CODE == Radius.ACCESS_REJECT:
+        code = REJECT
+    attr = radius.attributes.find('Tunnel-Private-Group-ID')
+    segment = attr.data().decode('utf-8') if attr else None
+    attr = radius.attributes.find('Tunnel-Assignment-ID')
+    role = attr.data().decode('utf-8') if attr else None
+    return code, segment, role
+
+
 class RadiusQuery:
     """Maintains socket information and sends out and receives requests form RADIUS server"""
     def __init__(self, socket_info, radius_secret, auth_callback):
@@ -28,6 +116,7 @@ class RadiusQuery:
         self.running = True
         # TODO: Find better way to handle secret
         self.radius_secret = radius_secret
+        self._mab_template = MabRequestTemplate(radius_secret)
         self.radius_socket = RadiusSocket(socket_info.source_ip, socket_info.source_port,
                                           socket_info.server_ip, socket_info.server_port)
         self._logger = get_logger('rquery')
@@ -49,25 +138,20 @@ class RadiusQuery:
             try:
                 radius = self._decode_radius_response(packed_message)
             except MessageParseError as exception:
-                self._logger.warning("exception: %s. message: %s", packed_message, exception)
-                raise
-            # TODO: protobuf for received radius message
-            code = INVALID_RESP
-            if radius.CODE == 2:
-                code = ACCEPT
-            elif radius.CODE == 3:
-                code = REJECT
+                self._logger.warning("exception: %s. message: %s", exception, packed_message)
+                continue
+            code, segment, role = get_auth_result(radius)
             src_mac = self.get_mac_from_packet_id(radius.packet_id)['src_mac']
             self._logger.debug(
                 'Received RADIUS msg: Code:%s src:%s attributes:%s', code, src_mac,
                 radius.attributes.to_dict())
             if self.auth_callback:
-                attr = radius.attributes.find('Tunnel-Private-Group-ID')
-                segment = attr.data().decode('utf-8') if attr else None
-                attr = radius.attributes.find('Tunnel-Assignment-ID')
-                role = attr.data().decode('utf-8') if attr else None
                 self.auth_callback(src_mac, code, segment, role)
 
+    def stop(self):
+        """Stop receiving RADIUS messages"""
+        self.running = False
+
     def send_mab_request(self, src_mac, port_id):
         """Encode and send MAB request for MAC address"""
         req_packet = self._encode_mab_message(src_mac, port_id)
@@ -80,18 +164,7 @@ class RadiusQuery:
         self._packet_id_to_mac[radius_id] = {'src_mac': src_mac, 'port_id': port_id}
         self.packet_id_to_req_authenticator[radius_id] = req_authenticator
 
-        attr_list = []
-        attr_list.append(ServiceType.create(SERVICE_CALL_CHECK))
-        attr_list.append(CalledStationId.create(str(src_mac).replace(':', "")))
-        attr_list.append(CallingStationId.create(str(src_mac).replace(':', '-')))
-        attr_list.append(NASPortType.create(NAS_TYPE_ETHERNET))
-        if port_id:
-            attr_list.append(NASPort.create(port_id))
-        attr_list.append(MessageAuthenticator.create(
-            bytes.fromhex("00000000000000000000000000000000")))
-        attributes = RadiusAttributesList(attr_list)
-        access_request = RadiusAccessRequest(radius_id, req_authenticator, attributes)
-        return access_request.build(self.radius_secret)
+        return self._mab_template.encode(radius_id, req_authenticator, src_mac, port_id)
 
     def _decode_radius_response(self, packed_msg):
         return Radius.parse(packed_msg, self.radius_secret, self.packet_id_to_req_authenticator)
@@ -0,0 +1,119 @@
+"""Pool of RADIUS servers balancing requests by outstanding count and latency"""
+
+import time
+
+from forch.utils import get_logger
+
+EWMA_ALPHA = 0.2
+MAX_CONSECUTIVE_TIMEOUTS = 3
+RECOVERY_SEC = 30
+
+
+class RadiusServer:
+    """Request book keeping of a single RADIUS server"""
+
+    # pylint: disable=too-few-public-methods
+    def __init__(self, server_ip, server_port):
+        self.address = (server_ip, server_port)
+        self.name = '%s:%s' % self.address
+        self.outstanding = 0
+        self.latency_sec = 0.0
+        self.consecutive_timeouts = 0
+        self.down_until = 0
+
+    def is_up(self, now):
+        """Return if the server can take new requests"""
+        return self.down_until <= now
+
+
+class RadiusServerPool:
+    """Selects the RADIUS server with the least outstanding requests, then lowest EWMA latency
+
+    A server that times out MAX_CONSECUTIVE_TIMEOUTS requests in a row is taken out of rotation
+    for recovery_sec, after which it gets requests again and recovers on its first response.
+    Not thread-safe, all calls are expected from the RADIUS client loop.
+    """
+
+    def __init__(self, servers, metrics=None, recovery_sec=None):
+        if not servers:
+            raise ValueError('No RADIUS servers given')
+        self._servers = [RadiusServer(server_ip, server_port) for server_ip, server_port in servers]
+        self._addresses = {server.address: server for server in self._servers}
+        self._recovery_sec = recovery_sec or RECOVERY_SEC
+        self._metrics = metrics
+        self._logger = get_logger('rpool')
+        for server in self._servers:
+            self._update_server_varz(server)
+
+    def __len__(self):
+        return len(self._servers)
+
+    def get_servers(self):
+        """Return all servers of the pool"""
+        return list(self._servers)
+
+    def get_server(self, address):
+        """Return the server with the given (ip, port) address, or None"""
+        return self._addresses.get(address)
+
+    def select(self, exclude=None):
+        """Return the server to send the next request to, avoiding exclude when possible"""
+        now = time.time()
+        candidates = [server for server in self._servers if server.is_up(now)]
+        if exclude and len(candidates) > 1:
+            candidates = [server for server in candidates if server is not exclude]
+        if not candidates:
+            return min(self._servers, key=lambda server: server.down_until)
+        return min(candidates, key=lambda server: (server.outstanding, server.latency_sec))
+
+    def request_sent(self, server):
+        """Account a request sent to the server"""
+        server.outstanding += 1
+        if self._metrics:
+            self._metrics.inc_var('radius_server_requests', labels=[server.name])
+        self._update_server_varz(server)
+
+    def response_received(self, server, latency_sec):
+        """Account a response from the server and bring it back up if it was down"""
+        server.outstanding -= 1
+        server.latency_sec = self._ewma(server, latency_sec)
+        server.consecutive_timeouts = 0
+        if server.down_until:
+            self._logger.info('RADIUS server %s recovered', server.name)
+            server.down_until = 0
+        self._update_server_varz(server)
+
+    def request_timed_out(self, server, timeout_sec):
+        """Account a request to the server timing out, failing the server over if needed"""
+        server.outstanding -= 1
+        server.latency_sec = self._ewma(server, timeout_sec)
+        server.consecutive_timeouts += 1
+        if server.consecutive_timeouts >= MAX_CONSECUTIVE_TIMEOUTS and not server.down_until:
+            self._logger.warning(
+                'RADIUS server %s timed out %s requests, failing over for %ss', server.name,
+                server.consecutive_timeouts, self._recovery_sec)
+            server.down_until = time.time() + self._recovery_sec
+        elif server.down_until:
+            server.down_until = time.time() + self._recovery_sec
+        if self._metrics:
+            self._metrics.inc_var('radius_server_timeouts', labels=[server.name])
+        self._update_server_varz(server)
+
+    def request_abandoned(self, server):
+        """Account a request to the server that finished without response or timeout"""
+        server.outstanding -= 1
+        self._update_server_varz(server)
+
+    @staticmethod
+    def _ewma(server, sample):
+        if not server.latency_sec:
+            return sample
+        return EWMA_ALPHA * sample + (1 - EWMA_ALPHA) * server.latency_sec
+
+    def _update_server_varz(self, server):
+        if not self._metrics:
+            return
+        labels = [server.name]
+        self._metrics.update_var('radius_server_outstanding', server.outstanding, labels=labels)
+        self._metrics.update_var('radius_server_latency_sec', server.latency_sec, labels=labels)
+        self._metrics.update_var('radius_server_up', int(not server.down_until), labels=labels)
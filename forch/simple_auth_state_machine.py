@@ -26,8 +26,8 @@ class AuthStateMachine():
     AUTH_TIMEOUT_SEC = 3600
 
     # pylint: disable=too-many-arguments
-    def __init__(self, src_mac, port_id, auth_config,
-                 radius_query_callback, auth_callback, metrics=None):
+    def __init__(self, src_mac, port_id, auth_config, radius_query_callback, auth_callback,
+                 metrics=None, heartbeat_request_timeouts=True):
         self.src_mac = src_mac
         self.port_id = port_id
         self._auth_callback = auth_callback
@@ -40,6 +40,7 @@ class AuthStateMachine():
         self._rej_timeout_sec = auth_config.reject_timeout_sec or self.REJECT_TIMEOUT_SEC
         self._auth_timeout_sec = auth_config.auth_timeout_sec or self.AUTH_TIMEOUT_SEC
         self._metrics = metrics
+        self._heartbeat_request_timeouts = heartbeat_request_timeouts
         self._transition_lock = Lock()
         self._logger = get_logger('mabsm')
 
@@ -79,6 +80,16 @@ class AuthStateMachine():
             self._radius_query_callback(self.src_mac, self.port_id)
             self._current_timeout = time.time() + self._calculate_backoff_sec()
 
+    def host_learned_cached(self, segment, role):
+        """Host learn event with a cached accept, applied now and revalidated with RADIUS"""
+        with self._transition_lock:
+            if self._current_state != self.UNAUTH:
+                self._reset_state_machine()
+            self._state_transition(self.REQUEST, self.UNAUTH)
+            self._auth_callback(self.src_mac, self.ACCEPT, segment, role)
+            self._radius_query_callback(self.src_mac, self.port_id)
+            self._current_timeout = time.time() + self._calculate_backoff_sec()
+
     def host_expired(self):
         """Host expired"""
         with self._transition_lock:
@@ -107,17 +118,35 @@ class AuthStateMachine():
             self._reset_state_machine()
             self._auth_callback(self.src_mac, self.UNAUTH, None, None)
 
+    def received_radius_timeout(self):
+        """RADIUS request timed out on the query loop after its own retries"""
+        with self._transition_lock:
+            if self._current_state != self.REQUEST:
+                return
+            self._logger.error('RADIUS request timed out for %s', self.src_mac)
+            if self._metrics:
+                self._metrics.inc_var('radius_query_timeouts')
+            if self._radius_retries < self._max_radius_retries:
+                self._increment_radius_retries()
+                self._resend_radius_request()
+            else:
+                self._reset_state_machine()
+                self._auth_callback(self.src_mac, self.UNAUTH, None, None)
+
     def handle_sm_timer(self):
         """
         Handle timer timeout behavior of states:
         * REQUEST: request timeout & retries < max_retries  => REQUEST + send request
         * REQUEST: request timeout & retries == max_retries => UNAUTH  + deauthenticate
+          (only with heartbeat request timeouts, else received_radius_timeout handles them)
         * ACCEPT:  auth timeout => REQUEST + send request
         * UNAUTH:  any timeout  => REQUEST + send request
         * Unknown: any timeout  => UNAUTH  + deauthenticate
         """
         with self._transition_lock:
             if time.time() > self._current_timeout:
+                if self._current_state == self.REQUEST and not self._heartbeat_request_timeouts:
+                    return
                 if self._current_state == self.REQUEST:
                     self._logger.error('RADIUS request timed out for %s', self.src_mac)
                     if self._radius_retries:
@@ -0,0 +1,80 @@
+"""Bring up forch subsystems concurrently, timing each startup phase"""
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from forch.utils import get_logger
+from forch.varz_state_collector import get_backoff_sec
+
+MAX_CONCURRENT_PHASES = 8
+
+
+def wait_until_ready(check_ready, timeout_sec, description):
+    """Poll check_ready with exponential backoff until it returns a true value or times out"""
+    deadline = time.monotonic() + timeout_sec
+    retry = 0
+    while True:
+        error = None
+        try:
+            result = check_ready()
+            if result:
+                return result
+        except Exception as e:
+            error = e
+        remaining_sec = deadline - time.monotonic()
+        if remaining_sec <= 0:
+            raise TimeoutError(f'{description} not ready after {timeout_sec}s: {error}')
+        time.sleep(min(remaining_sec, get_backoff_sec(retry)))
+        retry += 1
+
+
+class StartupSequencer:
+    """Run startup phases in order or concurrently, recording their durations"""
+
+    def __init__(self):
+        self._timings = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=MAX_CONCURRENT_PHASES, thread_name_prefix='startup')
+        self._logger = get_logger('startup')
+
+    def _run_phase(self, name, func):
+        start = time.monotonic()
+        try:
+            return func()
+        finally:
+            duration = time.monotonic() - start
+            with self._lock:
+                self._timings[name] = duration
+            self._logger.info('Startup phase %s took %.3fs', name, duration)
+
+    def run(self, name, func):
+        """Run a startup phase in the calling thread"""
+        return self._run_phase(name, func)
+
+    def submit(self, name, func):
+        """Start a startup phase concurrently with others, returning a Future"""
+        future = self._executor.submit(self._run_phase, name, func)
+        self._futures[name] = future
+        return future
+
+    def wait(self):
+        """Wait for all submitted phases and release their threads, raising the first error"""
+        futures, self._futures = self._futures, {}
+        self._executor.shutdown(wait=False)
+        errors = []
+        for name, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                self._logger.error('Startup phase %s failed: %s', name, e)
+                errors.append(e)
+        if errors:
+            raise errors[0]
+
+    def get_timings(self):
+        """Get the duration of each finished phase in seconds"""
+        with self._lock:
+            return dict(self._timings)
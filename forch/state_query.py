@@ -0,0 +1,75 @@
+"""Filtering, paging and field projection for state API requests"""
+
+from forch.proto.shared_constants_pb2 import DVAState
+
+EXCLUDE_FIELDS = ('acls', 'vlan', 'ports', 'macs', 'root_path')
+
+
+def _parse_port_range(port_range):
+    start, _, end = port_range.partition('-')
+    start = int(start)
+    end = int(end) if end else start
+    if start > end:
+        raise ValueError(f'Invalid port range {port_range}')
+    return start, end
+
+
+class StateQuery:
+    """Filters, page and excluded fields of a list_hosts or switch_state request
+
+    Entries are walked in sorted key order. The cursor is the key of the last entry
+    of the previous page, so a page is the first limit matching entries after it.
+    """
+
+    def __init__(self, params=None):
+        """Build a query from request params, raising ValueError on invalid values"""
+        params = params or {}
+        self.switch = params.get('switch')
+        self.ports = _parse_port_range(params['port']) if params.get('port') else None
+        self.vlan = int(params['vlan']) if params.get('vlan') else None
+        dva_state = params.get('dva_state')
+        self.dva_state = DVAState.State.Value(dva_state) if dva_state else None
+        self.radius = params.get('radius')
+        self.limit = int(params['limit']) if params.get('limit') else 0
+        self.cursor = params.get('cursor')
+        self.exclude = set(params['exclude'].split(',')) if params.get('exclude') else set()
+        if self.limit < 0:
+            raise ValueError(f'Invalid limit {self.limit}')
+        unknown = self.exclude.difference(EXCLUDE_FIELDS)
+        if unknown:
+            raise ValueError(f'Unknown excluded fields {", ".join(sorted(unknown))}')
+
+    def get_single_port(self):
+        """Return the port if the query is restricted to a single one, else None"""
+        if self.ports and self.ports[0] == self.ports[1]:
+            return self.ports[0]
+        return None
+
+    def includes(self, field):
+        """Check if a field is projected into the result"""
+        return field not in self.exclude
+
+    def match_switch(self, switch):
+        """Check if a switch passes the switch filter"""
+        return not self.switch or switch == self.switch
+
+    def match_port(self, port):
+        """Check if a port number passes the port range filter"""
+        return not self.ports or self.ports[0] <= int(port) <= self.ports[1]
+
+    def page(self, keys, match=None):
+        """Return (page keys, next cursor) of the sorted keys matching the match function
+
+        The match function is not called past the first match after the page, and the next
+        cursor is None if there are no more matching keys.
+        """
+        page_keys = []
+        for key in sorted(keys):
+            if self.cursor is not None and key <= self.cursor:
+                continue
+            if match and not match(key):
+                continue
+            if self.limit and len(page_keys) == self.limit:
+                return page_keys, page_keys[-1]
+            page_keys.append(key)
+        return page_keys, None
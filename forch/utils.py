@@ -1,5 +1,6 @@
 """Utility functions for forch"""
 
+import json
 import logging
 from logging.handlers import WatchedFileHandler
 import os
@@ -24,6 +25,10 @@ class ConfigError(Exception):
 class FaucetEventOrderError(Exception):
     """Error for when Faucet event is out of sequence"""
 
+    def __init__(self, message, gap=0):
+        super().__init__(message)
+        self.gap = gap
+
 
 class MetricsFetchingError(Exception):
     """Failure of fetching target metrics"""
@@ -76,11 +81,15 @@ def proto_dict(message,
     )
 
 
-def proto_json(message):
-    """Convert a proto message to a json string"""
+def proto_json(message, compact=False, including_default_value_fields=True):
+    """Convert a proto message to a json string, without indentation or spaces if compact"""
+    if compact:
+        return json.dumps(
+            proto_dict(message, including_default_value_fields=including_default_value_fields),
+            separators=(',', ':'))
     return json_format.MessageToJson(
         message,
-        including_default_value_fields=True,
+        including_default_value_fields=including_default_value_fields,
         preserving_proto_field_name=True,
     )
 
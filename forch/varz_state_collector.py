@@ -1,29 +1,229 @@
 """Scrape varz from Faucet and Gauge"""
 
+from concurrent.futures import ThreadPoolExecutor
+import collections
+import http.client
+import random
+import re
+import threading
 import time
-import urllib.request
-
-import prometheus_client.parser
+import urllib.parse
 
 from forch.utils import get_logger, MetricsFetchingError
 
+DEFAULT_TIMEOUT_SEC = 10
+MAX_CONCURRENT_SCRAPES = 4
+BACKOFF_BASE_SEC = 0.2
+BACKOFF_MAX_SEC = 5
+
+VarzMetric = collections.namedtuple('VarzMetric', 'name, samples')
+VarzSample = collections.namedtuple('VarzSample', 'name, labels, value')
+
+_FAMILY_SUFFIXES = {
+    b'summary': (b'', b'_count', b'_sum'),
+    b'histogram': (b'_count', b'_sum', b'_bucket'),
+}
+_LABEL_RE = re.compile(rb'\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*"((?:[^"\\]|\\.)*)"\s*,?')
+_LABEL_ESCAPES = {b'\\\\': '\\', b'\\"': '"', b'\\n': '\n'}
+_LABEL_ESCAPE_RE = re.compile(rb'\\[\\"n]')
+_NAME_RE = re.compile(rb'[^{\s]*')
+_NAME_END_CHARS = frozenset(b'{ \t')
+
+
+def get_backoff_sec(retry):
+    """Get the exponential backoff with full jitter before the given retry"""
+    return random.uniform(0, min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * 2 ** retry))
+
+
+def _get_family_name(name, typ):
+    if typ == b'counter' and name.endswith(b'_total'):
+        return name[:-6]
+    return name
+
+
+def _parse_labels(text):
+    labels = {}
+    for match in _LABEL_RE.finditer(text):
+        value = match.group(2)
+        if b'\\' in value:
+            value = _LABEL_ESCAPE_RE.sub(lambda escape: _LABEL_ESCAPES[escape.group(0)].encode(),
+                                         value)
+        labels[match.group(1).decode()] = value.decode()
+    return labels
+
+
+def _parse_sample(line, name_end, sample_name):
+    if line[name_end:name_end + 1] == b'{':
+        labels_end = line.rindex(b'}')
+        labels = _parse_labels(line[name_end + 1:labels_end])
+        value = line[labels_end + 1:].split()[0]
+    else:
+        labels = {}
+        value = line[name_end:].split()[0]
+    return VarzSample(sample_name, labels, float(value))
+
+
+def _get_name_end(line):
+    return _NAME_RE.match(line).end()
+
+
+def _parse_family_header(line, name, typ):
+    parts = line.split(None, 3)
+    if len(parts) < 3 or parts[1] not in (b'HELP', b'TYPE'):
+        return name, typ
+    if parts[2] != name:
+        name, typ = parts[2], b'untyped'
+    if parts[1] == b'TYPE' and len(parts) > 3:
+        typ = parts[3].strip()
+    return name, typ
+
+
+def parse_target_samples(lines, target_metrics):
+    """Parse Prometheus text exposition lines, yielding (family name, VarzSample) tuples
+
+    Only samples of families in target_metrics are parsed. Samples of other families are
+    skipped by name prefix without tokenizing their labels. Families are named, and
+    counter samples are suffixed with _total, the way prometheus_client.parser does.
+    """
+    targets = {name.encode() for name in target_metrics}
+    name, typ, allowed_names, wanted = b'', b'untyped', (), False
+    for line in lines:
+        if line.startswith(b'#'):
+            name, typ = _parse_family_header(line, name, typ)
+            allowed_names = tuple(name + suffix for suffix in _FAMILY_SUFFIXES.get(typ, (b'',)))
+            wanted = _get_family_name(name, typ) in targets
+            continue
+        if not wanted and name and line.startswith(name):
+            if len(line) > len(name) and line[len(name)] in _NAME_END_CHARS:
+                if name in allowed_names:
+                    continue
+            elif line[:_get_name_end(line)] in allowed_names:
+                continue
+        line = line.strip()
+        if not line:
+            continue
+        name_end = _get_name_end(line)
+        sample_name = line[:name_end]
+        if sample_name not in allowed_names:
+            # A sample outside the current family is an untyped family of its own.
+            name, typ, allowed_names, wanted = b'', b'untyped', (), False
+            if sample_name in targets:
+                yield sample_name.decode(), _parse_sample(line, name_end, sample_name.decode())
+            continue
+        if not wanted:
+            continue
+        if typ == b'counter' and not name.endswith(b'_total'):
+            sample_name += b'_total'
+        yield _get_family_name(name, typ).decode(), _parse_sample(
+            line, name_end, sample_name.decode())
+
+
+class _CountingLines:
+    """Iterates lines of a response, counting the bytes read"""
+
+    def __init__(self, lines):
+        self._lines = lines
+        self.size = 0
+
+    def __iter__(self):
+        for line in self._lines:
+            self.size += len(line)
+            yield line
+
+
+class VarzEndpointClient:
+    """Client of a varz endpoint reusing idle keep-alive connections"""
+
+    def __init__(self, endpoint, timeout_sec):
+        url = urllib.parse.urlsplit(endpoint)
+        self._host = url.hostname
+        self._port = url.port
+        self._path = url.path or '/'
+        self._timeout_sec = timeout_sec
+        self._idle_connections = []
+        self._lock = threading.Lock()
+
+    def scrape(self, target_metrics):
+        """Scrape the target metrics, returning (metric map, response size)"""
+        while True:
+            connection, reused = self._get_connection()
+            try:
+                connection.request('GET', self._path)
+                response = connection.getresponse()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                # An idle connection may have been closed by the endpoint, so retry on a new one.
+                if reused:
+                    continue
+                raise
+            try:
+                if response.status != http.HTTPStatus.OK:
+                    raise http.client.HTTPException(f'HTTP status {response.status}')
+                lines = _CountingLines(response)
+                metric_map = {}
+                for name, sample in parse_target_samples(lines, target_metrics):
+                    metric = metric_map.get(name)
+                    if not metric:
+                        metric = metric_map[name] = VarzMetric(name, [])
+                    metric.samples.append(sample)
+                # Reading lines never marks the response done, so drain it to reuse the connection.
+                response.read()
+                response.close()
+            except Exception:
+                connection.close()
+                raise
+            self._release_connection(connection, response)
+            return metric_map, lines.size
+
+    def close(self):
+        """Close idle connections"""
+        with self._lock:
+            connections, self._idle_connections = self._idle_connections, []
+        for connection in connections:
+            connection.close()
+
+    def _get_connection(self):
+        with self._lock:
+            if self._idle_connections:
+                return self._idle_connections.pop(), True
+        return http.client.HTTPConnection(
+            self._host, self._port, timeout=self._timeout_sec), False
+
+    def _release_connection(self, connection, response):
+        if response.will_close:
+            connection.close()
+            return
+        with self._lock:
+            self._idle_connections.append(connection)
+
 
 class VarzStateCollector:
     """Collecting metrics from Varzs"""
 
-    def __init__(self):
+    def __init__(self, metrics=None, timeout_sec=DEFAULT_TIMEOUT_SEC):
+        self._metrics = metrics
+        self._timeout_sec = timeout_sec
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=MAX_CONCURRENT_SCRAPES, thread_name_prefix='varz')
         self._logger = get_logger('vstate')
 
+    def _get_client(self, endpoint):
+        with self._clients_lock:
+            client = self._clients.get(endpoint)
+            if not client:
+                client = self._clients[endpoint] = VarzEndpointClient(endpoint, self._timeout_sec)
+            return client
+
     def get_metrics(self, endpoint, target_metrics):
         """Get a list of target metrics"""
-        metric_map = {}
-
-        with urllib.request.urlopen(endpoint) as response:
-            content = response.read().decode('utf-8', 'strict')
-            metrics = prometheus_client.parser.text_string_to_metric_families(content)
-            for metric in [m for m in metrics if m.name in target_metrics]:
-                metric_map[metric.name] = metric
-
+        start = time.monotonic()
+        metric_map, size = self._get_client(endpoint).scrape(target_metrics)
+        if self._metrics:
+            self._metrics.observe_var(
+                'varz_scrape_duration_sec', time.monotonic() - start, labels=[endpoint])
+            self._metrics.observe_var('varz_scrape_size_bytes', size, labels=[endpoint])
         return metric_map
 
     def retry_get_metrics(self, endpoint, target_metrics, retries=3):
@@ -36,5 +236,18 @@ class VarzStateCollector:
                 self._logger.warning("Metrics are empty, retry: %d", retry)
             except Exception as e:
                 self._logger.debug("Cannot retrieve prometheus metrics: %s, retry: %d", e, retry)
-                time.sleep(1)
+            if retry < retries - 1:
+                time.sleep(get_backoff_sec(retry))
         raise MetricsFetchingError(f"Cannot retrieve prometheus metrics after {retries} retries")
+
+    def submit_get_metrics(self, endpoint, target_metrics, retries=3):
+        """Scrape target metrics with retries in the background, returning a Future"""
+        return self._executor.submit(self.retry_get_metrics, endpoint, target_metrics, retries)
+
+    def stop(self):
+        """Stop scraping and close idle connections"""
+        self._executor.shutdown(wait=False)
+        with self._clients_lock:
+            clients = list(self._clients.values())
+        for client in clients:
+            client.close()
@@ -42,7 +42,6 @@ setuptools.setup(
         'pbr>=1.9',
         'prometheus_client',
         'protobuf',
-        'psutil',
         'pyyaml',
         'requests',
         'setuptools>=17.1',
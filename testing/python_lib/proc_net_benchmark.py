@@ -0,0 +1,66 @@
+"""Benchmark of reading established connections from /proc/net against parsing netstat"""
+
+import argparse
+import os
+import socket
+import sys
+import timeit
+
+from forch.proc_net import TcpConnectionReader
+
+
+def _fetch_netstat(local_ports):
+    """Established connections on local_ports the way LocalStateCollector parsed netstat"""
+    connections = {}
+    with os.popen('netstat -npa 2>/dev/null') as lines:
+        for line in lines:
+            if 'ESTABLISHED' not in line:
+                continue
+            parts = line.split()
+            local_port = int(parts[3].split(':')[-1])
+            if local_port in local_ports:
+                connections[parts[4]] = {'local_port': local_port, 'process_info': parts[6]}
+    return connections
+
+
+def _open_connections(count):
+    """Open count connections to a local listener, plus as many unwatched ones"""
+    sockets = []
+    ports = []
+    for _ in range(2):
+        server = socket.socket()
+        server.bind(('127.0.0.1', 0))
+        server.listen(count)
+        sockets.append(server)
+        ports.append(server.getsockname()[1])
+        for _ in range(count):
+            sockets.append(socket.create_connection(server.getsockname()))
+            sockets.append(server.accept()[0])
+    return ports[0], sockets
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(prog='proc_net_benchmark')
+    parser.add_argument('-c', '--connections', type=int, default=200,
+                        help='connections to the watched port')
+    parser.add_argument('-n', '--number', type=int, default=3, help='runs per measurement')
+    args = parser.parse_args()
+
+    port, sockets = _open_connections(args.connections)
+    reader = TcpConnectionReader()
+    sys.stdout.write('watching port %d with %d connections\n' % (port, args.connections))
+
+    for name, func in (('netstat', _fetch_netstat), ('proc_net', reader.fetch_connections)):
+        seconds = min(timeit.repeat(lambda func=func: func([port]),
+                                    number=args.number, repeat=3)) / args.number
+        connections = len(func([port]))
+        sys.stdout.write('%-20s %10.2f ms %10d connections\n' % (name, seconds * 1000, connections))
+
+    for sock in sockets:
+        sock.close()
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('FORCH_LOG', '/tmp/forch.log')
+    main()
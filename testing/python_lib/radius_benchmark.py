@@ -0,0 +1,61 @@
+"""Microbenchmark of RADIUS MAB request encoding and response decoding in packets per second"""
+
+import argparse
+import os
+import sys
+import timeit
+
+from test_radius_query import build_accept
+
+from forch.radius import (
+    PACKET_TYPE_PARSERS, RADIUS_HEADER_LENGTH, Radius, RadiusAttributesList)
+from forch.radius_query import MabRequestTemplate, encode_mab_request
+
+_RADIUS_SECRET = 'SECRET'
+_SRC_MAC = '8e:00:00:00:01:02'
+_PORT_ID = 12345
+
+
+def _legacy_parse(packed_message, secret, packet_id_to_request_authenticator):
+    """Decode the way Radius.parse did before validating on the packed bytes"""
+    code, packet_id = packed_message[0], packed_message[1]
+    radius_packet = PACKET_TYPE_PARSERS[code](
+        packet_id, packed_message[4:RADIUS_HEADER_LENGTH],
+        RadiusAttributesList.parse(packed_message[RADIUS_HEADER_LENGTH:]))
+    return radius_packet.validate_packet(
+        secret, request_authenticator=packet_id_to_request_authenticator[packet_id], code=code)
+
+
+def _report(name, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=3))
+    sys.stdout.write('%-28s %10.0f packets/s\n' % (name, number / seconds))
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(prog='radius_benchmark')
+    parser.add_argument('-n', '--number', type=int, default=20000,
+                        help='packets per measurement')
+    args = parser.parse_args()
+
+    req_authenticator = os.urandom(16)
+    template = MabRequestTemplate(_RADIUS_SECRET)
+    request = Radius.parse(
+        encode_mab_request(1, req_authenticator, _SRC_MAC, _PORT_ID, _RADIUS_SECRET),
+        _RADIUS_SECRET)
+    accept = build_accept(request, _RADIUS_SECRET, 'SEG_A', 'red')
+    authenticators = {1: req_authenticator}
+
+    _report('encode (attribute objects)', lambda: encode_mab_request(
+        1, req_authenticator, _SRC_MAC, _PORT_ID, _RADIUS_SECRET), args.number)
+    _report('encode (template)', lambda: template.encode(
+        1, req_authenticator, _SRC_MAC, _PORT_ID), args.number)
+    _report('decode (re-pack validation)', lambda: _legacy_parse(
+        accept, _RADIUS_SECRET, authenticators), args.number)
+    _report('decode (memoryview)', lambda: Radius.parse(
+        accept, _RADIUS_SECRET, authenticators), args.number)
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('FORCH_LOG', '/tmp/forch.log')
+    main()
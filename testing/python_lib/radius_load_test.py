@@ -0,0 +1,199 @@
+"""Load test of MAB authentication through Authenticator against a local RADIUS responder"""
+
+import argparse
+import asyncio
+import collections
+import os
+import random
+import sys
+import threading
+import time
+
+from test_radius_query import build_accept, build_reject
+
+from forch.async_radius_query import AsyncRadiusQuery
+from forch.authenticator import Authenticator
+from forch.proto.devices_state_pb2 import DevicePlacement
+from forch.proto.forch_configuration_pb2 import OrchestrationConfig
+from forch.radius import Radius
+from forch.radius_query import RadiusQuery
+from forch.simple_auth_state_machine import AuthStateMachine
+from forch.utils import dict_proto
+
+_RADIUS_SECRET = 'SECRET'
+
+Socket = collections.namedtuple('Socket', 'source_ip, source_port, server_ip, server_port')
+
+
+class RadiusResponder(asyncio.DatagramProtocol):
+    """RADIUS server on its own event loop answering MAB requests after latency, with loss"""
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, latency_sec=0, loss=0, reject=0, seed=None):
+        self._latency_sec = latency_sec
+        self._loss = loss
+        self._reject = reject
+        self._random = random.Random(seed)
+        self._loop = asyncio.new_event_loop()
+        self._transport = None
+        self.port = None
+        self.received = 0
+        self.dropped = 0
+        self.macs = set()
+
+    def start(self):
+        """Bind the responder socket and serve on a daemon thread"""
+        self._transport, _ = self._loop.run_until_complete(self._loop.create_datagram_endpoint(
+            lambda: self, local_addr=('127.0.0.1', 0)))
+        self.port = self._transport.get_extra_info('sockname')[1]
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+
+    def stop(self):
+        """Stop serving"""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def datagram_received(self, data, addr):
+        request = Radius.parse(data, _RADIUS_SECRET)
+        self.received += 1
+        self.macs.add(request.attributes.find('Calling-Station-Id').data())
+        if self._random.random() < self._loss:
+            self.dropped += 1
+            return
+        if self._random.random() < self._reject:
+            response = build_reject(request, _RADIUS_SECRET)
+        else:
+            mac = request.attributes.find('Calling-Station-Id').data()
+            response = build_accept(request, _RADIUS_SECRET, 'SEG_' + mac, 'red')
+        if self._latency_sec:
+            self._loop.call_later(self._latency_sec, self._transport.sendto, response, addr)
+        else:
+            self._transport.sendto(response, addr)
+
+
+class CountingMetrics:
+    """Stand-in for ForchMetrics counting varz updates"""
+
+    def __init__(self):
+        self.counts = collections.Counter()
+
+    def inc_var(self, var, value=1, labels=None):
+        """Count varz increment"""
+        self.counts[(var, tuple(labels or ()))] += value
+
+    def update_var(self, var, value, labels=None):
+        """Ignore varz value update"""
+
+    def get_count(self, var):
+        """Return the count of a varz summed over labels"""
+        return sum(count for (name, _), count in self.counts.items() if name == var)
+
+
+def _percentile(values, percent):
+    if not values:
+        return float('nan')
+    return sorted(values)[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def _make_radius_query(args, responder_port):
+    socket_info = Socket('127.0.0.1', 0, '127.0.0.1', responder_port)
+    if args.client == 'async':
+        return AsyncRadiusQuery(socket_info, _RADIUS_SECRET, timeout_sec=args.query_timeout_sec,
+                                max_retries=args.client_retries)
+    return RadiusQuery(socket_info, _RADIUS_SECRET, None)
+
+
+def run_load_test(args):
+    """Authenticate args.count MACs and return the report lines"""
+    # pylint: disable=too-many-locals
+    responder = RadiusResponder(args.latency_ms / 1000, args.loss, args.reject, args.seed)
+    responder.start()
+
+    auth_config = dict_proto({
+        'radius_info': {
+            'server_ip': '127.0.0.1',
+            'server_port': responder.port,
+            'radius_secret_helper': f'echo {_RADIUS_SECRET}'
+        },
+        'heartbeat_sec': args.heartbeat_sec,
+        'query_timeout_sec': args.query_timeout_sec,
+    }, OrchestrationConfig.AuthConfig)
+
+    start_times = {}
+    auth_times = {}
+    rejected = set()
+    done = threading.Event()
+
+    def auth_callback(src_mac, access, segment, role):
+        # pylint: disable=unused-argument
+        if access == AuthStateMachine.ACCEPT:
+            auth_times.setdefault(src_mac, time.monotonic())
+        else:
+            rejected.add(src_mac)
+        if len(auth_times) + len(rejected) >= args.count:
+            done.set()
+
+    metrics = CountingMetrics()
+    radius_query = _make_radius_query(args, responder.port)
+    authenticator = Authenticator(auth_config, auth_callback, radius_query, metrics)
+    radius_query.auth_callback = authenticator.process_radius_result
+
+    macs = ['0e:00:%02x:%02x:%02x:%02x' % tuple((index >> shift) & 0xff
+                                               for shift in (24, 16, 8, 0))
+            for index in range(args.count)]
+    start = time.monotonic()
+    for index, mac in enumerate(macs):
+        start_times[mac] = time.monotonic()
+        placement = DevicePlacement(switch='sw%d' % (index % 16), port=index % 48 + 1,
+                                    connected=True)
+        authenticator.process_device_placement(mac, placement)
+    done.wait(args.duration_sec)
+    elapsed = (max(auth_times.values()) if auth_times else time.monotonic()) - start
+
+    authenticator.stop()
+    responder.stop()
+
+    latencies_ms = [(auth_time - start_times[mac]) * 1000 for mac, auth_time in auth_times.items()]
+    return [
+        'client                  %s' % args.client,
+        'hosts                   %d' % args.count,
+        'authorized              %d' % len(auth_times),
+        'rejected                %d' % len(rejected - set(auth_times)),
+        'unresolved              %d' % (args.count - len(auth_times.keys() | rejected)),
+        'throughput              %.0f auth/s' % (len(auth_times) / elapsed if elapsed else 0),
+        'time-to-authorized p50  %.1f ms' % _percentile(latencies_ms, 50),
+        'time-to-authorized p99  %.1f ms' % _percentile(latencies_ms, 99),
+        'requests received       %d' % responder.received,
+        'requests dropped        %d' % responder.dropped,
+        'retries                 %d' % (responder.received - len(responder.macs)),
+        'state machine timeouts  %d' % metrics.get_count('radius_query_timeouts'),
+    ]
+
+
+def parse_args(raw_args):
+    """Parse sys args"""
+    parser = argparse.ArgumentParser(prog='radius_load_test', description=__doc__)
+    parser.add_argument('-n', '--count', type=int, default=1000,
+                        help='number of MACs to authenticate')
+    parser.add_argument('-l', '--latency-ms', type=float, default=0,
+                        help='responder latency per request')
+    parser.add_argument('--loss', type=float, default=0,
+                        help='fraction of requests the responder drops')
+    parser.add_argument('--reject', type=float, default=0,
+                        help='fraction of requests the responder rejects')
+    parser.add_argument('-c', '--client', choices=('sync', 'async'), default='sync',
+                        help='RADIUS query client')
+    parser.add_argument('--client-retries', type=int, default=0,
+                        help='retransmits of the async client on timeout')
+    parser.add_argument('--query-timeout-sec', type=int, default=1,
+                        help='auth_config.query_timeout_sec')
+    parser.add_argument('--heartbeat-sec', type=int, default=1,
+                        help='auth_config.heartbeat_sec')
+    parser.add_argument('-d', '--duration-sec', type=float, default=60,
+                        help='maximum time to wait for all MACs to resolve')
+    parser.add_argument('--seed', type=int, help='random seed of the responder')
+    return parser.parse_args(raw_args)
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('FORCH_LOG', '/tmp/forch.log')
+    sys.stdout.write('\n'.join(run_load_test(parse_args(sys.argv[1:]))) + '\n')
@@ -0,0 +1,97 @@
+"""Benchmark of API response serialization time and size in each response format"""
+
+import argparse
+import os
+import sys
+import timeit
+
+from forch.proto.dataplane_state_pb2 import DataplaneState
+from forch.proto.list_hosts_pb2 import HostList
+from forch.proto.switch_state_pb2 import SwitchState
+from forch.utils import dict_proto, proto_json
+
+
+def _mac(index):
+    return '8e:00:00:%02x:%02x:%02x' % (index >> 16 & 0xff, index >> 8 & 0xff, index & 0xff)
+
+
+def build_switch_state(switches, ports):
+    """Build a SwitchState of switches with the given number of access ports each"""
+    switch_nodes = {}
+    for switch in range(switches):
+        switch_nodes['sw%d' % switch] = {
+            'attributes': {'dp_id': switch + 1},
+            'switch_state': 'healthy',
+            'ports': {port: {
+                'attributes': {'description': 'port %d' % port, 'port_type': 'access'},
+                'port_state': 'healthy',
+                'vlan': {'vlan_id': 200 + port % 4, 'packet_count': port * 10},
+                'dva_state': 'static_operational',
+                'acls': [{'name': 'acl_%d' % port, 'rules': [
+                    {'description': 'allow dhcp', 'packet_count': port}]}],
+            } for port in range(1, ports + 1)},
+            'access_port_macs': {_mac(switch * ports + port): {
+                'port': port, 'mac_ips': ['10.0.%d.%d' % (switch, port)],
+                'timestamp': '2020-05-26T10:31:01'} for port in range(1, ports + 1)},
+        }
+    return dict_proto({'switch_state': 'healthy', 'switches': switch_nodes}, SwitchState)
+
+
+def build_dataplane_state(switches):
+    """Build a DataplaneState of a stacked chain of switches"""
+    return dict_proto({
+        'switch': {'switches': {
+            'sw%d' % switch: {'switch_state': 'active'} for switch in range(switches)}},
+        'stack': {'links': {
+            'sw%d:49@sw%d:50' % (switch, switch + 1): {'link_state': 'active'}
+            for switch in range(switches - 1)}},
+        'vlans': {vlan: {'packet_rate_state': 'healthy'} for vlan in range(200, 264)},
+        'dataplane_state': 'healthy',
+    }, DataplaneState)
+
+
+def build_host_list(hosts):
+    """Build a HostList of learned hosts"""
+    return dict_proto({'eth_srcs': {_mac(host): {
+        'switch': 'sw%d' % (host // 48),
+        'port': host % 48 + 1,
+        'host_ips': ['10.%d.%d.%d' % (host >> 16 & 0xff, host >> 8 & 0xff, host & 0xff)],
+        'vlan': {'vlan_id': 200 + host % 4},
+        'dva_state': 'operational',
+        'url': 'http://forch/host_path?eth_src=' + _mac(host),
+        'radius_result': {'access': 'ACCEPT', 'segment': 'SEG_A', 'role': 'red'},
+    } for host in range(hosts)}}, HostList)
+
+
+def _report(name, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    size = len(func())
+    sys.stdout.write('%-34s %10.2f ms %12d bytes\n' % (name, seconds * 1000, size))
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(prog='serialization_benchmark')
+    parser.add_argument('-s', '--switches', type=int, default=50, help='number of switches')
+    parser.add_argument('-p', '--ports', type=int, default=48, help='access ports per switch')
+    parser.add_argument('-H', '--hosts', type=int, default=10000, help='number of hosts')
+    parser.add_argument('-n', '--number', type=int, default=3, help='runs per measurement')
+    args = parser.parse_args()
+
+    messages = (
+        ('SwitchState', build_switch_state(args.switches, args.ports)),
+        ('DataplaneState', build_dataplane_state(args.switches)),
+        ('HostList', build_host_list(args.hosts)),
+    )
+    for name, message in messages:
+        _report(name + ' json', lambda message=message: proto_json(message), args.number)
+        _report(name + ' minified json', lambda message=message: proto_json(
+            message, compact=True), args.number)
+        _report(name + ' compact json', lambda message=message: proto_json(
+            message, compact=True, including_default_value_fields=False), args.number)
+        _report(name + ' protobuf', message.SerializeToString, args.number)
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('FORCH_LOG', '/tmp/forch.log')
+    main()
@@ -0,0 +1,186 @@
+"""Unit tests for Authenticator"""
+
+from concurrent.futures import Future
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from forch.async_radius_query import AsyncRadiusQuery, RadiusTimeoutError
+from forch.authenticator import Authenticator
+from forch.proto.devices_state_pb2 import DevicePlacement
+from forch.proto.forch_configuration_pb2 import OrchestrationConfig
+from forch.radius_query import ACCEPT, REJECT
+from forch.simple_auth_state_machine import AuthStateMachine
+from forch.utils import dict_proto
+
+_TEST_MAC = '00:aa:bb:cc:dd:ee'
+
+
+class MockRadiusQuery:
+    """RADIUS query recording the MAB requests sent"""
+
+    def __init__(self):
+        self.queries = []
+
+    def send_mab_request(self, src_mac, port_id):
+        """Record MAB request"""
+        self.queries.append((src_mac, port_id))
+
+    def receive_radius_messages(self):
+        """Nothing to receive"""
+
+    def stop(self):
+        """Nothing to stop"""
+
+
+class MockMetrics:
+    """Metrics counting incremented varz"""
+
+    def __init__(self):
+        self.counts = {}
+
+    def inc_var(self, var, value=1, labels=None):
+        """Count varz increment"""
+        assert not labels
+        self.counts[var] = self.counts.get(var, 0) + value
+
+
+class AuthenticatorTestBase(unittest.TestCase):
+    """Base class setting up an Authenticator with a stand-in RADIUS query"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        os.environ['FORCH_LOG'] = '/tmp/forch.log'
+        self._authenticator = None
+        self._radius_query = None
+        self._metrics = None
+        self._results = []
+
+    def _setup(self, decision_cache_ttl_sec, radius_query=None):
+        auth_config = dict_proto({
+            'radius_info': {
+                'server_ip': '127.0.0.1',
+                'server_port': 1812,
+                'radius_secret_helper': 'echo SECRET'
+            },
+            'decision_cache_ttl_sec': decision_cache_ttl_sec,
+            'max_radius_retries': 1
+        }, OrchestrationConfig.AuthConfig)
+        self._radius_query = radius_query or MockRadiusQuery()
+        self._metrics = MockMetrics()
+        self._authenticator = Authenticator(
+            auth_config, lambda *args: self._results.append(args),
+            self._radius_query, self._metrics)
+
+    def tearDown(self):
+        """cleanup after each test method finishes"""
+        if self._authenticator:
+            self._authenticator.stop()
+
+
+class AuthenticatorDecisionCacheTestCase(AuthenticatorTestBase):
+    """Test cases for the RADIUS decision cache of Authenticator"""
+
+    def _flap(self, accept=True, switch='t2s2', port=1):
+        placement = DevicePlacement(switch='t2s2', port=1, connected=True)
+        self._authenticator.process_device_placement(_TEST_MAC, placement)
+        if accept:
+            self._authenticator.process_radius_result(_TEST_MAC, ACCEPT, 'SEG_A', 'red')
+        else:
+            self._authenticator.process_radius_result(_TEST_MAC, REJECT, None, None)
+        placement.connected = False
+        self._authenticator.process_device_placement(_TEST_MAC, placement)
+        self._results.clear()
+        placement = DevicePlacement(switch=switch, port=port, connected=True)
+        self._authenticator.process_device_placement(_TEST_MAC, placement)
+
+    def test_cached_accept(self):
+        """Test a re-learned host is authorized from the cache and revalidated"""
+        self._setup(decision_cache_ttl_sec=60)
+        self._flap()
+        self.assertEqual(self._results, [(_TEST_MAC, AuthStateMachine.ACCEPT, 'SEG_A', 'red')])
+        self.assertEqual(len(self._radius_query.queries), 2)
+        self.assertEqual(self._metrics.counts['radius_decision_cache_hits'], 1)
+        self.assertEqual(self._metrics.counts['radius_decision_cache_misses'], 1)
+
+        self._authenticator.process_radius_result(_TEST_MAC, REJECT, None, None)
+        self.assertEqual(self._results[-1], (_TEST_MAC, AuthStateMachine.UNAUTH, None, None))
+
+    def test_moved_host(self):
+        """Test a host re-learned on another port is not authorized from the cache"""
+        self._setup(decision_cache_ttl_sec=60)
+        self._flap(switch='t2s2', port=48)
+        self.assertEqual(self._results, [])
+        self._authenticator.process_device_placement(
+            _TEST_MAC, DevicePlacement(switch='t2s2', port=48, connected=False))
+        self._authenticator.process_device_placement(
+            _TEST_MAC, DevicePlacement(switch='t2sw9', port=3, connected=True))
+        self.assertEqual(self._results[-1], (_TEST_MAC, AuthStateMachine.UNAUTH, None, None))
+        self.assertNotIn('radius_decision_cache_hits', self._metrics.counts)
+        self.assertEqual(self._metrics.counts['radius_decision_cache_misses'], 3)
+
+    def test_expired_accept(self):
+        """Test a cached accept past its TTL is not applied"""
+        self._setup(decision_cache_ttl_sec=60)
+        with patch('time.time', return_value=1000):
+            placement = DevicePlacement(switch='t2s2', port=1, connected=True)
+            self._authenticator.process_device_placement(_TEST_MAC, placement)
+            self._authenticator.process_radius_result(_TEST_MAC, ACCEPT, 'SEG_A', 'red')
+            placement.connected = False
+            self._authenticator.process_device_placement(_TEST_MAC, placement)
+        self._results.clear()
+        with patch('time.time', return_value=1061):
+            placement.connected = True
+            self._authenticator.process_device_placement(_TEST_MAC, placement)
+        self.assertEqual(self._results, [])
+        self.assertEqual(self._metrics.counts['radius_decision_cache_misses'], 2)
+
+    def test_reject_not_cached(self):
+        """Test a rejected host is queried again on re-learn"""
+        self._setup(decision_cache_ttl_sec=60)
+        self._flap(accept=False)
+        self.assertEqual(self._results, [])
+        self.assertEqual(self._metrics.counts['radius_decision_cache_misses'], 2)
+
+    def test_cache_disabled(self):
+        """Test no decision is cached by default"""
+        self._setup(decision_cache_ttl_sec=0)
+        self._flap()
+        self.assertEqual(self._results, [])
+        self.assertEqual(len(self._radius_query.queries), 2)
+        self.assertNotIn('radius_decision_cache_misses', self._metrics.counts)
+
+
+class AuthenticatorAsyncQueryTestCase(AuthenticatorTestBase):
+    """Test cases for sessions driven by AsyncRadiusQuery futures"""
+
+    def test_loop_timeouts(self):
+        """Test loop timeouts retry the request, then deauthenticate the session"""
+        futures = []
+
+        def send_mab_request(src_mac, port_id):
+            futures.append(Future())
+            return futures[-1]
+
+        radius_query = MagicMock(spec=AsyncRadiusQuery)
+        radius_query.send_mab_request.side_effect = send_mab_request
+        self._setup(decision_cache_ttl_sec=0, radius_query=radius_query)
+        placement = DevicePlacement(switch='t2s2', port=1, connected=True)
+        self._authenticator.process_device_placement(_TEST_MAC, placement)
+
+        session = self._authenticator.sessions[_TEST_MAC]
+        session.handle_sm_timer()
+        self.assertEqual(len(futures), 1)
+
+        futures[0].set_exception(RadiusTimeoutError('timed out'))
+        self.assertEqual(len(futures), 2)
+        self.assertEqual(session.get_state(), AuthStateMachine.REQUEST)
+
+        futures[1].set_exception(RadiusTimeoutError('timed out'))
+        self.assertEqual(session.get_state(), AuthStateMachine.UNAUTH)
+        self.assertEqual(self._results, [(_TEST_MAC, AuthStateMachine.UNAUTH, None, None)])
+        self.assertEqual(self._metrics.counts['radius_query_timeouts'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
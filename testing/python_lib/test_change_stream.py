@@ -0,0 +1,186 @@
+"""Unit tests for the state change stream"""
+
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+import unittest
+
+from forch.change_stream import ChangeStream
+from forch.faucet_state_collector import FaucetStateCollector
+from forch.http_server import HttpServer, StreamingResponse
+from forch.proto.forch_configuration_pb2 import ForchConfig, HttpConfig
+
+
+class ChangeStreamTestCase(unittest.TestCase):
+    """Test cases for ChangeStream"""
+
+    def test_get_changes(self):
+        """Test records are returned after the resume token"""
+        stream = ChangeStream()
+        for port in range(3):
+            stream.publish('faucet', 'port', switch='sw1', port=port, mac=None)
+        records, reset = stream.get_changes(1)
+        self.assertFalse(reset)
+        self.assertEqual([record['seq'] for record in records], [2, 3])
+        self.assertEqual(records[0]['port'], 1)
+        self.assertNotIn('mac', records[0])
+        self.assertEqual(stream.get_changes(3, timeout=0), ([], False))
+
+    def test_reset(self):
+        """Test resuming from a token older than the buffer signals a reset"""
+        stream = ChangeStream(capacity=2)
+        for port in range(4):
+            stream.publish('faucet', 'port', port=port)
+        records, reset = stream.get_changes(1)
+        self.assertTrue(reset)
+        self.assertEqual([record['seq'] for record in records], [3, 4])
+        self.assertFalse(stream.get_changes(2)[1])
+
+    def test_reset_ahead(self):
+        """Test resuming from a token of a previous process signals a reset"""
+        stream = ChangeStream()
+        self.assertEqual(stream.get_changes(100, timeout=0), ([], True))
+        for port in range(3):
+            stream.publish('faucet', 'port', port=port)
+        records, reset = stream.get_changes(100, timeout=0)
+        self.assertTrue(reset)
+        self.assertEqual([record['seq'] for record in records], [1, 2, 3])
+
+        lines = next(stream.stream(since=100, ndjson=True)).splitlines()
+        self.assertEqual(json.loads(lines[0]), {'seq': 0, 'type': 'reset'})
+
+    def test_stream_filters(self):
+        """Test the encoded stream only carries records matching the filters"""
+        stream = ChangeStream()
+        stream.publish('faucet', 'port', switch='sw1', port=1)
+        stream.publish('faucet', 'port', switch='sw2', port=1)
+        stream.publish('cpn', 'cpn', state='healthy')
+        stream.publish('faucet', 'host_learned', switch='sw2', mac='00:11')
+
+        chunks = stream.stream(since=0, filters={'switch': 'sw2'}, ndjson=True)
+        lines = next(chunks).splitlines()
+        self.assertEqual([json.loads(line)['seq'] for line in lines], [2, 4])
+
+        chunks = stream.stream(since=0, filters={'subsystem': 'cpn'})
+        self.assertEqual(next(chunks),
+                         b'id: 3\nevent: cpn\ndata: ' + json.dumps(
+                             stream.get_changes(2)[0][0], separators=(',', ':')).encode() +
+                         b'\n\n')
+
+    def test_collector_publish(self):
+        """Test FaucetStateCollector publishes switch state changes"""
+        os.environ['FORCH_LOG'] = '/tmp/forch.log'
+        stream = ChangeStream()
+        collector = FaucetStateCollector(ForchConfig(), is_faucetizer_enabled=False)
+        collector.set_change_stream(stream)
+        collector.process_dp_change(1, 'sw1', None, True)
+        collector.process_dp_change(2, 'sw1', None, True)
+        collector.update_radius_result('00:11', 'Authorized', 'SEG', 'red')
+        records, _ = stream.get_changes(0)
+        self.assertEqual([(record['type'], record.get('switch')) for record in records],
+                         [('switch', 'sw1'), ('host_auth', None)])
+        self.assertEqual(records[0]['switch_state'], 'CONNECTED')
+
+
+class ChangeStreamHttpTestCase(unittest.TestCase):
+    """Test cases for streaming changes over HttpServer"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        os.environ['FORCH_LOG'] = '/tmp/forch.log'
+        self._http_server = None
+        self._stream = ChangeStream()
+
+    def _get_changes(self, path, params):
+        since = params.get('since')
+        chunks = self._stream.stream(int(since) if since else None, keepalive_sec=0.1)
+        return StreamingResponse('text/event-stream', chunks)
+
+    def tearDown(self):
+        """cleanup after each test method finishes"""
+        if self._http_server:
+            self._http_server.stop_server()
+
+    def _read_event(self, response):
+        lines = []
+        while True:
+            line = response.readline()
+            if line == b'\n':
+                if lines and not lines[0].startswith(b':'):
+                    return lines
+                lines = []
+                continue
+            lines.append(line.strip())
+
+    def _start_server(self, config):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        self._http_server = HttpServer(port, HttpConfig(**config))
+        self._http_server.map_request('changes', self._get_changes)
+        self._http_server.map_request(
+            'plain', lambda path, params: StreamingResponse('text/plain', iter([b'a', b'b'])))
+        self._http_server.start_server()
+        return port
+
+    def _test_stream(self, config):
+        port = self._start_server(config)
+
+        self._stream.publish('faucet', 'port', switch='sw1', port=1)
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        connection.request('GET', '/changes', headers={'Last-Event-ID': '0'})
+        response = connection.getresponse()
+        self.assertEqual(response.getheader('Content-type'), 'text/event-stream')
+        self.assertEqual(self._read_event(response)[0], b'id: 1')
+
+        threading.Timer(0.2, self._stream.publish, ['cpn', 'cpn']).start()
+        event = self._read_event(response)
+        self.assertEqual(event[:2], [b'id: 2', b'event: cpn'])
+        connection.close()
+
+    def test_stream_http10(self):
+        """Test changes are streamed until close on HTTP/1.0"""
+        self._test_stream({})
+
+    def test_stream_chunked(self):
+        """Test changes are streamed chunked on HTTP/1.1"""
+        self._test_stream({'worker_threads': 2})
+
+    def test_stream_iterator(self):
+        """Test a stream of a plain iterator is sent in full"""
+        port = self._start_server({'worker_threads': 2})
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        connection.request('GET', '/plain')
+        response = connection.getresponse()
+        self.assertEqual((response.status, response.read()), (200, b'ab'))
+        connection.close()
+
+    def test_stream_route_limit(self):
+        """Test a stream holds its route concurrency slot until it is closed"""
+        port = self._start_server({'worker_threads': 4, 'path_concurrency': {'changes': 1}})
+        stream_connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        stream_connection.request('GET', '/changes')
+        self.assertEqual(stream_connection.getresponse().status, 200)
+
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        connection.request('GET', '/changes')
+        self.assertEqual(connection.getresponse().status, 503)
+        connection.close()
+
+        stream_connection.close()
+        for _ in range(20):
+            time.sleep(0.1)
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/changes')
+            status = connection.getresponse().status
+            connection.close()
+            if status == 200:
+                break
+        self.assertEqual(status, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
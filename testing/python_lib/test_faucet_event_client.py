@@ -0,0 +1,50 @@
+"""Unit tests for FaucetEventClient"""
+
+import json
+import os
+import unittest
+from unittest.mock import MagicMock
+
+from forch.faucet_event_client import FaucetEventClient
+from forch.proto.faucet_event_pb2 import PortChange
+from forch.proto.forch_configuration_pb2 import EventClientConfig
+
+
+class EventHorizonTestCase(unittest.TestCase):
+    """Test cases for running at the Faucet event horizon"""
+
+    def setUp(self):
+        os.environ['FORCH_LOG'] = '/tmp/forch.log'
+        self._client = FaucetEventClient(EventClientConfig())
+        self._client.previous_state = {}
+        self._client.buffer = ''
+        self._client.event_socket_connected = True
+        self._client.set_event_horizon(9)
+        self._port_changes = []
+        self._client.register_handler(PortChange, self._port_changes.append)
+
+    def _make_event(self, event_id, **event):
+        event.update({'dp_name': 'sw1', 'dp_id': 1, 'event_id': event_id, 'time': 1})
+        return event
+
+    def test_pending_debounced_event(self):
+        """Test the horizon is not reached until debounced port changes are dispatched"""
+        func = MagicMock(return_value='saved')
+        event = self._make_event(10, PORT_CHANGE={'port_no': 1, 'status': True, 'reason': 'MODIFY'})
+        self._client.buffer = json.dumps(event) + '\n'
+        self.assertIsNone(self._client.next_event())
+        self.assertEqual([change.port_no for change in self._port_changes], [1])
+
+        # Simulates the debounce timer of a port down event expiring.
+        self._client._handle_debounce(event, 2, False)  # pylint: disable=protected-access
+        self.assertIsNone(self._client.run_at_event_horizon(func))
+        func.assert_not_called()
+
+        self.assertIsNone(self._client.next_event())
+        self.assertEqual([change.port_no for change in self._port_changes], [1, 2])
+        self.assertEqual(self._client.run_at_event_horizon(func), 'saved')
+        func.assert_called_once_with(10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,20 @@
 """Unit tests for Faucet State Collector"""
 
+import json
+import os
+import pickle
+import tempfile
 import unittest
+from unittest.mock import MagicMock
 from unit_base import FaucetStateCollectorTestBase
 
+from faucet import config_parser
+
+from forch.state_query import StateQuery
 from forch.proto.faucet_event_pb2 import StackTopoChange
+from forch.proto.shared_constants_pb2 import DVAState, State
 from forch.utils import dict_proto
+from forch.varz_state_collector import VarzMetric, VarzSample
 
 
 class DataplaneStateTestCase(FaucetStateCollectorTestBase):
@@ -77,5 +87,287 @@ class DataplaneStateTestCase(FaucetStateCollectorTestBase):
                          [{'switch': 'sw3', 'out': 1}, {'switch': 'sw1', 'in': 2, 'out': 28}])
 
 
+class StateQueryTestCase(FaucetStateCollectorTestBase):
+    """Test cases for filtered, paged and projected list_hosts and switch_state"""
+
+    FAUCET_BEHAVIORAL_CONFIG = """
+    dps:
+      sw1:
+        dp_id: 1
+        interfaces:
+          1:
+            description: HOST
+            native_vlan: 100
+            acls_in: [allow_all]
+          2:
+            description: HOST
+            native_vlan: 200
+            acls_in: [allow_all]
+          3:
+            description: HOST
+            native_vlan: 100
+            acls_in: [allow_all]
+      sw2:
+        dp_id: 2
+        interfaces:
+          1:
+            description: HOST
+            native_vlan: 100
+      sw3:
+        dp_id: 3
+        interfaces:
+          1:
+            description: HOST
+            native_vlan: 100
+    acls:
+      allow_all:
+        - rule:
+            actions:
+              allow: True
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_fetches = 0
+
+    def _get_gauge_metrics(self):
+        self._metrics_fetches += 1
+
+    def _parse_config(self, config):
+        with tempfile.TemporaryDirectory() as config_dir:
+            config_file = os.path.join(config_dir, 'faucet.yaml')
+            with open(config_file, 'w') as out_file:
+                out_file.write(config)
+            _, _, dps, _ = config_parser.dp_parser(config_file, 'fconfig')
+        return dps
+
+    def setUp(self):
+        """setup fixture for each test method"""
+        super().setUp()
+        collector = self._faucet_state_collector
+        collector.process_dataplane_config_change(1, self._parse_config(
+            self.FAUCET_BEHAVIORAL_CONFIG))
+        collector.set_state_restored(True)
+        collector.set_get_gauge_metrics(self._get_gauge_metrics)
+        collector.set_get_dva_state(
+            lambda switch, port: DVAState.operational if port == 2 else None)
+        for switch in ('sw1', 'sw2', 'sw3'):
+            collector.process_dp_change(1, switch, None, True)
+        for port in (1, 2, 3):
+            collector.process_port_state(1, 'sw1', port, True)
+            collector.process_port_learn(1, 'sw1', port, '00:00:00:00:01:%02x' % port, 100)
+        collector.process_port_learn(1, 'sw2', 1, '00:00:00:00:02:01', 100)
+        collector.update_radius_result('00:00:00:00:01:03', 'ACCEPT', 'SEG', 'red')
+
+    def _list_hosts(self, **params):
+        return self._faucet_state_collector.get_list_hosts(
+            'http://forch', None, StateQuery(params))
+
+    def _switch_state(self, **params):
+        return self._faucet_state_collector.get_switch_state(StateQuery(params))
+
+    def test_list_hosts_filters(self):
+        """Test list_hosts only returns hosts passing the filters"""
+        self.assertEqual(len(self._list_hosts().eth_srcs), 4)
+        self.assertEqual(list(self._list_hosts(switch='sw2').eth_srcs), ['00:00:00:00:02:01'])
+        self.assertEqual(sorted(self._list_hosts(port='2-3').eth_srcs),
+                         ['00:00:00:00:01:02', '00:00:00:00:01:03'])
+        self.assertEqual(list(self._list_hosts(vlan='200').eth_srcs), ['00:00:00:00:01:02'])
+        self.assertEqual(list(self._list_hosts(dva_state='operational').eth_srcs),
+                         ['00:00:00:00:01:02'])
+        self.assertEqual(list(self._list_hosts(radius='ACCEPT').eth_srcs), ['00:00:00:00:01:03'])
+
+    def test_list_hosts_pages(self):
+        """Test list_hosts pages through hosts with a cursor"""
+        macs = []
+        cursor = None
+        while True:
+            host_list = self._list_hosts(limit='3', cursor=cursor)
+            macs.extend(host_list.eth_srcs)
+            cursor = host_list.next_cursor
+            if not cursor:
+                break
+        self.assertEqual(macs, ['00:00:00:00:01:01', '00:00:00:00:01:02',
+                                '00:00:00:00:01:03', '00:00:00:00:02:01'])
+        self.assertEqual(self._metrics_fetches, 2)
+
+    def test_list_hosts_projection(self):
+        """Test excluded fields are left out without fetching metrics"""
+        host = self._list_hosts()
+        self.assertEqual(len(host.eth_srcs['00:00:00:00:01:01'].acls), 1)
+        host = self._list_hosts(exclude='acls,vlan').eth_srcs['00:00:00:00:01:01']
+        self.assertFalse(host.acls)
+        self.assertFalse(host.HasField('vlan'))
+        self.assertEqual(self._metrics_fetches, 1)
+        self.assertFalse(self._list_hosts(switch='sw3').eth_srcs)
+        self.assertEqual(self._metrics_fetches, 1)
+
+    def test_switch_state_pages(self):
+        """Test switch_state materializes only the page, keeping the overall summary"""
+        self._faucet_state_collector.process_dp_change(2, 'sw3', None, False)
+        switch_state = self._switch_state(limit='1', cursor='sw1', port='2', exclude='macs')
+        self.assertEqual(list(switch_state.switches), ['sw2'])
+        self.assertEqual(switch_state.next_cursor, 'sw2')
+        self.assertEqual(switch_state.switch_state_detail, 'Switches in broken state: sw3')
+        self.assertEqual(switch_state.switch_state_change_count, 4)
+        self.assertFalse(switch_state.switches['sw2'].ports)
+
+        switch_state = self._switch_state(switch='sw1', port='2', exclude='macs')
+        switch = switch_state.switches['sw1']
+        self.assertEqual(list(switch.ports), [2])
+        self.assertEqual(switch.ports_restrict, 2)
+        self.assertFalse(switch.access_port_macs)
+        self.assertEqual(switch_state.switches_restrict, 'sw1')
+
+    def test_single_switch(self):
+        """Test a switch query only computes that switch, with an incremental summary"""
+        collector = self._faucet_state_collector
+        computed = []
+        # pylint: disable=protected-access
+        get_switch = collector._get_switch
+        collector._get_switch = lambda name, *args: computed.append(name) or get_switch(
+            name, *args)
+
+        collector.process_dp_change(2, 'sw3', None, False)
+        collector.process_dp_config_change(2, 'sw4', 'cold', 4)
+        switch_state = self._switch_state(switch='sw2')
+        self.assertEqual(computed, ['sw2'])
+        self.assertEqual(list(switch_state.switches), ['sw2'])
+        self.assertEqual(switch_state.switch_state_detail, 'Switches in broken state: sw3, sw4')
+        self.assertEqual(switch_state.switch_state_change_count, 4)
+
+        collector.process_dp_change(3, 'sw3', None, True)
+        collector.process_dp_change(3, 'sw4', None, True)
+        summary = collector.get_switch_summary()
+        self.assertEqual(summary.state, State.healthy)  # pylint: disable=no-member
+        self.assertEqual(summary.change_count, 6)  # pylint: disable=no-member
+        self.assertEqual(computed, ['sw2'])
+
+    def test_config_change_diff(self):
+        """Test a config change only updates the switches that changed"""
+        collector = self._faucet_state_collector
+        forch_metrics = MagicMock()
+        collector.set_forch_metrics(forch_metrics)
+        config = self.FAUCET_BEHAVIORAL_CONFIG
+        self.assertEqual(collector.process_dataplane_config_change(2, self._parse_config(config)),
+                         set())
+        config = config.replace('dp_id: 3', 'dp_id: 4')
+        self.assertEqual(collector.process_dataplane_config_change(3, self._parse_config(config)),
+                         {'sw3'})
+        self.assertEqual(collector.faucet_config['config_change_count'], 2)
+        config = config.replace('native_vlan: 200', 'native_vlan: 100')
+        self.assertEqual(collector.process_dataplane_config_change(4, self._parse_config(config)),
+                         {'sw1'})
+        self.assertEqual(self._list_hosts().eth_srcs['00:00:00:00:01:02'].vlan.vlan_id, 100)
+        self.assertEqual(
+            sorted(call[1]['labels'][:2]
+                   for call in forch_metrics.update_var.call_args_list),
+            [['sw1', '00:00:00:00:01:%02x' % port] for port in (1, 2, 3)])
+
+    def test_resync(self):
+        """Test a resync only applies differences with varz"""
+        collector = self._faucet_state_collector
+        collector.process_port_learn(2, 'sw1', 1, '00:00:00:00:01:01', 100, '10.0.0.1')
+        samples = {
+            'faucet_event_id': [({}, 20)],
+            'faucet_stack_root_dpid': [({}, 1)],
+            'dp_root_hop_port': [],
+            'port_stack_state': [],
+            'port_lacp_state': [],
+            'port_lacp_role': [],
+            'faucet_config_reload_cold': [],
+            'faucet_config_reload_warm': [],
+            'dp_status': [({'dp_name': switch}, 1) for switch in ('sw1', 'sw2', 'sw3')],
+            'port_status': [({'dp_name': 'sw1', 'port': str(port)}, int(port != 2))
+                            for port in (1, 2, 3)],
+            'learned_l2_port': [
+                ({'dp_name': switch, 'eth_src': mac, 'vid': '100'}, port)
+                for switch, mac, port in (('sw1', '00:00:00:00:01:01', 1),
+                                          ('sw1', '00:00:00:00:01:03', 1),
+                                          ('sw1', '00:00:00:00:01:04', 3),
+                                          ('sw2', '00:00:00:00:02:01', 1))]
+        }
+        metrics = {name: VarzMetric(name, [VarzSample(name, labels, value)
+                                           for labels, value in metric_samples])
+                   for name, metric_samples in samples.items()}
+        collector.process_dp_change(2, 'sw3', None, False)
+        port_changes = collector.switch_states['sw1']['ports'][1]['change_count']
+
+        self.assertEqual(collector.resync_states_from_metrics(metrics), (20, 6))
+        self.assertEqual(collector.switch_states['sw1']['ports'][1]['change_count'],
+                         port_changes)
+        self.assertFalse(collector.switch_states['sw1']['ports'][2]['state_up'])
+        self.assertEqual(collector.get_switch_summary().state,  # pylint: disable=no-member
+                         State.healthy)
+        hosts = self._list_hosts().eth_srcs
+        self.assertEqual(sorted(hosts), ['00:00:00:00:01:01', '00:00:00:00:01:03',
+                                         '00:00:00:00:01:04', '00:00:00:00:02:01'])
+        self.assertEqual(hosts['00:00:00:00:01:03'].port, 1)
+        self.assertEqual(list(hosts['00:00:00:00:01:01'].host_ips), ['10.0.0.1'])
+        self.assertEqual(collector.resync_states_from_metrics(metrics), (20, 0))
+
+    def test_checkpoint(self):
+        """Test a checkpoint restores the state of another collector"""
+        collector = self._faucet_state_collector
+        collector.process_port_learn(2, 'sw1', 1, '00:00:00:00:01:01', 100, '10.0.0.1')
+        topo_change = dict_proto({
+            'stack_root': 'sw1',
+            'graph': {'links': [{
+                'key': 'sw1:1-sw2:1',
+                'source': 'sw1',
+                'target': 'sw2',
+                'port_map': {'dp_a': 'sw1', 'port_a': 'Port 1', 'dp_z': 'sw2', 'port_z': 'Port 1'}
+            }]},
+            'dps': {'sw1': {}, 'sw2': {'root_hop_port': 1}},
+        }, StackTopoChange)
+        # pylint: disable=protected-access
+        collector._update_stack_topo_state_raw(
+            2, topo_change.graph.links, topo_change.stack_root, topo_change.dps)
+
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            checkpoint_file = os.path.join(checkpoint_dir, 'checkpoint')
+            self.assertTrue(collector.save_checkpoint(checkpoint_file, 10, 'hashes'))
+            self.assertEqual(os.stat(checkpoint_file).st_mode & 0o777, 0o600)
+            with open(checkpoint_file) as file:
+                self.assertEqual(json.load(file)['event_id'], 10)
+            checkpoint = collector.load_checkpoint(checkpoint_file)
+
+        self._initialize_state_collector()
+        restored = self._faucet_state_collector
+        self.assertEqual(restored.restore_states_from_checkpoint(checkpoint), 10)
+        self.assertEqual(checkpoint['config_hash'], 'hashes')
+        restored.set_get_gauge_metrics(self._get_gauge_metrics)
+        restored.set_get_dva_state(lambda switch, port: None)
+        # The config is not part of a checkpoint, it is restored from the Faucet config files.
+        restored.faucet_config = collector.faucet_config
+        restored.set_state_restored(True)
+
+        host = self._list_hosts().eth_srcs['00:00:00:00:01:01']
+        self.assertEqual(list(host.host_ips), ['10.0.0.1'])
+        self.assertEqual(list(self._list_hosts(radius='ACCEPT').eth_srcs), ['00:00:00:00:01:03'])
+        self.assertEqual(restored.get_switch_egress_path('sw2')['path'],
+                         collector.get_switch_egress_path('sw2')['path'])
+        self.assertEqual(self._switch_state().switch_state_change_count,
+                         collector.get_switch_state(StateQuery({})).switch_state_change_count)
+
+    def test_checkpoint_missing(self):
+        """Test a missing or corrupt checkpoint is not loaded"""
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            checkpoint_file = os.path.join(checkpoint_dir, 'checkpoint')
+            self.assertIsNone(self._faucet_state_collector.load_checkpoint(checkpoint_file))
+            for data in (b'corrupt', pickle.dumps({'version': 1}), b'{"version": 1}',
+                         b'{"version": 2, "topo_change": {"bogus": 1}}'):
+                with open(checkpoint_file, 'wb') as file:
+                    file.write(data)
+                self.assertIsNone(self._faucet_state_collector.load_checkpoint(checkpoint_file))
+
+    def test_invalid_query(self):
+        """Test invalid query params are rejected"""
+        for params in ({'port': '3-1'}, {'limit': '-1'}, {'dva_state': 'bogus'},
+                       {'exclude': 'acls,bogus'}, {'vlan': 'x'}):
+            with self.assertRaises(ValueError):
+                StateQuery(params)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,137 @@
+"""Unit tests for ForchProxy"""
+
+import os
+import socket
+import threading
+import time
+import unittest
+import urllib.request
+from varz_server import VarzServer
+
+from forch.forch_proxy import ForchProxy, ProxyTargetClient, merge_expositions
+from forch.proto.forch_configuration_pb2 import ProxyServerConfig
+from forch.utils import dict_proto
+
+_FAUCET_VARZ = b'''# HELP dp_status status of datapaths
+# TYPE dp_status gauge
+dp_status{dp_id="0x1",dp_name="sw1"} 1.0
+# HELP process_cpu_seconds_total Total user and system CPU time spent in seconds.
+# TYPE process_cpu_seconds_total counter
+process_cpu_seconds_total 2.5
+'''
+
+_GAUGE_VARZ = b'''# HELP process_cpu_seconds_total Total user and system CPU time spent in seconds.
+# TYPE process_cpu_seconds_total counter
+process_cpu_seconds_total 1.5
+# HELP port_status_duration_sec status duration
+# TYPE port_status_duration_sec histogram
+port_status_duration_sec_bucket{le="+Inf"} 3.0
+port_status_duration_sec_count 3.0
+'''
+
+
+def _get_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class ForchProxyTestCase(unittest.TestCase):
+    """Test cases for ForchProxy"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        os.environ['FORCH_LOG'] = '/tmp/forch.log'
+        self._servers = []
+        self._proxy = None
+
+    def _start_server(self, body, delay_sec=0):
+        server = VarzServer(body, delay_sec)
+        self._servers.append(server)
+        return server
+
+    def tearDown(self):
+        """cleanup after each test method finishes"""
+        if self._proxy:
+            self._proxy.stop()
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+    def test_merge_expositions(self):
+        """Test families are merged across targets with a target label on each sample"""
+        merged = merge_expositions([('faucet', _FAUCET_VARZ), ('gauge', _GAUGE_VARZ)])
+        self.assertEqual(merged, b'''# HELP dp_status status of datapaths
+# TYPE dp_status gauge
+dp_status{target="faucet",dp_id="0x1",dp_name="sw1"} 1.0
+# HELP process_cpu_seconds_total Total user and system CPU time spent in seconds.
+# TYPE process_cpu_seconds_total counter
+process_cpu_seconds_total{target="faucet"} 2.5
+process_cpu_seconds_total{target="gauge"} 1.5
+# HELP port_status_duration_sec status duration
+# TYPE port_status_duration_sec histogram
+port_status_duration_sec_bucket{target="gauge",le="+Inf"} 3.0
+port_status_duration_sec_count{target="gauge"} 3.0
+''')
+
+    def test_cache_and_keep_alive(self):
+        """Test responses are cached for the TTL and fetched over one connection"""
+        server = self._start_server(_FAUCET_VARZ)
+        client = ProxyTargetClient('127.0.0.1', server.get_port(), 5, 0.2)
+        self.assertEqual(client.get(), _FAUCET_VARZ)
+        self.assertEqual(client.get(), _FAUCET_VARZ)
+        self.assertEqual(server.requests, 1)
+        time.sleep(0.3)
+        self.assertEqual(client.get(), _FAUCET_VARZ)
+        self.assertEqual((server.requests, server.connections), (2, 1))
+        client.close()
+
+    def test_cache_disabled(self):
+        """Test a TTL of 0 fetches every request from the target"""
+        server = self._start_server(_FAUCET_VARZ)
+        client = ProxyTargetClient('127.0.0.1', server.get_port(), 5, 0)
+        for _ in range(3):
+            self.assertEqual(client.get(), _FAUCET_VARZ)
+        self.assertEqual((server.requests, server.connections), (3, 1))
+        client.close()
+
+    def test_single_flight(self):
+        """Test concurrent requests share one in-flight fetch"""
+        server = self._start_server(_FAUCET_VARZ, delay_sec=0.2)
+        client = ProxyTargetClient('127.0.0.1', server.get_port(), 5, 1)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(client.get()))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [_FAUCET_VARZ] * 5)
+        self.assertEqual(server.requests, 1)
+        client.close()
+
+    def test_aggregate(self):
+        """Test the aggregate path fetches all targets in parallel"""
+        faucet = self._start_server(_FAUCET_VARZ, delay_sec=0.3)
+        gauge = self._start_server(_GAUGE_VARZ, delay_sec=0.3)
+        proxy_port = _get_free_port()
+        self._proxy = ForchProxy(dict_proto({
+            'proxy_port': proxy_port,
+            'cache_ttl_sec': 1,
+            'targets': {'faucet': {'port': faucet.get_port()}, 'gauge': {'port': gauge.get_port()}}
+        }, ProxyServerConfig))
+        self._proxy.start()
+
+        url = 'http://127.0.0.1:%d/' % proxy_port
+        start = time.monotonic()
+        with urllib.request.urlopen(url + 'aggregate') as response:
+            self.assertEqual(response.read(), merge_expositions(
+                [('faucet', _FAUCET_VARZ), ('gauge', _GAUGE_VARZ)]))
+        self.assertLess(time.monotonic() - start, 0.55)
+        with urllib.request.urlopen(url + 'gauge') as response:
+            self.assertEqual(response.read(), _GAUGE_VARZ)
+        self.assertEqual(gauge.requests, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
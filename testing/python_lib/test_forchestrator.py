@@ -17,6 +17,7 @@ from forch.forchestrator import (Forchestrator, STATIC_BEHAVIORAL_FILE, STATIC_P
 from forch.file_change_watcher import FileChangeWatcher
 from forch.port_state_manager import PortStateManager
 from forch.utils import dict_proto
+from forch.varz_state_collector import VarzMetric, VarzSample
 from forch.proto.devices_state_pb2 import DevicePlacement, DeviceBehavior
 from forch.proto.forch_configuration_pb2 import ForchConfig, OrchestrationConfig
 from forch.proto.system_state_pb2 import SystemState
@@ -75,6 +76,27 @@ class ForchestratorUnitTestCase(ForchestratorTestBase):
         _, detail = self._forchestrator._get_combined_summary(summaries)
         self.assertTrue('forch' in detail)
 
+    def test_faucet_config_cache(self):
+        """Test the Faucet config is only parsed again when its hashes change"""
+        faucet_config = ({'hashes': 'hashes'}, [], {})
+        self._forchestrator._faucet_config_cache = ('hashes', faucet_config)
+        self._forchestrator._get_faucet_config = MagicMock(return_value='parsed')
+        self.assertEqual(self._forchestrator._get_cached_faucet_config('hashes'), faucet_config)
+        self._forchestrator._get_faucet_config.assert_not_called()
+        self.assertEqual(self._forchestrator._get_cached_faucet_config('other'), 'parsed')
+
+    def test_checkpoint_horizon(self):
+        """Test a checkpoint is only current at the Faucet event horizon and config"""
+        metrics = {
+            'faucet_event_id': VarzMetric('faucet_event_id', [
+                VarzSample('faucet_event_id', {}, 10.0)])
+        }
+        checkpoint = {'event_id': 10, 'config_hash': 'hashes'}
+        self.assertTrue(self._forchestrator._is_checkpoint_current(checkpoint, metrics, 'hashes'))
+        self.assertFalse(self._forchestrator._is_checkpoint_current(checkpoint, metrics, 'other'))
+        checkpoint['event_id'] = 9
+        self.assertFalse(self._forchestrator._is_checkpoint_current(checkpoint, metrics, 'hashes'))
+
 
 # pylint: disable=protected-access
 class ForchestratorAuthTestCase(ForchestratorTestBase):
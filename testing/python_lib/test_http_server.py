@@ -0,0 +1,361 @@
+"""Unit tests for HttpServer"""
+
+import gzip
+import http.client
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+from forch.http_server import (
+    HttpServer, PROTOBUF_CONTENT_TYPE, select_content_encoding, select_response_format)
+from forch.proto.forch_configuration_pb2 import HttpConfig
+from forch.proto.system_state_pb2 import SystemState
+from forch.utils import dict_proto
+
+
+def _get_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class MockMetrics:
+    """Metrics recording varz updates"""
+
+    def __init__(self):
+        self.counts = {}
+        self.values = {}
+        self.observations = {}
+
+    def inc_var(self, var, value=1, labels=None):
+        """Count varz increment"""
+        key = (var, tuple(labels or ()))
+        self.counts[key] = self.counts.get(key, 0) + value
+
+    def update_var(self, var, value, labels=None):
+        """Record varz value"""
+        self.values[(var, tuple(labels or ()))] = value
+
+    def observe_var(self, var, value, labels=None):
+        """Record histogram observation"""
+        self.observations.setdefault((var, tuple(labels or ())), []).append(value)
+
+
+class HttpServerTestCase(unittest.TestCase):
+    """Test cases for the worker pool mode of HttpServer"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        os.environ['FORCH_LOG'] = '/tmp/forch.log'
+        self._http_server = None
+        self._port = None
+        self._metrics = MockMetrics()
+        self._release = threading.Event()
+        self._blocked = threading.Semaphore(0)
+
+    def _setup(self, config):
+        self._port = _get_free_port()
+        self._http_server = HttpServer(self._port, dict_proto(config, HttpConfig))
+        self._http_server.set_metrics(self._metrics)
+        self._http_server.map_request('slow', self._slow_handler)
+        self._http_server.map_request('fast', lambda path, params: {'path': path})
+        self._http_server.start_server()
+
+    def _slow_handler(self, path, params):
+        self._blocked.release()
+        self._release.wait(5)
+        return 'slow'
+
+    def tearDown(self):
+        """cleanup after each test method finishes"""
+        self._release.set()
+        if self._http_server:
+            self._http_server.stop_server()
+
+    def _connect(self):
+        return http.client.HTTPConnection('127.0.0.1', self._port, timeout=5)
+
+    def _start_slow_request(self):
+        connection = self._connect()
+        connection.request('GET', '/slow')
+        self.assertTrue(self._blocked.acquire(timeout=5))
+        return connection
+
+    def test_keep_alive(self):
+        """Test requests are served as HTTP/1.1 on one persistent connection"""
+        self._setup({'worker_threads': 2})
+        connection = self._connect()
+        for _ in range(3):
+            connection.request('GET', '/fast')
+            response = connection.getresponse()
+            self.assertEqual(response.version, 11)
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.read(), b'{"path": "127.0.0.1:%d/fast"}' % self._port)
+        self.assertEqual(len(self._metrics.observations[('http_queue_wait_sec', ())]), 1)
+        self.assertEqual(
+            len(self._metrics.observations[('http_request_latency_sec', ('/fast',))]), 3)
+        connection.close()
+
+    def test_pool_saturated(self):
+        """Test connections beyond workers and queue get a 503 right away"""
+        self._setup({'worker_threads': 1, 'max_queued_connections': 1})
+        slow_connection = self._start_slow_request()
+        queued_connection = self._connect()
+        queued_connection.request('GET', '/fast')
+        time.sleep(0.1)
+
+        start = time.monotonic()
+        connection = self._connect()
+        connection.request('GET', '/fast')
+        self.assertEqual(connection.getresponse().status, 503)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(self._metrics.counts[('http_pool_rejects', ())], 1)
+        self.assertEqual(self._metrics.values[('http_active_connections', ())], 1)
+
+        self._release.set()
+        self.assertEqual(slow_connection.getresponse().read(), b'slow')
+        slow_connection.close()
+        self.assertEqual(queued_connection.getresponse().status, 200)
+
+    def test_idle_keep_alive(self):
+        """Test idle keep-alive connections give up their workers to new connections"""
+        self._setup({'worker_threads': 2, 'max_queued_connections': 1})
+        idle_connections = []
+        for _ in range(5):
+            start = time.monotonic()
+            connection = self._connect()
+            connection.request('GET', '/fast')
+            response = connection.getresponse()
+            self.assertEqual(response.status, 200)
+            response.read()
+            self.assertLess(time.monotonic() - start, 1)
+            idle_connections.append(connection)
+        self.assertNotIn(('http_pool_rejects', ()), self._metrics.counts)
+        for connection in idle_connections:
+            connection.close()
+
+    def test_close_saturated(self):
+        """Test the server closes without waiting for busy workers or queued connections"""
+        self._setup({'worker_threads': 1, 'max_queued_connections': 1})
+        slow_connection = self._start_slow_request()
+        queued_connection = self._connect()
+        queued_connection.request('GET', '/fast')
+        time.sleep(0.1)
+
+        start = time.monotonic()
+        self._http_server.stop_server()
+        self._http_server = None
+        self.assertLess(time.monotonic() - start, 1)
+        with self.assertRaises((http.client.HTTPException, OSError)):
+            queued_connection.getresponse()
+        self._release.set()
+        self.assertEqual(slow_connection.getresponse().read(), b'slow')
+
+    def test_route_concurrency(self):
+        """Test requests over the concurrency limit of a route get a 503"""
+        self._setup({'worker_threads': 4, 'path_concurrency': {'slow': 1}})
+        slow_connection = self._start_slow_request()
+
+        connection = self._connect()
+        connection.request('GET', '/slow')
+        response = connection.getresponse()
+        self.assertEqual(response.status, 503)
+        response.read()
+        connection.request('GET', '/fast')
+        self.assertEqual(connection.getresponse().status, 200)
+        self.assertEqual(self._metrics.counts[('http_route_rejects', ('/slow',))], 1)
+
+        self._release.set()
+        self.assertEqual(slow_connection.getresponse().status, 200)
+
+
+class HttpCompressionTestCase(unittest.TestCase):
+    """Test cases for compressed and compact responses"""
+
+    _HOSTS = {'hosts': {'00:00:00:00:%02x:%02x' % (index // 256, index % 256): {'port': index}
+                        for index in range(20000)}}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        os.environ['FORCH_LOG'] = '/tmp/forch.log'
+        self._http_server = None
+        self._port = None
+
+    def _setup(self, config):
+        self._port = _get_free_port()
+        self._http_server = HttpServer(self._port, dict_proto(config, HttpConfig))
+        self._http_server.map_request('hosts', lambda path, params: self._HOSTS)
+        self._http_server.map_request(
+            'system', lambda path, params: SystemState(site_name='nz-kiwi'))
+        self._http_server.start_server()
+
+    def tearDown(self):
+        """cleanup after each test method finishes"""
+        if self._http_server:
+            self._http_server.stop_server()
+
+    def _get(self, path, accept_encoding=None, accept=None):
+        connection = http.client.HTTPConnection('127.0.0.1', self._port, timeout=5)
+        headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+        if accept:
+            headers['Accept'] = accept
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response, body
+
+    def test_select_content_encoding(self):
+        """Test Accept-Encoding negotiation"""
+        self.assertEqual(select_content_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(select_content_encoding('deflate, *;q=0.5'), 'gzip')
+        self.assertIsNone(select_content_encoding('gzip;q=0, br'))
+        self.assertIsNone(select_content_encoding(None))
+
+    def test_gzip(self):
+        """Test large responses are gzipped with Content-Length on HTTP/1.0"""
+        self._setup({})
+        response, body = self._get('/hosts', 'gzip')
+        self.assertEqual(response.getheader('Content-Encoding'), 'gzip')
+        self.assertEqual(int(response.getheader('Content-Length')), len(body))
+        self.assertEqual(json.loads(gzip.decompress(body)), self._HOSTS)
+
+        response, body = self._get('/hosts')
+        self.assertIsNone(response.getheader('Content-Encoding'))
+        self.assertEqual(json.loads(body), self._HOSTS)
+
+    def test_gzip_chunked(self):
+        """Test large gzipped responses are streamed chunked on HTTP/1.1"""
+        self._setup({'worker_threads': 1})
+        response, body = self._get('/hosts', 'gzip')
+        self.assertEqual(response.getheader('Transfer-Encoding'), 'chunked')
+        self.assertIsNone(response.getheader('Content-Length'))
+        self.assertEqual(json.loads(gzip.decompress(body)), self._HOSTS)
+
+        with socket.create_connection(('127.0.0.1', self._port), timeout=5) as sock:
+            sock.sendall(b'GET /hosts HTTP/1.0\r\nHost: forch\r\nAccept-Encoding: gzip\r\n\r\n')
+            raw = b''.join(iter(lambda: sock.recv(65536), b''))
+        headers, _, body = raw.partition(b'\r\n\r\n')
+        self.assertNotIn(b'Transfer-Encoding', headers)
+        self.assertIn(b'Content-Length: %d' % len(body), headers)
+        self.assertEqual(json.loads(gzip.decompress(body)), self._HOSTS)
+
+    def test_select_response_format(self):
+        """Test response format negotiation"""
+        self.assertEqual(select_response_format(None), 'json')
+        self.assertEqual(select_response_format('text/html, */*;q=0.8'), 'json')
+        self.assertEqual(select_response_format('application/x-protobuf'), 'proto')
+        self.assertEqual(select_response_format(
+            'application/json;q=0.5, application/protobuf;q=0.9'), 'proto')
+        self.assertEqual(select_response_format('application/x-protobuf', 'compact'), 'compact')
+        self.assertEqual(select_response_format('application/x-protobuf', 'ndjson'), 'proto')
+
+    def test_compact(self):
+        """Test compact=true drops whitespace and format=compact also drops default values"""
+        self._setup({})
+        _, pretty = self._get('/system')
+        _, minified = self._get('/system?compact=true')
+        self.assertIn(b'\n', pretty)
+        self.assertNotIn(b' ', minified)
+        self.assertEqual(json.loads(minified), json.loads(pretty))
+        self.assertIn('system_state', json.loads(pretty))
+
+        _, compact = self._get('/system?format=compact')
+        self.assertEqual(json.loads(compact), {'site_name': 'nz-kiwi'})
+
+    def test_protobuf(self):
+        """Test protobuf bytes are returned on request by Accept header or format param"""
+        self._setup({})
+        for path, accept in (('/system', PROTOBUF_CONTENT_TYPE), ('/system?format=proto', None)):
+            response, body = self._get(path, accept=accept)
+            self.assertEqual(response.getheader('Content-type'), PROTOBUF_CONTENT_TYPE)
+            self.assertEqual(SystemState.FromString(body).site_name, 'nz-kiwi')
+        self.assertEqual(self._get('/hosts?format=proto')[0].status, 406)
+
+
+class HttpRoutingTestCase(unittest.TestCase):
+    """Test cases for route dispatch and cached static files"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        os.environ['FORCH_LOG'] = '/tmp/forch.log'
+        self._http_server = None
+        self._port = None
+        self._root = None
+
+    def setUp(self):
+        """setup fixture for each test method"""
+        self._root = tempfile.TemporaryDirectory()
+        self._port = _get_free_port()
+        self._http_server = HttpServer(self._port, HttpConfig(http_root=self._root.name))
+        self._http_server.map_request('', self._http_server.static_file(''))
+        self._http_server.map_request('switch', lambda path, params: 'switch')
+        self._http_server.map_request('switch_state', lambda path, params: 'switch_state')
+        self._http_server.start_server()
+
+    def tearDown(self):
+        """cleanup after each test method finishes"""
+        self._http_server.stop_server()
+        self._root.cleanup()
+
+    def _write_file(self, name, content, mtime):
+        path = os.path.join(self._root.name, name)
+        with open(path, 'w') as out_file:
+            out_file.write(content)
+        os.utime(path, (mtime, mtime))
+
+    def _get(self, path, headers=None):
+        connection = http.client.HTTPConnection('127.0.0.1', self._port, timeout=5)
+        connection.request('GET', path, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response, body
+
+    def test_longest_prefix(self):
+        """Test requests go to the longest matching prefix, whatever the mapping order"""
+        self.assertEqual(self._get('/switch_state?switch=sw1')[1], b'switch_state')
+        self.assertEqual(self._get('/switch')[1], b'switch')
+        self._write_file('index.html', 'index', 1000)
+        self.assertEqual(self._get('/')[1], b'index')
+        self.assertEqual(self._get('/missing.html')[0].status, 400)
+
+    def test_static_etag(self):
+        """Test static files carry an ETag and conditional requests get a 304"""
+        self._write_file('index.html', 'index', 1000)
+        response, body = self._get('/index.html')
+        etag = response.getheader('ETag')
+        self.assertEqual(response.getheader('Content-type'), 'text/html')
+        self.assertEqual(body, b'index')
+
+        response, body = self._get('/', {'If-None-Match': 'W/"other", ' + etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(response.getheader('ETag'), etag)
+        self.assertEqual(body, b'')
+
+        self._write_file('index.html', 'changed', 2000)
+        response, body = self._get('/', {'If-None-Match': etag})
+        self.assertEqual(response.status, 200)
+        self.assertNotEqual(response.getheader('ETag'), etag)
+        self.assertEqual(body, b'changed')
+
+    def test_static_gzip(self):
+        """Test the precompressed variant is served to clients accepting gzip"""
+        content = 'function forch() {}\n' * 200
+        self._write_file('forch.js', content, 1000)
+        response, body = self._get('/forch.js', {'Accept-Encoding': 'zstd, gzip'})
+        self.assertEqual(response.getheader('Content-Encoding'), 'gzip')
+        self.assertEqual(int(response.getheader('Content-Length')), len(body))
+        self.assertEqual(gzip.decompress(body).decode(), content)
+
+        response, body = self._get('/forch.js', {'Accept-Encoding': 'zstd'})
+        self.assertIsNone(response.getheader('Content-Encoding'))
+        self.assertEqual(body.decode(), content)
+
+
+if __name__ == '__main__':
+    unittest.main()
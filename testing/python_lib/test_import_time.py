@@ -0,0 +1,74 @@
+"""Import time budget tests for the forch entry point and core modules"""
+
+import subprocess
+import sys
+import unittest
+
+# Modules only needed by optional subsystems, loaded when they are configured.
+_OPTIONAL_MODULES = (
+    'forch.authenticator',
+    'forch.device_report_client',
+    'forch.endpoint_handler',
+    'forch.file_change_watcher',
+    'grpc',
+    'watchdog',
+)
+
+_CORE_MODULES = ('forch.__main__', 'forch.forchestrator', 'forch.faucetizer', 'forch.topology')
+
+# Budgets are generous for slow CI machines, well below loading the optional modules.
+_IMPORT_BUDGET_SEC = {
+    'forch.__main__': 0.5,
+    'forch.forchestrator': 0.5,
+    'forch.faucetizer': 0.5,
+    'forch.topology': 0.5,
+}
+
+# Imports required by a module that are not counted against its budget.
+_BUDGET_EXCLUDED_IMPORTS = {
+    # Faucet config parsing pulls in ryu, taking most of the forchestrator import time.
+    'forch.forchestrator': ('faucet.config_parser',),
+}
+
+_RUNS = 3
+
+
+def _get_import_times(module):
+    """Import module in a fresh interpreter, returning the cumulative time of each import"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    import_times = {}
+    for line in result.stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        import_times[fields[2].strip()] = int(fields[1]) / 1e6
+    return import_times
+
+
+def _get_budgeted_time(module):
+    """Get the cumulative import time of module, less the imports excluded from its budget"""
+    import_times = _get_import_times(module)
+    excluded = _BUDGET_EXCLUDED_IMPORTS.get(module, ())
+    return import_times[module] - sum(import_times.get(name, 0) for name in excluded)
+
+
+class ImportTimeTestCase(unittest.TestCase):
+    """Test cases for import time of core forch modules"""
+
+    def test_optional_modules(self):
+        """Test core modules do not import optional subsystems"""
+        for module in _CORE_MODULES:
+            imported = _get_import_times(module)
+            self.assertEqual([name for name in _OPTIONAL_MODULES if name in imported], [],
+                             f'optional modules imported by {module}')
+
+    def test_import_budget(self):
+        """Test core modules import within their time budget"""
+        for module, budget_sec in _IMPORT_BUDGET_SEC.items():
+            import_sec = min(_get_budgeted_time(module) for _ in range(_RUNS))
+            self.assertLess(import_sec, budget_sec, f'{module} import time')
+
+
+if __name__ == '__main__':
+    unittest.main()
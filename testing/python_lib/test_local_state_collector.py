@@ -0,0 +1,150 @@
+"""Unit tests for LocalStateCollector"""
+
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import ANY, MagicMock
+
+from forch.local_state_collector import CheckScheduler, LocalStateCollector
+from forch.proto.forch_configuration_pb2 import ProcessConfig
+from forch.proto.shared_constants_pb2 import State
+
+
+class CheckSchedulerTestCase(unittest.TestCase):
+    """Test cases for CheckScheduler"""
+
+    def setUp(self):
+        os.environ['FORCH_LOG'] = '/tmp/forch.log'
+        self._metrics = MagicMock()
+        self._scheduler = CheckScheduler(self._metrics)
+
+    def tearDown(self):
+        self._scheduler.stop()
+
+    def test_fixed_rate(self):
+        """Test checks run at a fixed rate regardless of their duration"""
+        run_times = []
+
+        def _check():
+            run_times.append(time.monotonic())
+            time.sleep(0.03)
+
+        self._scheduler.add_check('fixed', 0.1, _check)
+        self._scheduler.start()
+        time.sleep(0.55)
+        self._scheduler.stop()
+        self.assertGreaterEqual(len(run_times), 5)
+        for index, run_time in enumerate(run_times):
+            self.assertAlmostEqual(run_time - run_times[0], index * 0.1, delta=0.05)
+        self._metrics.observe_var.assert_any_call(
+            'local_check_duration_sec', ANY, labels=['fixed'])
+        self._metrics.inc_var.assert_not_called()
+
+    def test_overrun(self):
+        """Test runs missed by a late check are skipped and counted"""
+        run_times = []
+
+        def _check():
+            run_times.append(time.monotonic())
+            if len(run_times) == 1:
+                time.sleep(0.25)
+
+        self._scheduler.add_check('slow', 0.1, _check)
+        self._scheduler.start()
+        time.sleep(0.35)
+        self._scheduler.stop()
+        self._metrics.inc_var.assert_called_once_with('local_check_overruns', 2, labels=['slow'])
+        self.assertAlmostEqual(run_times[1] - run_times[0], 0.3, delta=0.03)
+
+    def test_error(self):
+        """Test a failing check keeps being run"""
+        check = MagicMock(side_effect=ValueError('failed'))
+        self._scheduler.add_check('failing', 0.05, check)
+        self._scheduler.start()
+        time.sleep(0.12)
+        self._scheduler.stop()
+        self.assertGreaterEqual(check.call_count, 2)
+
+
+class VrrpProbeTestCase(unittest.TestCase):
+    """Test cases for probing VRRP state from keepalived"""
+
+    def setUp(self):
+        os.environ['FORCH_LOG'] = '/tmp/forch.log'
+        self._temp_dir = tempfile.mkdtemp()
+        self._data_file = os.path.join(self._temp_dir, 'keepalived.data')
+        pid_file = os.path.join(self._temp_dir, 'keepalived.pid')
+        with open(pid_file, 'w') as file:
+            file.write(f'{os.getpid()}\n')
+        os.environ['KEEPALIVED_PID_FILE'] = pid_file
+        os.environ['KEEPALIVED_DATA_FILE'] = self._data_file
+
+        self._vrrp_state = 'MASTER'
+        self._lock_free = []
+        self._active_state_handler = MagicMock()
+        self._cleanup_handler = MagicMock()
+        self._collector = LocalStateCollector(
+            ProcessConfig(check_vrrp=True), self._cleanup_handler, self._active_state_handler,
+            MagicMock())
+        self._old_handler = signal.signal(signal.SIGUSR1, self._dump_stats)
+
+    def tearDown(self):
+        signal.signal(signal.SIGUSR1, self._old_handler)
+        os.environ.pop('KEEPALIVED_PID_FILE')
+        os.environ.pop('KEEPALIVED_DATA_FILE')
+        shutil.rmtree(self._temp_dir)
+
+    def _dump_stats(self, signum, frame):
+        threading.Timer(0.1, self._write_stats).start()
+
+    def _write_stats(self):
+        # pylint: disable=protected-access
+        self._lock_free.append(self._collector._lock.acquire(blocking=False))
+        if self._lock_free[-1]:
+            self._collector._lock.release()
+        with open(self._data_file, 'w') as file:
+            file.write(f' VRRP Instance = forch\n   State = {self._vrrp_state}\n')
+
+    def test_probe(self):
+        """Test the VRRP state is probed without holding the collector lock"""
+        start = time.monotonic()
+        self._collector._check_vrrp_info()  # pylint: disable=protected-access
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertEqual(self._lock_free, [True])
+        vrrp_state = self._collector.get_vrrp_state()
+        self.assertEqual((vrrp_state.vrrp_state, vrrp_state.vrrp_state_change_count),
+                         ('MASTER', 1))
+        self._active_state_handler.assert_called_once_with(State.active)
+        self._cleanup_handler.assert_not_called()
+
+    def test_state_change(self):
+        """Test handlers are only notified when the VRRP state changes"""
+        self._vrrp_state = 'FAULT'
+        for _ in range(2):
+            self._collector._check_vrrp_info()  # pylint: disable=protected-access
+        vrrp_state = self._collector.get_vrrp_state()
+        self.assertEqual((vrrp_state.vrrp_state, vrrp_state.vrrp_state_change_count),
+                         ('FAULT', 1))
+        self.assertEqual(vrrp_state.vrrp_state_detail, 'VRRP is in fault state')
+        self._active_state_handler.assert_called_once_with(State.broken)
+        self._cleanup_handler.assert_called_once()
+
+    def test_probe_error(self):
+        """Test an unreadable stats file is reported as an error"""
+        os.environ['KEEPALIVED_PID_FILE'] = os.path.join(self._temp_dir, 'missing.pid')
+        collector = LocalStateCollector(
+            ProcessConfig(check_vrrp=True), self._cleanup_handler, self._active_state_handler,
+            MagicMock())
+        collector._check_vrrp_info()  # pylint: disable=protected-access
+        vrrp_state = collector.get_vrrp_state()
+        self.assertEqual(vrrp_state.vrrp_state, 'ERROR')
+        self.assertIn('Cannot get VRRP info', vrrp_state.vrrp_state_detail)
+        self._active_state_handler.assert_called_once_with(State.broken)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""Unit tests for pinging CPN nodes"""
+
+import asyncio
+import os
+import threading
+import unittest
+from unittest.mock import patch
+
+from forch.cpn_state_collector import CPNStateCollector
+from forch.icmp_pinger import IcmpPinger, open_icmp_socket
+from forch.ping_manager import PingManager, parse_ping_output
+from forch.proto.cpn_state_pb2 import CpnState
+from forch.proto.shared_constants_pb2 import State
+from forch.utils import dict_proto
+
+_PING_OUTPUT = '''PING 10.0.0.1 (10.0.0.1) 56(84) bytes of data.
+64 bytes from 10.0.0.1: icmp_seq=1 ttl=64 time=0.045 ms
+
+--- 10.0.0.1 ping statistics ---
+1 packets transmitted, 1 received, 0% packet loss, time 0ms
+rtt min/avg/max/mdev = 0.045/0.045/0.045/0.000 ms
+'''
+
+
+class PingResultsTestCase(unittest.TestCase):
+    """Test cases for ping results"""
+
+    def test_parse_ping_output(self):
+        """Test ping subprocess output is parsed into ping results"""
+        results = parse_ping_output(_PING_OUTPUT, 1)
+        self.assertEqual(results, {
+            'transmitted': 1, 'received': 1, 'loss_percentage': 0, 'time_ms': 0,
+            'rtt_ms': {'min': 0.045, 'avg': 0.045, 'max': 0.045, 'mdev': 0.0}
+        })
+        self.assertAlmostEqual(dict_proto({'ping_results': results}, CpnState.CpnNode)
+                               .ping_results.rtt_ms.avg, 0.045)
+        self.assertEqual(CPNStateCollector._get_ping_state(results),  # pylint: disable=protected-access
+                         State.healthy)
+
+    def test_parse_failed_ping(self):
+        """Test a ping without output is a complete loss"""
+        results = parse_ping_output('', 2)
+        self.assertEqual(results, {'transmitted': 2, 'received': 0, 'loss_percentage': 100})
+        self.assertEqual(CPNStateCollector._get_ping_state(results),  # pylint: disable=protected-access
+                         State.down)
+
+
+class IcmpPingerTestCase(unittest.TestCase):
+    """Test cases for pinging in process"""
+
+    def setUp(self):
+        os.environ['FORCH_LOG'] = '/tmp/forch.log'
+        icmp_socket = open_icmp_socket()
+        if not icmp_socket:
+            self.skipTest('ICMP sockets are not permitted')
+        self._socket = icmp_socket[0]
+        self._pinger = IcmpPinger(*icmp_socket)
+        self._loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self._pinger.close()
+        self._loop.close()
+
+    def test_ping_localhost(self):
+        """Test pinging localhost returns round trip times"""
+        results = self._loop.run_until_complete(self._pinger.ping('127.0.0.1', 3, 0.3))
+        self.assertEqual((results['transmitted'], results['received']), (3, 3))
+        self.assertEqual(results['loss_percentage'], 0)
+        self.assertLessEqual(results['rtt_ms']['min'], results['rtt_ms']['max'])
+        self.assertLess(results['rtt_ms']['max'], 300)
+
+    def _drop_replies(self):
+        try:
+            while True:
+                self._socket.recvfrom(1024)
+        except OSError:
+            pass
+
+    def test_ping_timeout(self):
+        """Test an unanswered ping is a complete loss within its timeout"""
+        with patch.object(self._pinger, '_read_replies', self._drop_replies):
+            results = self._loop.run_until_complete(self._pinger.ping('127.0.0.1', 2, 0.2))
+        self.assertEqual((results['received'], results['loss_percentage']), (0, 100))
+        self.assertNotIn('rtt_ms', results)
+        self.assertLess(results['time_ms'], 300)
+
+    def test_ping_manager(self):
+        """Test PingManager pings hosts in process at sub-second intervals"""
+        rounds = []
+        done = threading.Event()
+
+        def _handler(future):
+            rounds.append(future.result())
+            if len(rounds) == 3:
+                done.set()
+
+        PingManager({'node1': '127.0.0.1', 'node2': '127.0.0.2'}, interval=0.1).start_loop(
+            _handler)
+        self.assertTrue(done.wait(1))
+        self.assertEqual(sorted(rounds[-1]), ['node1', 'node2'])
+        self.assertEqual(rounds[-1]['node2']['loss_percentage'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
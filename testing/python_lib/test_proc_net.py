@@ -0,0 +1,84 @@
+"""Unit tests for reading TCP connections from /proc/net"""
+
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+
+from forch.proc_net import TcpConnectionReader, parse_tcp_table
+
+_TCP_TABLE = '''  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt
+   0: 00000000:1F90 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 1001 1
+   1: 0100007F:1F90 0200000A:C350 01 00000000:00000000 00:00000000 00000000     0        0 1002 1
+   2: 0100007F:0050 0300000A:C351 01 00000000:00000000 00:00000000 00000000     0        0 1003 1
+   3: 0100007F:1F90 0400000A:C352 06 00000000:00000000 00:00000000 00000000     0        0 0 1
+'''
+
+_TCP6_TABLE = ('  sl  local_address remote_address st tx_queue rx_queue\n'
+               '   0: 00000000000000000000000001000000:1F90 0000000000000000FFFF00000500000A:C353'
+               ' 01 00000000:00000000 00:00000000 00000000     0        0 1004 1\n')
+
+
+class TcpConnectionReaderTestCase(unittest.TestCase):
+    """Test cases for TcpConnectionReader"""
+
+    def setUp(self):
+        self._proc_root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self._proc_root, 'net'))
+        self._write('net/tcp', _TCP_TABLE)
+        self._write('net/tcp6', _TCP6_TABLE)
+
+    def tearDown(self):
+        shutil.rmtree(self._proc_root)
+
+    def _write(self, path, content):
+        with open(os.path.join(self._proc_root, path), 'w') as file:
+            file.write(content)
+
+    def _add_process(self, pid, name, inodes):
+        fd_dir = os.path.join(self._proc_root, str(pid), 'fd')
+        os.makedirs(fd_dir)
+        self._write(f'{pid}/comm', name + '\n')
+        os.symlink('/dev/null', os.path.join(fd_dir, '0'))
+        for fd, inode in enumerate(inodes, start=3):
+            os.symlink(f'socket:[{inode}]', os.path.join(fd_dir, str(fd)))
+
+    def test_parse_tcp_table(self):
+        """Test only established sockets on watched ports are parsed"""
+        entries = list(parse_tcp_table(_TCP_TABLE.splitlines()[1:], socket.AF_INET, [8080]))
+        self.assertEqual(entries, [(8080, '10.0.0.2:50000', 1002)])
+
+    def test_fetch_connections(self):
+        """Test connections are mapped to their owning process"""
+        self._add_process(10, 'other', [1003])
+        self._add_process(20, 'python3', [1002, 1004])
+        connections = TcpConnectionReader(self._proc_root).fetch_connections([8080])
+        self.assertEqual(connections, {
+            '10.0.0.2:50000': {'local_port': 8080, 'process_info': '20/python3'},
+            '::ffff:10.0.0.5:50003': {'local_port': 8080, 'process_info': '20/python3'},
+        })
+
+    def test_unknown_process(self):
+        """Test connections without a visible owner have no process info"""
+        connections = TcpConnectionReader(self._proc_root).fetch_connections([8080])
+        self.assertEqual(connections['10.0.0.2:50000']['process_info'], '-')
+
+    def test_live_connection(self):
+        """Test a connection of this process is read from the real /proc"""
+        with socket.socket() as server:
+            server.bind(('127.0.0.1', 0))
+            server.listen()
+            port = server.getsockname()[1]
+            with socket.create_connection(('127.0.0.1', port)) as client:
+                accepted, _ = server.accept()
+                with accepted:
+                    connections = TcpConnectionReader().fetch_connections([port])
+                    foreign_address = f'127.0.0.1:{client.getsockname()[1]}'
+                    self.assertEqual(connections[foreign_address]['local_port'], port)
+                    self.assertTrue(connections[foreign_address]['process_info'].startswith(
+                        f'{os.getpid()}/'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""Unit tests for ProcessTracker"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from forch.process_tracker import ProcessTracker
+
+_BOOT_TIME = 1600000000
+
+
+class ProcessTrackerTestCase(unittest.TestCase):
+    """Test cases for ProcessTracker"""
+
+    def setUp(self):
+        self._proc_root = tempfile.mkdtemp()
+        self._write('stat', f'cpu  1 2 3 4\nbtime {_BOOT_TIME}\n')
+        self._tracker = ProcessTracker(
+            {'faucet': 'ryu-manager.*faucet', 'gauge': 'ryu-manager.*gauge'}, self._proc_root)
+
+    def tearDown(self):
+        shutil.rmtree(self._proc_root)
+
+    def _write(self, path, content, mode='w'):
+        path = os.path.join(self._proc_root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, mode) as file:
+            file.write(content)
+
+    def _add_process(self, pid, cmdline, utime=0, start_time=100):
+        self._write(f'{pid}/cmdline', b'\0'.join(arg.encode() for arg in cmdline) + b'\0', 'wb')
+        fields = ['S'] + ['0'] * 40
+        fields[11] = str(utime)
+        fields[19] = str(start_time)
+        fields[20] = '4096000'
+        fields[21] = '10'
+        self._write(f'{pid}/stat', f'{pid} (ryu manager) ' + ' '.join(fields) + '\n')
+
+    def _scan(self, target_counts=None):
+        opened = []
+        real_open = open
+
+        def _open(path, *args, **kwargs):
+            opened.append(os.path.relpath(path, self._proc_root))
+            return real_open(path, *args, **kwargs)
+
+        with patch('builtins.open', _open):
+            procs = self._tracker.scan(target_counts)
+        return procs, sorted(path for path in opened if path.endswith('cmdline'))
+
+    def test_scan(self):
+        """Test processes are matched and their stats read"""
+        self._add_process(10, ['ryu-manager', 'faucet.faucet'], utime=200)
+        self._add_process(11, ['ryu-manager', 'gauge.main'])
+        self._add_process(12, ['bash'])
+        procs, _ = self._scan()
+        self.assertEqual([proc.pid for proc in procs['faucet']], [10])
+        self.assertEqual([proc.pid for proc in procs['gauge']], [11])
+        faucet = procs['faucet'][0]
+        self.assertEqual(faucet.cmdline, 'ryu-manager faucet.faucet')
+        self.assertEqual(faucet.cpu_user, 200 / os.sysconf('SC_CLK_TCK'))
+        self.assertEqual(faucet.create_time, _BOOT_TIME + 100 / os.sysconf('SC_CLK_TCK'))
+        self.assertEqual(faucet.memory_rss, 10 * os.sysconf('SC_PAGE_SIZE'))
+        self.assertEqual(faucet.memory_vms, 4096000)
+        self.assertEqual(faucet.cpu_percent, 0.0)
+
+    def test_incremental_scan(self):
+        """Test only matched and new processes are read again"""
+        self._add_process(10, ['ryu-manager', 'faucet.faucet'])
+        self._add_process(12, ['bash'])
+        self._scan()
+
+        self._add_process(10, ['ryu-manager', 'faucet.faucet'], utime=100)
+        self._add_process(13, ['ryu-manager', 'gauge.main'])
+        procs, read = self._scan()
+        self.assertEqual(read, ['10/cmdline', '13/cmdline'])
+        self.assertEqual([proc.pid for proc in procs['gauge']], [13])
+        self.assertGreater(procs['faucet'][0].cpu_percent, 0)
+
+        shutil.rmtree(os.path.join(self._proc_root, '10'))
+        procs, read = self._scan()
+        self.assertEqual(read, ['13/cmdline'])
+        self.assertNotIn('faucet', procs)
+
+    def test_reused_pid(self):
+        """Test a pid reused by another process is matched again"""
+        self._add_process(10, ['ryu-manager', 'faucet.faucet'], utime=100)
+        self._scan()
+        self._add_process(10, ['bash'], start_time=200)
+        procs, _ = self._scan()
+        self.assertEqual(procs, {})
+
+    def test_missing_target(self):
+        """Test all processes are read again when a target is short of its count"""
+        self._add_process(12, ['bash'])
+        self._scan({'faucet': 1})
+        self._add_process(12, ['ryu-manager', 'faucet.faucet'])
+        procs, read = self._scan({'faucet': 1})
+        self.assertEqual(read, ['12/cmdline'])
+        self.assertEqual([proc.pid for proc in procs['faucet']], [12])
+
+    def test_live_process(self):
+        """Test this process is found in the real /proc"""
+        tracker = ProcessTracker({'self': 'python'})
+        procs = tracker.scan()
+        self.assertIn(os.getpid(), [proc.pid for proc in procs['self']])
+
+
+if __name__ == '__main__':
+    unittest.main()
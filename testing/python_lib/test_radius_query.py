@@ -0,0 +1,264 @@
+"""Unit tests for the asyncio RADIUS client"""
+
+import asyncio
+import collections
+import hashlib
+import os
+import socket
+import threading
+import time
+import unittest
+
+from forch.async_radius_query import AsyncRadiusQuery, RadiusTimeoutError
+from forch.radius import Radius, RadiusAccessAccept, RadiusAccessReject, RadiusAttributesList
+from forch.radius_attributes import (
+    MessageAuthenticator, TunnelAssignmentID, TunnelPrivateGroupID)
+from forch.radius_query import ACCEPT, MabRequestTemplate, encode_mab_request, get_auth_result
+from forch.radius_server_pool import RadiusServerPool
+from forch.utils import MessageParseError
+
+_DEFAULT_FORCH_LOG = '/tmp/forch.log'
+_RADIUS_SECRET = 'SECRET'
+
+Socket = collections.namedtuple('Socket', 'source_ip, source_port, server_ip, server_port')
+
+
+def _build_response(packet_class, request, secret, attributes):
+    attributes = RadiusAttributesList(attributes + [MessageAuthenticator.create(bytes(16))])
+    packed = packet_class(request.packet_id, request.authenticator, attributes).build(secret)
+    packed[4:20] = hashlib.md5(packed + secret.encode()).digest()
+    return bytes(packed)
+
+
+def build_accept(request, secret, segment, role):
+    """Build an Access-Accept answering the given request"""
+    return _build_response(RadiusAccessAccept, request, secret, [
+        TunnelPrivateGroupID.create(segment.encode()),
+        TunnelAssignmentID.create(role.encode())])
+
+
+def build_reject(request, secret):
+    """Build an Access-Reject answering the given request"""
+    return _build_response(RadiusAccessReject, request, secret, [])
+
+
+class StandInRadiusServer:
+    """UDP RADIUS server answering every MAB request with an Access-Accept"""
+
+    def __init__(self, secret=_RADIUS_SECRET, drop=False, delay_sec=0):
+        self._secret = secret
+        self.drop = drop
+        self._delay_sec = delay_sec
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+        self._socket.bind(('127.0.0.1', 0))
+        self.port = self._socket.getsockname()[1]
+        self.received = 0
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                data, addr = self._socket.recvfrom(4096)
+            except OSError:
+                return
+            self.received += 1
+            if self.drop:
+                continue
+            if self._delay_sec:
+                time.sleep(self._delay_sec)
+            request = Radius.parse(data, _RADIUS_SECRET)
+            mac = request.attributes.find('Calling-Station-Id').data()
+            self._socket.sendto(build_accept(request, self._secret, 'SEG_' + mac, 'red'), addr)
+
+    def close(self):
+        """Close server socket"""
+        self._socket.close()
+
+
+class RadiusPacketTestCase(unittest.TestCase):
+    """Test cases for RADIUS packet encoding and decoding"""
+
+    def test_mab_template(self):
+        """Test the MAB request template packs the same bytes as the attribute encoder"""
+        template = MabRequestTemplate(_RADIUS_SECRET)
+        for mac, port_id in (('8e:00:00:00:01:02', 12345), ('8E:00:0A:BB:01:FF', None),
+                             ('8e-00-00-00-01-02', 7), ('8e0000000102', 7)):
+            req_authenticator = os.urandom(16)
+            expected = encode_mab_request(17, req_authenticator, mac, port_id, _RADIUS_SECRET)
+            self.assertEqual(template.encode(17, req_authenticator, mac, port_id), expected)
+
+    def test_parse_accept(self):
+        """Test an Access-Accept is validated and decoded"""
+        req_authenticator = os.urandom(16)
+        request = Radius.parse(
+            encode_mab_request(3, req_authenticator, '00:11:22:33:44:55', 1, _RADIUS_SECRET),
+            _RADIUS_SECRET)
+        self.assertEqual(request.attributes.find('Called-Station-Id').data(), '001122334455')
+        accept = build_accept(request, _RADIUS_SECRET, 'SEG_A', 'red')
+        radius = Radius.parse(accept, _RADIUS_SECRET, {3: req_authenticator})
+        self.assertEqual(get_auth_result(radius), (ACCEPT, 'SEG_A', 'red'))
+        with self.assertRaises(MessageParseError):
+            Radius.parse(accept, _RADIUS_SECRET, {3: os.urandom(16)})
+
+    def test_parse_malformed(self):
+        """Test malformed attribute lengths are rejected instead of looping or truncating"""
+        packet = bytearray(
+            encode_mab_request(3, os.urandom(16), '00:11:22:33:44:55', 1, _RADIUS_SECRET))
+        for attr_length in (0, 1, 255):
+            packet[21] = attr_length
+            with self.assertRaises(MessageParseError):
+                Radius.parse(bytes(packet), _RADIUS_SECRET)
+
+
+class AsyncRadiusQueryTestCase(unittest.TestCase):
+    """Test cases for the asyncio RADIUS client"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        os.environ['FORCH_LOG'] = _DEFAULT_FORCH_LOG
+        self._server = None
+        self._query = None
+        self._results = []
+
+    def _setup(self, timeout_sec=1, max_retries=0, **server_args):
+        self._server = StandInRadiusServer(**server_args)
+        socket_info = Socket('127.0.0.1', 0, '127.0.0.1', self._server.port)
+        self._query = AsyncRadiusQuery(
+            socket_info, _RADIUS_SECRET, lambda *args: self._results.append(args),
+            timeout_sec=timeout_sec, max_retries=max_retries)
+        threading.Thread(target=self._query.receive_radius_messages, daemon=True).start()
+
+    def tearDown(self):
+        """cleanup after each test method finishes"""
+        if self._query:
+            self._query.stop()
+        if self._server:
+            self._server.close()
+
+    def test_mab_accept(self):
+        """Test a MAB request resolves its future with the accepted segment and role"""
+        self._setup()
+        result = self._query.send_mab_request('00:11:22:33:44:55', 1234).result(timeout=5)
+        self.assertEqual(result.code, ACCEPT)
+        self.assertEqual(result.segment, 'SEG_00-11-22-33-44-55')
+        self.assertEqual(result.role, 'red')
+        self.assertEqual(self._results, [
+            ('00:11:22:33:44:55', ACCEPT, 'SEG_00-11-22-33-44-55', 'red')])
+
+    def test_invalid_response_dropped(self):
+        """Test a response signed with the wrong secret is dropped and the request times out"""
+        self._setup(secret='WRONG')
+        future = self._query.send_mab_request('00:11:22:33:44:55', 1234)
+        with self.assertRaises(RadiusTimeoutError):
+            future.result(timeout=5)
+        self.assertEqual(self._query.get_outstanding_count(), 0)
+
+    def test_timeout_retries(self):
+        """Test an unanswered request is retransmitted before timing out"""
+        self._setup(timeout_sec=0.2, max_retries=2, drop=True)
+        with self.assertRaises(RadiusTimeoutError):
+            self._query.send_mab_request('00:11:22:33:44:55', 1234).result(timeout=5)
+        self.assertEqual(self._server.received, 3)
+
+    def test_concurrent_requests(self):
+        """Test more concurrent requests than RADIUS packet ids all get resolved"""
+        self._setup(timeout_sec=5)
+        macs = ['02:00:00:00:%02x:%02x' % (index // 256, index % 256) for index in range(1000)]
+
+        async def query_all():
+            return await asyncio.gather(*[self._query.query_mab(mac, 1) for mac in macs])
+
+        results = asyncio.run_coroutine_threadsafe(
+            query_all(), self._query.loop).result(timeout=30)
+        self.assertEqual([result.src_mac for result in results], macs)
+        self.assertTrue(all(result.code == ACCEPT for result in results))
+        self.assertEqual(self._query.get_outstanding_count(), 0)
+
+
+class RadiusServerPoolTestCase(unittest.TestCase):
+    """Test cases for balancing and failing over RADIUS requests across servers"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        os.environ['FORCH_LOG'] = _DEFAULT_FORCH_LOG
+        self._servers = []
+        self._pool = None
+        self._query = None
+
+    def _setup(self, server_args, timeout_sec=0.2, recovery_sec=None):
+        self._servers = [StandInRadiusServer(**args) for args in server_args]
+        self._pool = RadiusServerPool(
+            [('127.0.0.1', server.port) for server in self._servers], recovery_sec=recovery_sec)
+        socket_info = Socket('127.0.0.1', 0, '127.0.0.1', 0)
+        self._query = AsyncRadiusQuery(
+            socket_info, _RADIUS_SECRET, timeout_sec=timeout_sec,
+            max_retries=len(self._servers) - 1, server_pool=self._pool)
+        threading.Thread(target=self._query.receive_radius_messages, daemon=True).start()
+
+    def tearDown(self):
+        """cleanup after each test method finishes"""
+        if self._query:
+            self._query.stop()
+        for server in self._servers:
+            server.close()
+
+    def _query_sequentially(self, count):
+        return [self._query.send_mab_request('00:11:22:33:44:%02x' % index, 1).result(timeout=5)
+                for index in range(count)]
+
+    def test_select(self):
+        """Test the server with least outstanding requests and then lowest latency is picked"""
+        pool = RadiusServerPool([('10.0.0.1', 1812), ('10.0.0.2', 1812)])
+        first, second = pool.get_servers()
+        pool.request_sent(first)
+        self.assertIs(pool.select(), second)
+        pool.request_sent(second)
+        pool.response_received(first, 0.5)
+        pool.response_received(second, 0.1)
+        self.assertIs(pool.select(), second)
+        self.assertIs(pool.select(exclude=second), first)
+
+    def test_latency_aware(self):
+        """Test sequential requests go to the faster server"""
+        self._setup([{'delay_sec': 0.05}, {}], timeout_sec=1)
+        self._query_sequentially(10)
+        slow, fast = self._pool.get_servers()
+        self.assertLess(slow.latency_sec, 1)
+        self.assertGreater(slow.latency_sec, fast.latency_sec)
+        self.assertGreater(self._servers[1].received, 7)
+
+    def test_failover_and_recovery(self):
+        """Test requests fail over from an unresponsive server and return once it recovers"""
+        self._setup([{'drop': True}, {}], recovery_sec=0.5)
+        dead, alive = self._pool.get_servers()
+        alive.latency_sec = 1
+        results = self._query_sequentially(6)
+        self.assertTrue(all(result.code == ACCEPT for result in results))
+        self.assertEqual(self._servers[0].received, 3)
+        self.assertFalse(dead.is_up(time.time()))
+        self.assertEqual((dead.outstanding, alive.outstanding), (0, 0))
+
+        self._servers[0].drop = False
+        alive.latency_sec = 1
+        time.sleep(0.5)
+        self._query_sequentially(1)
+        self.assertEqual(self._servers[0].received, 4)
+        self.assertEqual(dead.down_until, 0)
+
+    def test_concurrent_balanced(self):
+        """Test concurrent requests are spread over the servers"""
+        self._setup([{}, {}], timeout_sec=5)
+        macs = ['02:00:00:00:%02x:%02x' % (index // 256, index % 256) for index in range(500)]
+
+        async def query_all():
+            return await asyncio.gather(*[self._query.query_mab(mac, 1) for mac in macs])
+
+        results = asyncio.run_coroutine_threadsafe(
+            query_all(), self._query.loop).result(timeout=30)
+        self.assertTrue(all(result.code == ACCEPT for result in results))
+        self.assertGreater(min(server.received for server in self._servers), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
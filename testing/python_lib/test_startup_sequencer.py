@@ -0,0 +1,59 @@
+"""Unit tests for StartupSequencer"""
+
+import os
+import threading
+import time
+import unittest
+
+from forch.startup_sequencer import StartupSequencer, wait_until_ready
+
+
+class StartupSequencerTestCase(unittest.TestCase):
+    """Test cases for StartupSequencer"""
+
+    def setUp(self):
+        """setup fixture for each test method"""
+        os.environ['FORCH_LOG'] = '/tmp/forch.log'
+
+    def test_concurrent_phases(self):
+        """Test submitted phases run concurrently and are timed"""
+        startup = StartupSequencer()
+        barrier = threading.Barrier(2, timeout=5)
+        startup.submit('first', barrier.wait)
+        startup.submit('second', barrier.wait)
+        self.assertEqual(startup.run('third', lambda: 'done'), 'done')
+        startup.wait()
+        self.assertEqual(sorted(startup.get_timings()), ['first', 'second', 'third'])
+
+    def test_phase_error(self):
+        """Test a failed phase is raised after all phases finished"""
+        startup = StartupSequencer()
+        finished = threading.Event()
+        startup.submit('fail', lambda: 1 / 0)
+        startup.submit('slow', lambda: time.sleep(0.2) or finished.set())
+        with self.assertRaises(ZeroDivisionError):
+            startup.wait()
+        self.assertTrue(finished.is_set())
+        self.assertIn('fail', startup.get_timings())
+
+    def test_wait_until_ready(self):
+        """Test readiness is polled until ready, tolerating errors, or times out"""
+        checks = []
+
+        def check_ready():
+            checks.append(len(checks))
+            if len(checks) < 3:
+                raise ConnectionError('not yet')
+            return len(checks) > 3 and 'ready'
+
+        self.assertEqual(wait_until_ready(check_ready, 10, 'test'), 'ready')
+        self.assertEqual(len(checks), 4)
+
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            wait_until_ready(lambda: False, 0.3, 'test')
+        self.assertLess(time.monotonic() - start, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""Unit tests for VarzStateCollector"""
+
+import os
+import time
+import unittest
+from unittest.mock import MagicMock
+from varz_server import VarzServer
+
+from prometheus_client.parser import text_string_to_metric_families
+
+from forch.utils import MetricsFetchingError
+from forch.varz_state_collector import (
+    BACKOFF_MAX_SEC, VarzStateCollector, get_backoff_sec, parse_target_samples)
+
+_VARZ = r'''# HELP dp_status status of datapaths
+# TYPE dp_status gauge
+dp_status{dp_id="0x1",dp_name="sw1"} 1.0
+dp_status{dp_id="0x2",dp_name="sw2"} 0.0
+# HELP faucet_config_reload_cold_total number of cold, complete reprovisions
+# TYPE faucet_config_reload_cold_total counter
+faucet_config_reload_cold_total{dp_id="0x1",dp_name="sw1"} 3.0
+# HELP faucet_event_id highest/most recent event ID to be sent
+# TYPE faucet_event_id gauge
+faucet_event_id 42.0
+# HELP flow_byte_count_port_acl flow byte count
+# TYPE flow_byte_count_port_acl gauge
+flow_byte_count_port_acl{dp_name="sw1",in_port="1",vlan="200"} 100.0
+# HELP flow_packet_count_vlan flow packet count
+# TYPE flow_packet_count_vlan gauge
+flow_packet_count_vlan{dp_name="sw1", vlan="200"} 7.0 1590000000000
+flow_packet_count_vlan{dp_name="sw1",vlan="300",desc="a \"b\" \\c\nd"} 8.0
+# HELP port_status_duration_sec status duration
+# TYPE port_status_duration_sec histogram
+port_status_duration_sec_bucket{le="+Inf"} 3.0
+port_status_duration_sec_count 3.0
+port_status_duration_sec_sum 1.5
+learned_l2_port{dp_name="sw1",eth_src="8e:00:00:00:01:02",vid="200"} 1.0
+# HELP faucet_config_reload_warm warm reprovisions
+# TYPE faucet_config_reload_warm counter
+faucet_config_reload_warm{dp_name="sw1"} 2.0
+'''
+
+_TARGETS = (
+    'dp_status', 'faucet_config_reload_cold', 'faucet_event_id', 'flow_packet_count_vlan',
+    'port_status_duration_sec', 'learned_l2_port', 'faucet_config_reload_warm')
+
+
+class VarzParserTestCase(unittest.TestCase):
+    """Test cases for the streaming varz parser"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        os.environ['FORCH_LOG'] = '/tmp/forch.log'
+
+    def _parse(self, targets):
+        samples = {}
+        for name, sample in parse_target_samples(_VARZ.encode().splitlines(True), targets):
+            samples.setdefault(name, []).append(
+                (sample.name, sample.labels, sample.value))
+        return samples
+
+    def test_reference_parser(self):
+        """Test target samples match those of the prometheus_client parser"""
+        expected = {
+            family.name: [(sample.name, sample.labels, sample.value) for sample in family.samples]
+            for family in text_string_to_metric_families(_VARZ) if family.name in _TARGETS}
+        self.assertEqual(set(expected), set(_TARGETS))
+        self.assertEqual(self._parse(_TARGETS), expected)
+
+    def test_skip_families(self):
+        """Test samples of non-target families are skipped"""
+        self.assertEqual(self._parse(('faucet_event_id', 'learned_l2_port')), {
+            'faucet_event_id': [('faucet_event_id', {}, 42.0)],
+            'learned_l2_port': [('learned_l2_port', {
+                'dp_name': 'sw1', 'eth_src': '8e:00:00:00:01:02', 'vid': '200'}, 1.0)],
+        })
+
+
+class VarzStateCollectorTestCase(unittest.TestCase):
+    """Test cases for scraping varz endpoints"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        os.environ['FORCH_LOG'] = '/tmp/forch.log'
+        self._servers = []
+        self._metrics = MagicMock()
+        self._collector = None
+
+    def setUp(self):
+        """setup fixture for each test method"""
+        self._collector = VarzStateCollector(metrics=self._metrics)
+
+    def tearDown(self):
+        """cleanup after each test method finishes"""
+        self._collector.stop()
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+    def _start_server(self, delay_sec=0):
+        server = VarzServer(_VARZ.encode(), delay_sec)
+        self._servers.append(server)
+        return server, 'http://127.0.0.1:%d' % server.get_port()
+
+    def test_keep_alive(self):
+        """Test scrapes reuse a connection and export their duration and size"""
+        server, endpoint = self._start_server()
+        for _ in range(3):
+            metrics = self._collector.get_metrics(endpoint, ('faucet_event_id',))
+            self.assertEqual(metrics['faucet_event_id'].samples[0].value, 42.0)
+        self.assertEqual((server.requests, server.connections), (3, 1))
+        observed = {call[0][0]: (call[0][1], call[1]['labels'])
+                    for call in self._metrics.observe_var.call_args_list}
+        self.assertEqual(observed['varz_scrape_size_bytes'], (len(_VARZ), [endpoint]))
+        self.assertIn('varz_scrape_duration_sec', observed)
+
+    def test_concurrent_scrapes(self):
+        """Test scrapes of several endpoints run in parallel"""
+        _, faucet = self._start_server(delay_sec=0.3)
+        _, gauge = self._start_server(delay_sec=0.3)
+        start = time.monotonic()
+        faucet_future = self._collector.submit_get_metrics(faucet, ('dp_status',))
+        gauge_future = self._collector.submit_get_metrics(gauge, ('flow_packet_count_vlan',))
+        faucet_metrics, gauge_metrics = faucet_future.result(), gauge_future.result()
+        self.assertLess(time.monotonic() - start, 0.55)
+        self.assertEqual(len(faucet_metrics['dp_status'].samples), 2)
+        self.assertEqual(len(gauge_metrics['flow_packet_count_vlan'].samples), 2)
+
+    def test_retry_backoff(self):
+        """Test failed scrapes are retried with a bounded backoff"""
+        server, endpoint = self._start_server()
+        server.status = 500
+        with self.assertRaises(MetricsFetchingError):
+            self._collector.retry_get_metrics(endpoint, ('dp_status',), retries=3)
+        self.assertEqual(server.requests, 3)
+        for retry in range(10):
+            self.assertLessEqual(get_backoff_sec(retry), BACKOFF_MAX_SEC)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Benchmark of target metric parsing from a large Gauge varz exposition"""
+
+import argparse
+import io
+import os
+import sys
+import timeit
+
+from prometheus_client.parser import text_string_to_metric_families
+
+from forch.varz_state_collector import parse_target_samples
+
+_TARGET_METRICS = (
+    'flow_packet_count_vlan_acl',
+    'flow_packet_count_port_acl',
+    'flow_packet_count_vlan'
+)
+_FLOW_METRICS = ('flow_packet_count', 'flow_byte_count', 'flow_duration_sec',
+                 'flow_idle_timeout', 'flow_hard_timeout')
+_FLOW_TABLES = ('port_acl', 'vlan', 'vlan_acl', 'eth_src', 'ipv4_fib', 'vip', 'eth_dst',
+                'flood')
+
+
+def build_gauge_exposition(switches, ports):
+    """Build a Gauge-like exposition of flow metrics for each table of each switch"""
+    lines = []
+    for metric in _FLOW_METRICS:
+        for table in _FLOW_TABLES:
+            name = '%s_%s' % (metric, table)
+            lines.append('# HELP %s %s in table %s' % (name, metric, table))
+            lines.append('# TYPE %s gauge' % name)
+            for switch in range(switches):
+                for port in range(1, ports + 1):
+                    lines.append(
+                        '%s{dp_id="0x%x",dp_name="sw%d",in_port="%d",priority="20000",'
+                        'table_id="%d",vlan="%d",vlan_vid="%d"} %d.0' % (
+                            name, switch + 1, switch, port, _FLOW_TABLES.index(table),
+                            200 + port % 4, 4296 + port % 4, port * 10))
+    lines.append('')
+    return '\n'.join(lines).encode()
+
+
+def _parse_reference(exposition):
+    return {family.name: family.samples
+            for family in text_string_to_metric_families(exposition.decode())
+            if family.name in _TARGET_METRICS}
+
+
+def _parse_streaming(exposition):
+    metric_map = {}
+    for name, sample in parse_target_samples(io.BytesIO(exposition), _TARGET_METRICS):
+        metric_map.setdefault(name, []).append(sample)
+    return metric_map
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(prog='varz_parser_benchmark')
+    parser.add_argument('-f', '--file', help='recorded exposition to parse')
+    parser.add_argument('-s', '--switches', type=int, default=20, help='number of switches')
+    parser.add_argument('-p', '--ports', type=int, default=48, help='ports per switch')
+    parser.add_argument('-n', '--number', type=int, default=3, help='runs per measurement')
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, 'rb') as file:
+            exposition = file.read()
+    else:
+        exposition = build_gauge_exposition(args.switches, args.ports)
+    sys.stdout.write('%d bytes, %d lines\n' % (len(exposition), exposition.count(b'\n')))
+
+    for name, func in (('prometheus_client', _parse_reference), ('streaming', _parse_streaming)):
+        seconds = min(timeit.repeat(lambda func=func: func(exposition),
+                                    number=args.number, repeat=3)) / args.number
+        samples = sum(len(samples) for samples in func(exposition).values())
+        sys.stdout.write('%-20s %10.2f ms %10d samples\n' % (name, seconds * 1000, samples))
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('FORCH_LOG', '/tmp/forch.log')
+    main()
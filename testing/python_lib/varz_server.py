@@ -0,0 +1,45 @@
+"""Stand-in varz endpoint for unit tests"""
+
+import http.server
+import threading
+import time
+
+
+class _VarzHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # pylint: disable=invalid-name
+    def do_GET(self):
+        """Serve the varz body of the server after its delay"""
+        self.server.requests += 1
+        time.sleep(self.server.delay_sec)
+        self.send_response(self.server.status)
+        self.send_header('Content-Length', str(len(self.server.body)))
+        self.end_headers()
+        self.wfile.write(self.server.body)
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class VarzServer(http.server.ThreadingHTTPServer):
+    """Stand-in varz endpoint counting requests and connections"""
+
+    daemon_threads = True
+
+    def __init__(self, body, delay_sec=0):
+        super().__init__(('127.0.0.1', 0), _VarzHandler)
+        self.body = body
+        self.delay_sec = delay_sec
+        self.status = 200
+        self.requests = 0
+        self.connections = 0
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def get_port(self):
+        """Get the port the server listens on"""
+        return self.server_address[1]